@@ -3,17 +3,43 @@ from flask_cors import CORS
 from app.routes.user_routes import user_bp
 from app.routes.post_routes import post_bp
 from app.routes.comment_routes import comment_bp
+from app.routes.stats_routes import stats_bp
+from app.cli import register_commands
+from app.database import graph
+from app.friend_index import friend_index
+from app.schema import ensure_schema
+from app.json_provider import JSONProvider
+from app.instrumentation import instrumentation
+from app import routing
+from app.idempotency import REPLAYED_HEADER
 
 def create_app(config_object):
     app = Flask(__name__)
     app.config.from_object(config_object)
+    app.json = JSONProvider(app)
     
     # Enable CORS
-    CORS(app)
+    CORS(app, expose_headers=[routing.BOOKMARK_HEADER, REPLAYED_HEADER])
+    
+    # Read transactions for GET requests, bookmarks after writes
+    routing.init_app(app)
     
     # Register blueprints
     app.register_blueprint(user_bp, url_prefix='/users')
     app.register_blueprint(post_bp, url_prefix='/posts')
     app.register_blueprint(comment_bp, url_prefix='/comments')
+    app.register_blueprint(stats_bp, url_prefix='/stats')
+    
+    if app.config.get('INSTRUMENTATION'):
+        instrumentation.init_app(app, graph)
+    
+    # CLI commands (flask schema init / flask schema status)
+    register_commands(app)
+    
+    if app.config.get('SCHEMA_BOOTSTRAP'):
+        ensure_schema(graph)
+    
+    if app.config.get('FRIEND_INDEX'):
+        friend_index.load(graph, app.config['FRIEND_INDEX_CHUNK_SIZE'])
     
     return app
\ No newline at end of file
@@ -0,0 +1,67 @@
+from werkzeug.exceptions import HTTPException
+from app import create_app
+
+
+class AsyncDispatcher:
+    """ASGI application serving the async views, and the sync app for everything else.
+
+    Each request is resolved against the URL map of the sync app; when the
+    matched endpoint has an async implementation it is served by the Quart
+    app on the event loop, otherwise by the Flask app in a worker thread.
+    CORS preflights (OPTIONS) always go to the sync app, whose Flask-CORS
+    extension answers them with the allowed methods and headers.
+    """
+
+    def __init__(self, async_app, sync_app, wsgi_app):
+        self.async_app = async_app
+        self.sync_app = sync_app
+        self.wsgi_app = wsgi_app
+
+    def is_async(self, scope):
+        if scope["method"] == "OPTIONS":
+            return False
+        adapter = self.sync_app.url_map.bind('')
+        try:
+            endpoint, _ = adapter.match(scope["path"], method=scope["method"])
+        except HTTPException:
+            return False
+        return endpoint in self.async_app.view_functions
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and not self.is_async(scope):
+            await self.wsgi_app(scope, receive, send)
+        else:
+            await self.async_app(scope, receive, send)
+
+
+def create_async_app(config_object):
+    from asgiref.wsgi import WsgiToAsgi
+    from quart import Quart, request
+    from app.aio.database import database, request_bookmarks
+    from app.aio.routes import user_bp, post_bp
+    from app.aio.json_provider import JSONProvider
+    from app.routing import BOOKMARK_HEADER, decode_bookmark
+
+    sync_app = create_app(config_object)
+
+    async_app = Quart(__name__)
+    async_app.config.from_object(config_object)
+    async_app.json = JSONProvider(async_app)
+    async_app.register_blueprint(user_bp, url_prefix='/users')
+    async_app.register_blueprint(post_bp, url_prefix='/posts')
+
+    @async_app.before_request
+    async def read_bookmarks():
+        request_bookmarks.set(tuple(decode_bookmark(request.headers.get(BOOKMARK_HEADER))[0]))
+
+    @async_app.after_request
+    async def allow_cors(response):
+        response.headers.setdefault('Access-Control-Allow-Origin', '*')
+        response.headers.setdefault('Access-Control-Expose-Headers', BOOKMARK_HEADER)
+        return response
+
+    @async_app.after_serving
+    async def close_database():
+        await database.close()
+
+    return AsyncDispatcher(async_app, sync_app, WsgiToAsgi(sync_app))
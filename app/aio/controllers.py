@@ -0,0 +1,178 @@
+import asyncio
+from app.cache import cached
+from app.pagination import parse_limit, decode_cursor
+from app.post_detail import parse_expand, detail_query, detail_response
+from app.projections import parse_fields, user_map, post_map, comment_map
+
+
+class AsyncUserController:
+    def __init__(self, database):
+        self.database = database
+
+    async def find_user(self, user_id, fields=None):
+        result = await self.database.run(f"MATCH (u:User {{id: $id}}) RETURN {user_map('u', fields)} AS u", id=user_id)
+        return result[0]["u"] if result else None
+
+    @cached("user:{0}")
+    async def get_user_by_id(self, user_id, fields=None):
+        """Get a user by ID"""
+        try:
+            try:
+                fields = parse_fields(fields, "User")
+            except ValueError as e:
+                return {"error": str(e)}, 400
+
+            user = await self.find_user(user_id, fields)
+            if not user:
+                return {"error": "User not found"}, 404
+            return {"user": user}, 200
+        except Exception as e:
+            return {"error": str(e)}, 500
+
+    async def get_user_posts(self, user_id, fields=None):
+        """Get all posts created by a user"""
+        try:
+            try:
+                fields = parse_fields(fields, "Post")
+            except ValueError as e:
+                return {"error": str(e)}, 400
+
+            user, result = await asyncio.gather(
+                self.find_user(user_id),
+                self.database.run(f"MATCH (u:User {{id: $id}})-[:CREATED]->(p:Post) RETURN {post_map('p', fields)} AS p", id=user_id)
+            )
+            if not user:
+                return {"error": "User not found"}, 404
+            return {"posts": [record["p"] for record in result]}, 200
+        except Exception as e:
+            return {"error": str(e)}, 500
+
+    @cached("user:{0}:friends")
+    async def get_user_friends(self, user_id, fields=None):
+        """Get all friends of a user"""
+        try:
+            try:
+                fields = parse_fields(fields, "User")
+            except ValueError as e:
+                return {"error": str(e)}, 400
+
+            user, result = await asyncio.gather(
+                self.find_user(user_id),
+                self.database.run(f"MATCH (u:User {{id: $id}})-[:FRIENDS_WITH]-(f:User) RETURN {user_map('f', fields)} AS f", id=user_id)
+            )
+            if not user:
+                return {"error": "User not found"}, 404
+            return {"friends": [record["f"] for record in result]}, 200
+        except Exception as e:
+            return {"error": str(e)}, 500
+
+    async def check_friendship(self, user_id, friend_id):
+        """Check if two users are friends"""
+        try:
+            user, friend, result = await asyncio.gather(
+                self.find_user(user_id),
+                self.find_user(friend_id),
+                self.database.run(
+                    "MATCH (u:User {id: $user_id})-[r:FRIENDS_WITH]-(f:User {id: $friend_id}) RETURN count(r) AS count",
+                    user_id=user_id, friend_id=friend_id
+                )
+            )
+            if not user or not friend:
+                return {"error": "User or friend not found"}, 404
+
+            if result[0]["count"]:
+                return {"message": "They are friends"}, 200
+            else:
+                return {"message": "They are not friends"}, 200
+        except Exception as e:
+            return {"error": str(e)}, 500
+
+    async def get_mutual_friends(self, user_id, other_id, fields=None):
+        """Get mutual friends between two users"""
+        try:
+            try:
+                fields = parse_fields(fields, "User")
+            except ValueError as e:
+                return {"error": str(e)}, 400
+
+            user, other_user, result = await asyncio.gather(
+                self.find_user(user_id),
+                self.find_user(other_id),
+                self.database.run(
+                    "MATCH (u:User {id: $user_id})-[:FRIENDS_WITH]-(f:User)-[:FRIENDS_WITH]-(o:User {id: $other_id}) "
+                    f"RETURN DISTINCT {user_map('f', fields)} AS f",
+                    user_id=user_id, other_id=other_id
+                )
+            )
+            if not user or not other_user:
+                return {"error": "User or other user not found"}, 404
+
+            return {"mutual_friends": [record["f"] for record in result]}, 200
+        except Exception as e:
+            return {"error": str(e)}, 500
+
+
+class AsyncPostController:
+    def __init__(self, database):
+        self.database = database
+
+    @cached("post:{0}")
+    async def get_post_by_id(self, post_id, fields=None):
+        """Get a post by ID"""
+        try:
+            try:
+                fields = parse_fields(fields, "Post")
+            except ValueError as e:
+                return {"error": str(e)}, 400
+
+            result = await self.database.run(f"MATCH (p:Post {{id: $id}}) RETURN {post_map('p', fields)} AS p", id=post_id)
+            if not result:
+                return {"error": "Post not found"}, 404
+
+            return {"post": result[0]["p"]}, 200
+        except Exception as e:
+            return {"error": str(e)}, 500
+
+    async def get_post_detail(self, post_id, expand, comments_limit=None, comments_after=None, fields=None):
+        """Get a post with its author, a page of comments and its likes count, in one query"""
+        try:
+            try:
+                expand = parse_expand(expand)
+                limit = parse_limit(comments_limit)
+                after_created_at, after_id = decode_cursor(comments_after)
+                fields = parse_fields(fields, "Post")
+            except ValueError as e:
+                return {"error": str(e)}, 400
+
+            result = await self.database.run(
+                detail_query(expand, fields),
+                post_id=post_id, limit=limit + 1, after_created_at=after_created_at, after_id=after_id
+            )
+            if not result:
+                return {"error": "Post not found"}, 404
+
+            return detail_response(result[0], expand, limit), 200
+        except Exception as e:
+            return {"error": str(e)}, 500
+
+    @cached("post:{0}:comments")
+    async def get_post_comments(self, post_id, fields=None):
+        """Get all comments for a post"""
+        try:
+            try:
+                fields = parse_fields(fields, "Comment")
+            except ValueError as e:
+                return {"error": str(e)}, 400
+
+            post, result = await asyncio.gather(
+                self.database.run("MATCH (p:Post {id: $id}) RETURN p.id AS id", id=post_id),
+                self.database.run(
+                    f"MATCH (p:Post {{id: $id}})-[:HAS_COMMENT]->(c:Comment) RETURN {comment_map('c', fields)} AS c", id=post_id
+                )
+            )
+            if not post:
+                return {"error": "Post not found"}, 404
+
+            return {"comments": [record["c"] for record in result]}, 200
+        except Exception as e:
+            return {"error": str(e)}, 500
@@ -0,0 +1,56 @@
+import asyncio
+import contextvars
+from config import Config
+
+# Bookmarks sent with the current request (see app.routing), set per request task
+request_bookmarks = contextvars.ContextVar('request_bookmarks', default=())
+
+
+class AsyncDatabase:
+    """Async Neo4j driver shared by all the requests of the serving event loop.
+
+    The driver is created on first use inside the running loop (drivers are
+    bound to the loop that created them) with the same pool settings as the
+    sync Database. The async views only read: their sessions are read
+    sessions, served by a follower with a neo4j:// URI, and wait for the
+    bookmarks of the request so that a client always sees its own writes.
+    """
+
+    def __init__(self, config=Config):
+        self.config = config
+        self._driver = None
+        self._loop = None
+
+    @property
+    def driver(self):
+        loop = asyncio.get_running_loop()
+        if self._driver is None or self._loop is not loop:
+            from neo4j import AsyncGraphDatabase
+            self._driver = AsyncGraphDatabase.driver(
+                self.config.NEO4J_URI,
+                auth=(self.config.NEO4J_USER, self.config.NEO4J_PASSWORD),
+                max_connection_pool_size=self.config.NEO4J_POOL_SIZE,
+                connection_acquisition_timeout=self.config.NEO4J_POOL_ACQUIRE_TIMEOUT,
+                max_connection_lifetime=self.config.NEO4J_CONNECTION_LIFETIME,
+            )
+            self._loop = loop
+        return self._driver
+
+    async def run(self, cypher, **parameters):
+        """Run a statement in its own read session and return its records as dicts"""
+        from neo4j import READ_ACCESS, Bookmarks
+        bookmarks = request_bookmarks.get()
+        async with self.driver.session(
+            default_access_mode=READ_ACCESS,
+            bookmarks=Bookmarks.from_raw_values(*bookmarks) if bookmarks else None,
+        ) as session:
+            result = await session.run(cypher, parameters)
+            return await result.data()
+
+    async def close(self):
+        if self._driver is not None:
+            await self._driver.close()
+            self._driver = None
+
+
+database = AsyncDatabase(Config)
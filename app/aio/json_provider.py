@@ -0,0 +1,6 @@
+from quart.json.provider import DefaultJSONProvider
+from app.json_provider import FastJSONMixin
+
+
+class JSONProvider(FastJSONMixin, DefaultJSONProvider):
+    """Quart counterpart of app.json_provider.JSONProvider"""
@@ -0,0 +1,91 @@
+from functools import wraps
+from quart import Blueprint, jsonify, make_response, request
+from app.aio.controllers import AsyncUserController, AsyncPostController
+from app.aio.database import database
+from app.post_detail import detail_version_query
+from app.versioning import version_query, validators
+
+# Blueprint names match the sync ones, so that each async view has the same
+# endpoint name as the sync view it replaces.
+user_bp = Blueprint('user_bp', __name__)
+post_bp = Blueprint('post_bp', __name__)
+user_controller = AsyncUserController(database)
+post_controller = AsyncPostController(database)
+
+
+def conditional(label, id_arg, query=None):
+    """Async counterpart of app.versioning.conditional"""
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(**kwargs):
+            statement = query(request) if query else version_query(label)
+            result = await database.run(statement, id=kwargs[id_arg])
+            if not result:
+                return await view(**kwargs)
+
+            etag, last_modified, not_modified = validators(request, result[0]["version"], result[0]["updated_at"])
+            if not_modified:
+                response = await make_response('', 304)
+            else:
+                response = await make_response(await view(**kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag)
+            response.last_modified = last_modified
+            return response
+        return wrapper
+    return decorator
+
+
+@user_bp.route('/<user_id>', methods=['GET'])
+@conditional('User', 'user_id')
+async def get_user(user_id):
+    """Get a user by ID"""
+    result, status_code = await user_controller.get_user_by_id(user_id, fields=request.args.get('fields'))
+    return jsonify(result), status_code
+
+@user_bp.route('/<user_id>/friends', methods=['GET'])
+@conditional('User', 'user_id')
+async def get_friends(user_id):
+    """Get all friends of a user"""
+    result, status_code = await user_controller.get_user_friends(user_id, fields=request.args.get('fields'))
+    return jsonify(result), status_code
+
+@user_bp.route('/<user_id>/friends/<friend_id>', methods=['GET'])
+async def check_friendship(user_id, friend_id):
+    """Check if two users are friends"""
+    result, status_code = await user_controller.check_friendship(user_id, friend_id)
+    return jsonify(result), status_code
+
+@user_bp.route('/<user_id>/mutual-friends/<other_id>', methods=['GET'])
+async def get_mutual_friends(user_id, other_id):
+    """Get mutual friends between two users"""
+    result, status_code = await user_controller.get_mutual_friends(user_id, other_id, fields=request.args.get('fields'))
+    return jsonify(result), status_code
+
+@user_bp.route('/<user_id>/posts', methods=['GET'])
+async def get_user_posts(user_id):
+    """Get all posts by a user"""
+    result, status_code = await user_controller.get_user_posts(user_id, fields=request.args.get('fields'))
+    return jsonify(result), status_code
+
+@post_bp.route('/<post_id>', methods=['GET'])
+@conditional('Post', 'post_id', detail_version_query)
+async def get_post(post_id):
+    """Get a post by ID, with `expand=author,comments,likes` to include related data"""
+    if request.args.get('expand'):
+        result, status_code = await post_controller.get_post_detail(
+            post_id, request.args.get('expand'), request.args.get('comments_limit'), request.args.get('comments_after'),
+            fields=request.args.get('fields')
+        )
+        return jsonify(result), status_code
+
+    result, status_code = await post_controller.get_post_by_id(post_id, fields=request.args.get('fields'))
+    return jsonify(result), status_code
+
+@post_bp.route('/<post_id>/comments', methods=['GET'])
+@conditional('Post', 'post_id')
+async def get_post_comments(post_id):
+    """Get all comments for a post"""
+    result, status_code = await post_controller.get_post_comments(post_id, fields=request.args.get('fields'))
+    return jsonify(result), status_code
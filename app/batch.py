@@ -0,0 +1,64 @@
+from config import Config
+
+
+def validate_items(data, required):
+    """Split a batch body into rows to write and per-item validation errors.
+
+    Each valid row keeps its position in the request as `idx` so that the
+    records returned by the UNWIND query can be matched back to it.
+    """
+    if not isinstance(data, list) or not data:
+        raise ValueError("A non-empty JSON array is required")
+    if len(data) > Config.BATCH_MAX_ITEMS:
+        raise ValueError(f"A batch can contain at most {Config.BATCH_MAX_ITEMS} items")
+
+    fields = ", ".join(required[:-1]) + " and " + required[-1] if len(required) > 1 else required[0]
+    rows, results = [], {}
+    for idx, item in enumerate(data):
+        if not isinstance(item, dict) or any(key not in item for key in required):
+            results[idx] = {"index": idx, "status": 400, "error": f"{fields} are required"}
+        else:
+            rows.append(dict(item, idx=idx))
+    return rows, results
+
+
+def run_in_chunks(graph, cypher, rows):
+    """Run an `UNWIND $rows AS row ...` statement, one transaction per BATCH_CHUNK_SIZE rows.
+
+    Returns the records of the committed chunks and the error of each row
+    whose chunk was rolled back.
+    """
+    records, errors = [], {}
+    for start in range(0, len(rows), Config.BATCH_CHUNK_SIZE):
+        chunk = rows[start:start + Config.BATCH_CHUNK_SIZE]
+        try:
+            with graph.transaction() as tx:
+                records.extend(tx.run(cypher, rows=chunk).data())
+        except Exception as e:
+            errors.update((row["idx"], str(e)) for row in chunk)
+    return records, errors
+
+
+def batch_response(results):
+    """Per-item results in request order, the failed indexes and the overall status"""
+    items = [results[idx] for idx in sorted(results)]
+    failed = [item["index"] for item in items if item["status"] >= 400]
+    return {"results": items, "failed": failed}, 207 if failed else 201
+
+
+def record_results(results, items, records, errors, key, not_written):
+    """Fill in the result of every item sent to the database.
+
+    `items` maps each request index to the entity written for it; an index
+    missing from both the returned `records` and the rolled back `errors`
+    was filtered out by the query and gets the `(status, error)` of `not_written`.
+    """
+    written = {record["idx"] for record in records}
+    status, error = not_written
+    for idx, item in items.items():
+        if idx in written:
+            results[idx] = {"index": idx, "status": 201, key: item}
+        elif idx in errors:
+            results[idx] = {"index": idx, "status": 500, "error": errors[idx]}
+        else:
+            results[idx] = {"index": idx, "status": status, "error": error}
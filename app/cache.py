@@ -0,0 +1,199 @@
+import inspect
+import json
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from config import Config
+
+
+class LRUCache:
+    """In-process LRU cache whose entries expire after `ttl` seconds"""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._set(key, value, ttl)
+
+    def _set(self, key, value, ttl):
+        self._entries[key] = (value, time.monotonic() + (ttl or self.ttl))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def add(self, key, value, ttl=None):
+        """Set `key` unless it holds an unexpired entry, returns whether it was set"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > time.monotonic():
+                return False
+            self._set(key, value, ttl)
+            return True
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        return {
+            "backend": "memory",
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class RedisCache:
+    """Cache shared by all the workers, stored in Redis as JSON"""
+
+    def __init__(self, url, ttl, prefix="api:"):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("CACHE_BACKEND=redis requires the redis package (pip install redis)")
+        self._client = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        value = self._client.get(self.prefix + key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(value)
+
+    def set(self, key, value, ttl=None):
+        self._client.set(self.prefix + key, json.dumps(value), ex=ttl or self.ttl)
+
+    def add(self, key, value, ttl=None):
+        """Set `key` unless it exists (SET NX), returns whether it was set"""
+        return bool(self._client.set(self.prefix + key, json.dumps(value), ex=ttl or self.ttl, nx=True))
+
+    def delete(self, *keys):
+        if keys:
+            self._client.delete(*(self.prefix + key for key in keys))
+
+    def clear(self):
+        for key in self._client.scan_iter(self.prefix + "*"):
+            self._client.delete(key)
+
+    def stats(self):
+        return {
+            "backend": "redis",
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self._client.info("stats").get("evicted_keys"),
+        }
+
+
+class NullCache:
+    """Cache backend used when caching is disabled"""
+
+    def get(self, key):
+        return None
+
+    def set(self, key, value, ttl=None):
+        pass
+
+    def add(self, key, value, ttl=None):
+        return True
+
+    def delete(self, *keys):
+        pass
+
+    def clear(self):
+        pass
+
+    def stats(self):
+        return {"backend": "none"}
+
+
+def make_cache(config):
+    if config.CACHE_BACKEND == 'redis':
+        return RedisCache(config.CACHE_REDIS_URL, config.CACHE_TTL)
+    if config.CACHE_BACKEND == 'memory':
+        return LRUCache(config.CACHE_MAXSIZE, config.CACHE_TTL)
+    return NullCache()
+
+
+cache = make_cache(Config)
+
+
+def cached(key):
+    """Cache the successful results of a controller read method.
+
+    `key` is formatted with the positional arguments of the method, e.g.
+    "post:{0}" for `get_post_by_id(post_id)`. Only 200 responses are cached;
+    the mutation methods delete the keys they affect. Calls with keyword
+    arguments set (e.g. `fields=`) bypass the cache. Works on the async
+    controllers too.
+    """
+    def decorator(method):
+        if inspect.iscoroutinefunction(method):
+            @wraps(method)
+            async def async_wrapper(self, *args, **kwargs):
+                if any(value is not None for value in kwargs.values()):
+                    return await method(self, *args, **kwargs)
+                cache_key = key.format(*args)
+                result = cache.get(cache_key)
+                if result is not None:
+                    return result, 200
+                result, status_code = await method(self, *args)
+                if status_code == 200:
+                    cache.set(cache_key, result)
+                return result, status_code
+            return async_wrapper
+
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if any(value is not None for value in kwargs.values()):
+                return method(self, *args, **kwargs)
+            cache_key = key.format(*args)
+            result = cache.get(cache_key)
+            if result is not None:
+                return result, 200
+            result, status_code = method(self, *args)
+            if status_code == 200:
+                cache.set(cache_key, result)
+            return result, status_code
+        return wrapper
+    return decorator
@@ -0,0 +1,70 @@
+import click
+from flask.cli import AppGroup
+from app.cache import cache
+from app.counters import repair_counters
+from app.database import graph
+from app.feed import rebuild_timelines
+from app.migrations import collapse_friendships
+from app.schema import ensure_schema, schema_status
+
+schema_cli = AppGroup('schema', help="Manage Neo4j constraints and indexes.")
+counters_cli = AppGroup('counters', help="Maintain the like and comment counters.")
+feed_cli = AppGroup('feed', help="Maintain the materialized timelines of the home feed.")
+friends_cli = AppGroup('friends', help="Maintain the FRIENDS_WITH relationships.")
+
+
+@schema_cli.command('init')
+def schema_init():
+    """Create the missing constraints and indexes"""
+    created = ensure_schema(graph)
+    if created:
+        click.echo("Created: " + ", ".join(created))
+    else:
+        click.echo("Schema already up to date")
+
+
+@schema_cli.command('status')
+def schema_report():
+    """List the present and missing constraints and indexes"""
+    status = schema_status(graph)
+    for name, state in status["present"].items():
+        click.echo(f"present  {name} ({state})")
+    for name in status["missing"]:
+        click.echo(f"missing  {name}")
+
+
+@counters_cli.command('repair')
+@click.option('--batch-size', default=1000, show_default=True, help="Nodes updated per transaction.")
+def counters_repair(batch_size):
+    """Recompute the counters of every post and comment from their edges"""
+    fixed = repair_counters(graph, batch_size)
+    for label, count in fixed.items():
+        click.echo(f"{label}: {count} fixed")
+    if any(fixed.values()):
+        cache.clear()
+
+
+@feed_cli.command('rebuild')
+@click.option('--batch-size', default=1000, show_default=True, help="Users processed per transaction.")
+def feed_rebuild(batch_size):
+    """Recompute the timeline of every user from their friends' posts"""
+    users = rebuild_timelines(graph, batch_size)
+    click.echo(f"Rebuilt the timelines of {users} users")
+
+
+@friends_cli.command('collapse')
+@click.option('--batch-size', default=1000, show_default=True, help="Edges deleted per transaction.")
+def friends_collapse(batch_size):
+    """Collapse reciprocal friendship pairs into a single edge"""
+    deleted = collapse_friendships(graph, batch_size)
+    for kind, count in deleted.items():
+        click.echo(f"{kind}: {count} edges deleted")
+    if any(deleted.values()):
+        cache.clear()
+
+
+def register_commands(app):
+    app.cli.add_command(schema_cli)
+    app.cli.add_command(counters_cli)
+    app.cli.add_command(feed_cli)
+    app.cli.add_command(friends_cli)
@@ -1,24 +1,75 @@
 from app.models.comment import Comment
-from py2neo import Graph, Node, Relationship
+from py2neo import Graph
+from app.pagination import parse_limit, decode_cursor, page
+from app.batch import validate_items, run_in_chunks, record_results, batch_response
+from app.cache import cache
+from app.unit_of_work import after_commit
+from app.versioning import touch
+from app.projections import parse_fields, node_dict
+from app.search import parse_search, comment_search_query, KEY as SEARCH_KEY
+from app.trending import trending
 
 
 class CommentController:
     def __init__(self, graph: Graph):
         self.graph = graph
 
-    def get_all_comments(self):
+    def get_all_comments(self, limit=None, after=None, fields=None):
         try:
-            comments = Comment.get_all(self.graph)
-            return {"comments": [comment.to_dict() for comment in comments]}, 200
+            try:
+                limit = parse_limit(limit)
+                after_created_at, after_id = decode_cursor(after)
+                fields = parse_fields(fields, "Comment")
+            except ValueError as e:
+                return {"error": str(e)}, 400
+
+            comments = Comment.get_page(self.graph, limit + 1, after_created_at, after_id, fields)
+            comments, next_cursor = page(comments, limit)
+            return {"comments": comments, "next_cursor": next_cursor}, 200
         except Exception as e:
             return {"error": str(e)}, 500
 
-    def get_comment_by_id(self, comment_id):
+    def stream_comments(self, after=None, fields=None):
+        try:
+            after_created_at, after_id = decode_cursor(after)
+            fields = parse_fields(fields, "Comment")
+        except ValueError as e:
+            return {"error": str(e)}, 400
+
+        return Comment.stream(self.graph, after_created_at, after_id, fields), 200
+
+    def search_comments(self, q, limit=None, after=None, author_id=None, since=None, until=None, fields=None):
         try:
-            comment = Comment.find_by_id(self.graph, comment_id)
+            try:
+                q, since, until = parse_search(q, since, until)
+                limit = parse_limit(limit)
+                after_score, after_id = decode_cursor(after)
+                fields = parse_fields(fields, "Comment")
+            except ValueError as e:
+                return {"error": str(e)}, 400
+
+            result = self.graph.run(
+                comment_search_query(fields),
+                q=q, author_id=author_id, since=since, until=until,
+                after_score=after_score, after_id=after_id, limit=limit + 1
+            ).data()
+            comments = [dict(record["c"], author_id=record["author_id"], score=record["score"]) for record in result]
+            comments, next_cursor = page(comments, limit, SEARCH_KEY)
+            return {"comments": comments, "next_cursor": next_cursor}, 200
+        except Exception as e:
+            return {"error": str(e)}, 500
+
+    def get_comment_by_id(self, comment_id, fields=None):
+        try:
+            try:
+                fields = parse_fields(fields, "Comment")
+            except ValueError as e:
+                return {"error": str(e)}, 400
+
+            comment = Comment.find_projection(self.graph, comment_id, fields)
             if not comment:
                 return {"error": "Comment not found"}, 404
-            return {"comment": comment.to_dict()}, 200
+            return {"comment": comment}, 200
         except Exception as e:
             return {"error": str(e)}, 500
 
@@ -27,74 +78,136 @@ class CommentController:
             if not all(key in data for key in ['content', 'user_id', 'post_id']):
                 return {"error": "Content, user_id, and post_id are required"}, 400
 
-            user = self.graph.evaluate("MATCH (u:User {id: $user_id}) RETURN u", user_id=data['user_id'])
-            post = self.graph.evaluate("MATCH (p:Post {id: $post_id}) RETURN p", post_id=data['post_id'])
+            comment = Comment(data['content'])
+            result = self.graph.run(
+                "OPTIONAL MATCH (u:User {id: $user_id}) "
+                "OPTIONAL MATCH (p:Post {id: $post_id}) "
+                "FOREACH (_ IN CASE WHEN u IS NOT NULL AND p IS NOT NULL THEN [1] ELSE [] END | "
+                "CREATE (u)-[:CREATED]->(:Comment {id: $id, content: $content, created_at: $created_at, version: 1, updated_at: $created_at, like_count: 0})<-[:HAS_COMMENT {created_at: $created_at}]-(p) "
+                f"SET p.comment_count = coalesce(p.comment_count, 0) + 1, {touch('p')}) "
+                "RETURN u IS NOT NULL AS user_found, p IS NOT NULL AS post_found",
+                user_id=data['user_id'], post_id=data['post_id'], **comment.to_dict()
+            ).data()[0]
             
-            if not user:
+            if not result["user_found"]:
                 return {"error": "User not found"}, 404
-            if not post:
+            if not result["post_found"]:
                 return {"error": "Post not found"}, 404
 
-            comment = Comment(data['content'])
-            comment_node = Node("Comment", id=comment.id, content=comment.content, created_at=comment.created_at)
-            self.graph.create(comment_node)
-            
-            self.graph.create(Relationship(user, "CREATED", comment_node))
-            self.graph.create(Relationship(post, "HAS_COMMENT", comment_node))
-
+            after_commit(cache.delete, f"post:{data['post_id']}", f"post:{data['post_id']}:comments")
+            after_commit(trending.comment, self.graph, data['post_id'], comment.created_at)
             return {"comment": comment.to_dict(), "message": "Comment created successfully"}, 201
         except Exception as e:
             return {"error": str(e)}, 500
 
+    def create_comments_batch(self, data):
+        try:
+            try:
+                rows, results = validate_items(data, ['content', 'user_id', 'post_id'])
+            except ValueError as e:
+                return {"error": str(e)}, 400
+
+            comments = {row['idx']: Comment(row['content']).to_dict() for row in rows}
+            records, errors = run_in_chunks(
+                self.graph,
+                "UNWIND $rows AS row "
+                "MATCH (u:User {id: row.user_id}) "
+                "MATCH (p:Post {id: row.post_id}) "
+                "CREATE (u)-[:CREATED]->(:Comment {id: row.id, content: row.content, created_at: row.created_at, version: 1, updated_at: row.created_at, like_count: 0})<-[:HAS_COMMENT {created_at: row.created_at}]-(p) "
+                f"SET p.comment_count = coalesce(p.comment_count, 0) + 1, {touch('p')} "
+                "RETURN row.idx AS idx, row.post_id AS post_id",
+                [dict(comments[row['idx']], idx=row['idx'], user_id=row['user_id'], post_id=row['post_id']) for row in rows]
+            )
+            record_results(results, comments, records, errors, "comment", (404, "User or post not found"))
+            after_commit(cache.delete, *{key for record in records for key in (f"post:{record['post_id']}", f"post:{record['post_id']}:comments")})
+            for record in records:
+                after_commit(trending.comment, self.graph, record['post_id'], comments[record['idx']]['created_at'])
+
+            return batch_response(results)
+        except Exception as e:
+            return {"error": str(e)}, 500
+
     def delete_comment(self, comment_id):
         try:
-            comment = Comment.find_by_id(self.graph, comment_id)
-            if not comment:
+            result = self.graph.run(
+                "MATCH (c:Comment {id: $id}) "
+                "OPTIONAL MATCH (p:Post)-[:HAS_COMMENT]->(c) "
+                f"SET p.comment_count = coalesce(p.comment_count, 1) - 1, {touch('p')} "
+                "WITH c, p.id AS post_id "
+                "DETACH DELETE c "
+                "RETURN post_id",
+                id=comment_id
+            ).data()
+            if not result:
                 return {"error": "Comment not found"}, 404
-            self.graph.run("MATCH (c:Comment {id: $id}) DETACH DELETE c", id=comment_id)
+            after_commit(cache.delete, f"post:{result[0]['post_id']}", f"post:{result[0]['post_id']}:comments")
             return {"message": "Comment deleted successfully"}, 200
         except Exception as e:
             return {"error": str(e)}, 500
     
     def update_comment(self, comment_id, data):
         try:
-            comment = Comment.find_by_id(self.graph, comment_id)
-            if not comment:
+            result = self.graph.run(
+                "MATCH (c:Comment {id: $id}) "
+                f"SET c.content = coalesce($content, c.content), {touch('c')} "
+                "WITH c "
+                "OPTIONAL MATCH (p:Post)-[:HAS_COMMENT]->(c) "
+                f"SET {touch('p')} "
+                "RETURN c, p.id AS post_id",
+                id=comment_id, content=(data or {}).get('content')
+            ).data()
+            if not result:
                 return {"error": "Comment not found"}, 404
             
-            if 'content' in data:
-                comment.content = data['content']
-                self.graph.push(comment)
+            comment = node_dict(result[0]['c'], "Comment")
+            after_commit(cache.delete, f"post:{result[0]['post_id']}:comments")
             
-            return {"comment": comment.to_dict(), "message": "Comment updated successfully"}, 200
+            return {"comment": comment, "message": "Comment updated successfully"}, 200
         except Exception as e:
             return {"error": str(e)}, 500
 
     def like_comment(self, comment_id, user_id):
         try:
-            user = self.graph.evaluate("MATCH (u:User {id: $user_id}) RETURN u", user_id=user_id)
-            comment = self.graph.evaluate("MATCH (c:Comment {id: $comment_id}) RETURN c", comment_id=comment_id)
-            if not user or not comment:
-                return {"error": "User or Comment not found"}, 404
-            
-            existing_like = self.graph.evaluate(
-                "MATCH (u:User {id: $user_id})-[r:LIKES]->(c:Comment {id: $comment_id}) RETURN r",
+            if not user_id:
+                return {"error": "User ID is required"}, 400
+
+            cursor = self.graph.run(
+                "OPTIONAL MATCH (u:User {id: $user_id}) "
+                "OPTIONAL MATCH (c:Comment {id: $comment_id}) "
+                "OPTIONAL MATCH (p:Post)-[:HAS_COMMENT]->(c) "
+                "FOREACH (_ IN CASE WHEN u IS NOT NULL AND c IS NOT NULL THEN [1] ELSE [] END | "
+                "MERGE (u)-[:LIKES]->(c) "
+                f"ON CREATE SET c.like_count = coalesce(c.like_count, 0) + 1, {touch('c')}, {touch('p')}) "
+                "RETURN u IS NOT NULL AND c IS NOT NULL AS found, p.id AS post_id",
                 user_id=user_id, comment_id=comment_id
             )
-            if existing_like:
+            result = cursor.data()[0]
+            if not result["found"]:
+                return {"error": "User or Comment not found"}, 404
+            if not cursor.stats().get("relationships_created"):
                 return {"message": "Comment already liked by this user"}, 200
 
-            self.graph.create(Relationship(user, "LIKES", comment))
+            after_commit(cache.delete, f"post:{result['post_id']}:comments")
+
             return {"message": "Comment liked successfully"}, 201
         except Exception as e:
             return {"error": str(e)}, 500
 
     def unlike_comment(self, comment_id, user_id):
         try:
-            self.graph.run(
-                "MATCH (u:User {id: $user_id})-[r:LIKES]->(c:Comment {id: $comment_id}) DELETE r",
+            if not user_id:
+                return {"error": "User ID is required"}, 400
+
+            post_ids = self.graph.run(
+                "MATCH (u:User {id: $user_id})-[r:LIKES]->(c:Comment {id: $comment_id}) "
+                "OPTIONAL MATCH (p:Post)-[:HAS_COMMENT]->(c) "
+                f"DELETE r SET c.like_count = coalesce(c.like_count, 1) - 1, {touch('c')}, {touch('p')} "
+                "RETURN p.id AS post_id",
                 user_id=user_id, comment_id=comment_id
-            )
+            ).data()
+            if not post_ids:
+                return {"error": "Like not found"}, 404
+            after_commit(cache.delete, *(f"post:{record['post_id']}:comments" for record in post_ids))
             return {"message": "Comment unliked successfully"}, 200
         except Exception as e:
             return {"error": str(e)}, 500
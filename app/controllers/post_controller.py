@@ -1,28 +1,131 @@
-from py2neo import Relationship
+import time
 from app.models.post import Post
-from app.models.user import User
 from app.models.comment import Comment
+from app.pagination import parse_limit, decode_cursor, page
+from app.batch import validate_items, run_in_chunks, record_results, batch_response
+from app.cache import cache, cached
+from app.unit_of_work import after_commit
+from app.versioning import touch
+from app import feed
+from app.post_detail import parse_expand, detail_query, detail_response
+from app.projections import parse_fields, node_dict, user_map, post_map
+from app.search import parse_search, post_search_query, KEY as SEARCH_KEY
+from app.trending import trending
+from config import Config
 
 class PostController:
     def __init__(self, graph):
         self.graph = graph
     
-    def get_all_posts(self):
-        """Get all posts"""
+    def get_all_posts(self, limit=None, after=None, fields=None):
+        """Get a page of posts, ordered by creation date"""
         try:
-            posts = Post.get_all(self.graph)
-            return {"posts": [post.to_dict() for post in posts]}, 200
+            try:
+                limit = parse_limit(limit)
+                after_created_at, after_id = decode_cursor(after)
+                fields = parse_fields(fields, "Post")
+            except ValueError as e:
+                return {"error": str(e)}, 400
+
+            posts = Post.get_page(self.graph, limit + 1, after_created_at, after_id, fields)
+            posts, next_cursor = page(posts, limit)
+            return {"posts": posts, "next_cursor": next_cursor}, 200
+        except Exception as e:
+            return {"error": str(e)}, 500
+
+    def stream_posts(self, after=None, fields=None):
+        """Stream posts one by one, starting after the given cursor"""
+        try:
+            after_created_at, after_id = decode_cursor(after)
+            fields = parse_fields(fields, "Post")
+        except ValueError as e:
+            return {"error": str(e)}, 400
+
+        return Post.stream(self.graph, after_created_at, after_id, fields), 200
+
+    def search_posts(self, q, limit=None, after=None, author_id=None, since=None, until=None, fields=None):
+        """Search posts by keywords in their title and content, most relevant first"""
+        try:
+            try:
+                q, since, until = parse_search(q, since, until)
+                limit = parse_limit(limit)
+                after_score, after_id = decode_cursor(after)
+                fields = parse_fields(fields, "Post")
+            except ValueError as e:
+                return {"error": str(e)}, 400
+
+            result = self.graph.run(
+                post_search_query(fields),
+                q=q, author_id=author_id, since=since, until=until,
+                after_score=after_score, after_id=after_id, limit=limit + 1
+            ).data()
+            posts = [dict(record["p"], author_id=record["author_id"], score=record["score"]) for record in result]
+            posts, next_cursor = page(posts, limit, SEARCH_KEY)
+            return {"posts": posts, "next_cursor": next_cursor}, 200
+        except Exception as e:
+            return {"error": str(e)}, 500
+
+    def get_trending_posts(self, window=None, limit=None, fields=None):
+        """Get the posts with the most recent likes and comments, best score first"""
+        try:
+            try:
+                window = window or Config.TRENDING_WINDOWS.split(',')[0]
+                if window not in trending.windows:
+                    raise ValueError(f"window must be one of {Config.TRENDING_WINDOWS.replace(',', ', ')}")
+                limit = min(parse_limit(limit), Config.TRENDING_TOP_K)
+                fields = parse_fields(fields, "Post")
+            except ValueError as e:
+                return {"error": str(e)}, 400
+
+            ranked = trending.top(self.graph, window, limit)
+            result = self.graph.run(
+                f"MATCH (p:Post) WHERE p.id IN $ids RETURN {post_map('p', fields)} AS p",
+                ids=[post_id for post_id, _ in ranked]
+            ).data()
+            posts = {record["p"]["id"]: record["p"] for record in result}
+            return {
+                "window": window,
+                "posts": [dict(posts[post_id], score=round(score, 4)) for post_id, score in ranked if post_id in posts],
+            }, 200
         except Exception as e:
             return {"error": str(e)}, 500
     
-    def get_post_by_id(self, post_id):
+    @cached("post:{0}")
+    def get_post_by_id(self, post_id, fields=None):
         """Get a post by ID"""
         try:
-            post = Post.find_by_id(post_id, self.graph)
+            try:
+                fields = parse_fields(fields, "Post")
+            except ValueError as e:
+                return {"error": str(e)}, 400
+
+            post = Post.find_projection(post_id, self.graph, fields)
             if not post:
                 return {"error": "Post not found"}, 404
             
-            return {"post": post.to_dict()}, 200
+            return {"post": post}, 200
+        except Exception as e:
+            return {"error": str(e)}, 500
+    
+    def get_post_detail(self, post_id, expand, comments_limit=None, comments_after=None, fields=None):
+        """Get a post with its author, a page of comments and its likes count, in one query"""
+        try:
+            try:
+                expand = parse_expand(expand)
+                limit = parse_limit(comments_limit)
+                after_created_at, after_id = decode_cursor(comments_after)
+                fields = parse_fields(fields, "Post")
+            except ValueError as e:
+                return {"error": str(e)}, 400
+
+            result = self.graph.run(
+                detail_query(expand, fields),
+                post_id=post_id, limit=limit + 1, after_created_at=after_created_at, after_id=after_id
+            ).data()
+            if not result:
+                return {"error": "Post not found"}, 404
+
+            return detail_response(result[0], expand, limit), 200
         except Exception as e:
             return {"error": str(e)}, 500
     
@@ -32,39 +135,68 @@ class PostController:
             if not data or 'title' not in data or 'content' not in data or 'user_id' not in data:
                 return {"error": "Title, content, and user_id are required"}, 400
             
-            user = User.find_by_id(data['user_id'], self.graph)
-            if not user:
-                return {"error": "User not found"}, 404
-            
             post = Post(data['title'], data['content'])
-            self.graph.create(post)
             
-            # Create relationship between User and Post
-            relationship = Relationship(user.__node__, "CREATED", post.__node__)
-            self.graph.create(relationship)
+            # Create the post and its CREATED relationship in a single statement
+            created = self.graph.evaluate(
+                "MATCH (u:User {id: $user_id}) "
+                "CREATE (u)-[:CREATED]->(p:Post {id: $id, title: $title, content: $content, created_at: $created_at, version: 1, updated_at: $created_at, like_count: 0, comment_count: 0}) "
+                "RETURN count(p)",
+                user_id=data['user_id'], **post.to_dict()
+            )
+            if not created:
+                return {"error": "User not found"}, 404
+            
+            feed.push_posts(self.graph, [post.id])
             
             return {"post": post.to_dict(), "message": "Post created successfully"}, 201
         except Exception as e:
             return {"error": str(e)}, 500
     
+    def create_posts_batch(self, data):
+        """Create many posts, one transaction per chunk"""
+        try:
+            try:
+                rows, results = validate_items(data, ['title', 'content', 'user_id'])
+            except ValueError as e:
+                return {"error": str(e)}, 400
+            
+            posts = {row['idx']: Post(row['title'], row['content']).to_dict() for row in rows}
+            records, errors = run_in_chunks(
+                self.graph,
+                "UNWIND $rows AS row "
+                "MATCH (u:User {id: row.user_id}) "
+                "CREATE (u)-[:CREATED]->(:Post {id: row.id, title: row.title, content: row.content, created_at: row.created_at, version: 1, updated_at: row.created_at, like_count: 0, comment_count: 0}) "
+                "RETURN row.idx AS idx",
+                [dict(posts[row['idx']], idx=row['idx'], user_id=row['user_id']) for row in rows]
+            )
+            record_results(results, posts, records, errors, "post", (404, "User not found"))
+            feed.push_posts(self.graph, [posts[record['idx']]['id'] for record in records])
+            
+            return batch_response(results)
+        except Exception as e:
+            return {"error": str(e)}, 500
+
     def update_post(self, post_id, data):
         """Update a post by ID"""
         try:
-            post = Post.find_by_id(post_id, self.graph)
-            if not post:
-                return {"error": "Post not found"}, 404
-            
             if not data:
                 return {"error": "No data provided"}, 400
             
-            if 'title' in data:
-                post.title = data['title']
-            if 'content' in data:
-                post.content = data['content']
+            changes = {key: data[key] for key in ('title', 'content') if key in data}
+            result = self.graph.run(
+                "MATCH (p:Post {id: $post_id}) "
+                f"SET p += $changes, {touch('p')} "
+                "RETURN p",
+                post_id=post_id, changes=changes
+            ).data()
+            if not result:
+                return {"error": "Post not found"}, 404
             
-            self.graph.push(post)
+            post = node_dict(result[0]["p"], "Post")
+            after_commit(cache.delete, f"post:{post_id}")
             
-            return {"post": post.to_dict()}, 200
+            return {"post": post}, 200
         except Exception as e:
             return {"error": str(e)}, 500
     
@@ -77,6 +209,8 @@ class PostController:
             
             # Remove all relationships and the node
             self.graph.run(f"MATCH (p:Post {{id: '{post_id}'}}) DETACH DELETE p")
+            after_commit(cache.delete, f"post:{post_id}", f"post:{post_id}:comments")
+            after_commit(trending.remove, post_id)
             
             return {"message": "Post deleted successfully"}, 200
         except Exception as e:
@@ -85,117 +219,188 @@ class PostController:
     def like_post(self, post_id, data):
         """Like a post"""
         try:
-            post = Post.find_by_id(post_id, self.graph)
-            if not post:
-                return {"error": "Post not found"}, 404
-            
             if not data or 'user_id' not in data:
                 return {"error": "User ID is required"}, 400
             
-            user = User.find_by_id(data['user_id'], self.graph)
-            if not user:
-                return {"error": "User not found"}, 404
-            
-            # Check if already liked
-            result = self.graph.run(
-                f"MATCH (u:User {{id: '{data['user_id']}'}})-[r:LIKES]->(p:Post {{id: '{post_id}'}}) RETURN r"
-            ).data()
+            # MERGE only runs when both nodes exist, and is a no-op if already liked
+            liked_at = time.time()
+            cursor = self.graph.run(
+                "OPTIONAL MATCH (p:Post {id: $post_id}) "
+                "OPTIONAL MATCH (u:User {id: $user_id}) "
+                "FOREACH (_ IN CASE WHEN p IS NOT NULL AND u IS NOT NULL THEN [1] ELSE [] END | "
+                f"MERGE (u)-[r:LIKES]->(p) ON CREATE SET r.created_at = $liked_at, p.like_count = coalesce(p.like_count, 0) + 1, {touch('p')}) "
+                "RETURN p IS NOT NULL AS post_found, u IS NOT NULL AS user_found",
+                post_id=post_id, user_id=data['user_id'], liked_at=liked_at
+            )
+            result = cursor.data()[0]
             
-            if result:
+            if not result["post_found"]:
+                return {"error": "Post not found"}, 404
+            if not result["user_found"]:
+                return {"error": "User not found"}, 404
+            if not cursor.stats().get("relationships_created"):
                 return {"message": "Post already liked by this user"}, 200
             
-            relationship = Relationship(user.__node__, "LIKES", post.__node__)
-            self.graph.create(relationship)
+            after_commit(cache.delete, f"post:{post_id}")
+            after_commit(trending.like, self.graph, post_id, liked_at)
             
             return {"message": "Post liked successfully"}, 201
         except Exception as e:
             return {"error": str(e)}, 500
     
+    def like_posts_batch(self, data):
+        """Create many likes, one transaction per chunk"""
+        try:
+            try:
+                rows, results = validate_items(data, ['user_id', 'post_id'])
+            except ValueError as e:
+                return {"error": str(e)}, 400
+            
+            likes = {}
+            pairs = set()
+            for row in rows:
+                pair = (row['user_id'], row['post_id'])
+                if pair in pairs:
+                    results[row['idx']] = {"index": row['idx'], "status": 200, "message": "Post already liked by this user"}
+                    continue
+                pairs.add(pair)
+                likes[row['idx']] = {"user_id": row['user_id'], "post_id": row['post_id']}
+            
+            liked_at = time.time()
+            records, errors = run_in_chunks(
+                self.graph,
+                "UNWIND $rows AS row "
+                "MATCH (u:User {id: row.user_id}) "
+                "MATCH (p:Post {id: row.post_id}) "
+                "OPTIONAL MATCH (u)-[existing:LIKES]->(p) "
+                f"MERGE (u)-[r:LIKES]->(p) ON CREATE SET r.created_at = row.liked_at, p.like_count = coalesce(p.like_count, 0) + 1, {touch('p')} "
+                "RETURN row.idx AS idx, row.post_id AS post_id, existing IS NULL AS created",
+                [dict(like, idx=idx, liked_at=liked_at) for idx, like in likes.items()]
+            )
+            record_results(results, likes, records, errors, "like", (404, "User or post not found"))
+            after_commit(cache.delete, *{f"post:{record['post_id']}" for record in records})
+            for record in records:
+                if not record['created']:
+                    results[record['idx']] = {"index": record['idx'], "status": 200, "message": "Post already liked by this user"}
+                else:
+                    after_commit(trending.like, self.graph, record['post_id'], liked_at)
+            
+            return batch_response(results)
+        except Exception as e:
+            return {"error": str(e)}, 500
+
     def unlike_post(self, post_id, data):
         """Unlike a post"""
         try:
-            post = Post.find_by_id(post_id, self.graph)
-            if not post:
-                return {"error": "Post not found"}, 404
-            
             if not data or 'user_id' not in data:
                 return {"error": "User ID is required"}, 400
             
-            user = User.find_by_id(data['user_id'], self.graph)
-            if not user:
+            result = self.graph.run(
+                "OPTIONAL MATCH (p:Post {id: $post_id}) "
+                "OPTIONAL MATCH (u:User {id: $user_id}) "
+                "OPTIONAL MATCH (u)-[r:LIKES]->(p) "
+                "WITH p, u, r, r IS NOT NULL AS liked, r.created_at AS liked_at "
+                "FOREACH (_ IN CASE WHEN liked THEN [1] ELSE [] END | "
+                f"SET p.like_count = coalesce(p.like_count, 1) - 1, {touch('p')}) "
+                "DELETE r "
+                "RETURN p IS NOT NULL AS post_found, u IS NOT NULL AS user_found, liked, liked_at",
+                post_id=post_id, user_id=data['user_id']
+            ).data()[0]
+            
+            if not result["post_found"]:
+                return {"error": "Post not found"}, 404
+            if not result["user_found"]:
                 return {"error": "User not found"}, 404
             
-            self.graph.run(
-                f"MATCH (u:User {{id: '{data['user_id']}'}})-[r:LIKES]->(p:Post {{id: '{post_id}'}}) DELETE r"
-            )
+            after_commit(cache.delete, f"post:{post_id}")
+            if result["liked"]:
+                after_commit(trending.unlike, self.graph, post_id, result["liked_at"])
             
             return {"message": "Post unliked successfully"}, 200
         except Exception as e:
             return {"error": str(e)}, 500
     
-    def get_post_comments(self, post_id):
+    @cached("post:{0}:comments")
+    def get_post_comments(self, post_id, fields=None):
         """Get all comments for a post"""
         try:
+            try:
+                fields = parse_fields(fields, "Comment")
+            except ValueError as e:
+                return {"error": str(e)}, 400
+
             post = Post.find_by_id(post_id, self.graph)
             if not post:
                 return {"error": "Post not found"}, 404
             
-            comments = post.get_comments(self.graph)
+            comments = Comment.get_by_post(self.graph, post_id, fields)
             
-            return {"comments": [comment.to_dict() for comment in comments]}, 200
+            return {"comments": comments}, 200
         except Exception as e:
             return {"error": str(e)}, 500
 
     def create_comment(self, post_id, data):
         """Create a comment for a post"""
         try:
-            post = Post.find_by_id(post_id, self.graph)
-            if not post:
-                return {"error": "Post not found"}, 404
-            
             if not data or 'content' not in data or 'user_id' not in data:
                 return {"error": "Content and user ID are required"}, 400
             
-            user = User.find_by_id(data['user_id'], self.graph)
-            if not user:
-                return {"error": "User not found"}, 404
-            
             comment = Comment(data['content'])
-            self.graph.create(comment)
             
-            # Create relationship between Post and Comment
-            relationship = Relationship(post.__node__, "HAS_COMMENT", comment.__node__)
-            self.graph.create(relationship)
+            # Create the comment with its CREATED and HAS_COMMENT relationships in a single statement
+            result = self.graph.run(
+                "OPTIONAL MATCH (p:Post {id: $post_id}) "
+                "OPTIONAL MATCH (u:User {id: $user_id}) "
+                "FOREACH (_ IN CASE WHEN p IS NOT NULL AND u IS NOT NULL THEN [1] ELSE [] END | "
+                "CREATE (u)-[:CREATED]->(:Comment {id: $id, content: $content, created_at: $created_at, version: 1, updated_at: $created_at, like_count: 0})<-[:HAS_COMMENT {created_at: $created_at}]-(p) "
+                f"SET p.comment_count = coalesce(p.comment_count, 0) + 1, {touch('p')}) "
+                "RETURN p IS NOT NULL AS post_found, u IS NOT NULL AS user_found",
+                post_id=post_id, user_id=data['user_id'], **comment.to_dict()
+            ).data()[0]
+            
+            if not result["post_found"]:
+                return {"error": "Post not found"}, 404
+            if not result["user_found"]:
+                return {"error": "User not found"}, 404
+            
+            after_commit(cache.delete, f"post:{post_id}", f"post:{post_id}:comments")
+            after_commit(trending.comment, self.graph, post_id, comment.created_at)
             
             return {"comment": comment.to_dict(), "message": "Comment created successfully"}, 201
         except Exception as e:
             return {"error": str(e)}, 500
 
-    def get_post_creator(self, post_id):
+    def get_post_creator(self, post_id, fields=None):
         """Get the creator of a post"""
         try:
-            post = Post.find_by_id(post_id, self.graph)
-            if not post:
+            try:
+                fields = parse_fields(fields, "User")
+            except ValueError as e:
+                return {"error": str(e)}, 400
+
+            result = self.graph.run(
+                f"MATCH (p:Post {{id: $post_id}}) OPTIONAL MATCH (u:User)-[:CREATED]->(p) RETURN {user_map('u', fields)} AS u",
+                post_id=post_id
+            ).data()
+            if not result:
                 return {"error": "Post not found"}, 404
             
-            creator = post.get_creator(self.graph)
+            creator = result[0]["u"]
             if not creator:
                 return {"error": "Creator not found"}, 404
             
-            return {"creator": creator.to_dict()}, 200
+            return {"creator": creator}, 200
         except Exception as e:
             return {"error": str(e)}, 500
 
     def get_likes_count(self, post_id):
         """Get the number of likes for a post"""
         try:
-            post = Post.find_by_id(post_id, self.graph)
+            post = Post.find_projection(post_id, self.graph, ["like_count"])
             if not post:
                 return {"error": "Post not found"}, 404
             
-            count = post.get_likes_count(self.graph)
-            
-            return {"likes_count": count}, 200
+            return {"likes_count": post["like_count"]}, 200
         except Exception as e:
             return {"error": str(e)}, 500
     
@@ -206,13 +411,16 @@ class PostController:
             if not post:
                 return {"error": "Post not found"}, 404
             
-            comment = Comment.find_by_id(comment_id, self.graph)
+            comment = Comment.find_by_id(self.graph, comment_id)
             if not comment:
                 return {"error": "Comment not found"}, 404
             
             self.graph.run(
-                f"MATCH (p:Post {{id: '{post_id}'}})-[r:HAS_COMMENT]->(c:Comment {{id: '{comment_id}'}}) DELETE r"
+                "MATCH (p:Post {id: $post_id})-[r:HAS_COMMENT]->(c:Comment {id: $comment_id}) DELETE r "
+                f"SET p.comment_count = coalesce(p.comment_count, 1) - 1, {touch('p')}",
+                post_id=post_id, comment_id=comment_id
             )
+            after_commit(cache.delete, f"post:{post_id}", f"post:{post_id}:comments")
             
             return {"message": "Comment deleted successfully"}, 200
         except Exception as e:
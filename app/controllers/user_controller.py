@@ -1,26 +1,98 @@
-from py2neo import Relationship, Node
+from py2neo.errors import ClientError
 from app.models.user import User
 from app.models.post import Post
+from app.pagination import parse_limit, decode_cursor, page
+from app.batch import validate_items, run_in_chunks, record_results, batch_response
+from app.cache import cache, cached
+from app.unit_of_work import after_commit
+from app.versioning import touch
+from app import feed
+from app.paths import CypherAdjacency, shortest_path
+from app.friend_index import friend_index
+from app.projections import parse_fields, select, node_dict, user_map, post_map
+from config import Config
+
+
+def expand_query(var, depth, level=2):
+    """Subquery returning the users `level` to `depth` hops away, as (c, distance).
+
+    Each hop follows at most $fanout friendships, so a supernode on the way
+    cannot blow up the traversal.
+    """
+    hop = f"WITH {var} MATCH ({var})-[:FRIENDS_WITH]-(n{level}:User) WITH n{level} LIMIT $fanout "
+    if level == depth:
+        return hop + f"RETURN n{level} AS c, {level} AS distance"
+    return (
+        hop + f"CALL {{ WITH n{level} RETURN n{level} AS c, {level} AS distance "
+        f"UNION {expand_query(f'n{level}', depth, level + 1)} }} "
+        "RETURN c, distance"
+    )
+
+
+def neighborhood(var, hops, name):
+    """Subquery collecting as `name` the ids of the users at most `hops` friendships from `var`, itself included.
+
+    Only the distinct end nodes are kept, so the planner prunes the
+    variable-length expansion instead of enumerating every path.
+    """
+    return (
+        f"CALL {{ WITH {var} MATCH ({var})-[:FRIENDS_WITH*0..{hops}]-(n:User) "
+        f"RETURN collect(DISTINCT n.id) AS {name} }} "
+    )
+
+
+def recommendation_keys(*user_ids):
+    """Cache keys of the recommendations of the given users, for every depth"""
+    return [
+        f"user:{user_id}:recommendations:{depth}"
+        for user_id in user_ids
+        for depth in range(2, Config.RECOMMENDATIONS_MAX_DEPTH + 1)
+    ]
+
 
 class UserController:
     def __init__(self, graph):
         self.graph = graph
 
-    def get_all_users(self):
-        """Get all users"""
+    def get_all_users(self, limit=None, after=None, fields=None):
+        """Get a page of users, ordered by creation date"""
         try:
-            users = User.get_all(self.graph)
-            return {"users": [user.to_dict() for user in users]}, 200
+            try:
+                limit = parse_limit(limit)
+                after_created_at, after_id = decode_cursor(after)
+                fields = parse_fields(fields, "User")
+            except ValueError as e:
+                return {"error": str(e)}, 400
+
+            users = User.get_page(self.graph, limit + 1, after_created_at, after_id, fields)
+            users, next_cursor = page(users, limit)
+            return {"users": users, "next_cursor": next_cursor}, 200
         except Exception as e:
             return {"error": str(e)}, 500
 
-    def get_user_by_id(self, user_id):
+    def stream_users(self, after=None, fields=None):
+        """Stream users one by one, starting after the given cursor"""
+        try:
+            after_created_at, after_id = decode_cursor(after)
+            fields = parse_fields(fields, "User")
+        except ValueError as e:
+            return {"error": str(e)}, 400
+
+        return User.stream(self.graph, after_created_at, after_id, fields), 200
+
+    @cached("user:{0}")
+    def get_user_by_id(self, user_id, fields=None):
         """Get a user by ID"""
         try:
-            user = User.find_by_id(user_id, self.graph)
+            try:
+                fields = parse_fields(fields, "User")
+            except ValueError as e:
+                return {"error": str(e)}, 400
+
+            user = User.find_projection(user_id, self.graph, fields)
             if not user:
                 return {"error": "User not found"}, 404
-            return {"user": user.to_dict()}, 200
+            return {"user": user}, 200
         except Exception as e:
             return {"error": str(e)}, 500
 
@@ -30,7 +102,7 @@ class UserController:
             if not data or 'name' not in data or 'email' not in data:
                 return {"error": "Name and email are required"}, 400
             
-            existing_user = self.graph.run(f"MATCH (u:User {{email: '{data['email']}'}}) RETURN u").data()
+            existing_user = self.graph.run("MATCH (u:User {email: $email}) RETURN u", email=data['email']).data()
             if existing_user:
                 return {"error": "Email already registered"}, 400
             
@@ -38,74 +110,159 @@ class UserController:
             self.graph.create(user)
             
             return {"user": user.to_dict(), "message": "User created successfully"}, 201
+        except ClientError as e:
+            # A concurrent sign-up with the same email passed the check first: user_email_unique rejects this one
+            if e.title == "ConstraintValidationFailed":
+                return {"error": "Email already registered"}, 400
+            return {"error": str(e)}, 500
+        except Exception as e:
+            return {"error": str(e)}, 500
+
+    def create_users_batch(self, data):
+        """Create many users, one transaction per chunk"""
+        try:
+            try:
+                rows, results = validate_items(data, ['name', 'email'])
+            except ValueError as e:
+                return {"error": str(e)}, 400
+            
+            users = {}
+            emails = set()
+            for row in rows:
+                if row['email'] in emails:
+                    results[row['idx']] = {"index": row['idx'], "status": 400, "error": "Email already registered"}
+                    continue
+                emails.add(row['email'])
+                users[row['idx']] = User(row['name'], row['email']).to_dict()
+            
+            records, errors = run_in_chunks(
+                self.graph,
+                "UNWIND $rows AS row "
+                "OPTIONAL MATCH (e:User {email: row.email}) "
+                "WITH row, e WHERE e IS NULL "
+                "CREATE (:User {id: row.id, name: row.name, email: row.email, created_at: row.created_at, version: 1, updated_at: row.created_at}) "
+                "RETURN row.idx AS idx",
+                [dict(user, idx=idx) for idx, user in users.items()]
+            )
+            record_results(results, users, records, errors, "user", (400, "Email already registered"))
+            
+            return batch_response(results)
         except Exception as e:
             return {"error": str(e)}, 500
 
     def update_user(self, user_id, data):
         """Update a user's details"""
         try:
-            user = User.find_by_id(user_id, self.graph)
-            if not user:
-                return {"error": "User not found"}, 404
-            
             if not data:
                 return {"error": "No data provided"}, 400
             
-            if 'name' in data:
-                user.name = data['name']
-            if 'email' in data:
-                user.email = data['email']
+            changes = {key: data[key] for key in ('name', 'email') if key in data}
+            # Also return the friends, whose friend list shows this user, and the
+            # users close enough to be recommended this user
+            result = self.graph.run(
+                "MATCH (u:User {id: $user_id}) "
+                f"SET u += $changes, {touch('u')} "
+                "WITH u "
+                f"{neighborhood('u', Config.RECOMMENDATIONS_MAX_DEPTH, 'nearby')}"
+                "OPTIONAL MATCH (f:User)-[:FRIENDS_WITH]-(u) "
+                f"SET {touch('f')} "
+                "RETURN u, collect(f.id) AS friends, nearby",
+                user_id=user_id, changes=changes
+            ).data()
+            if not result:
+                return {"error": "User not found"}, 404
             
-            self.graph.push(user)
+            user = node_dict(result[0]["u"], "User")
+            after_commit(cache.delete, f"user:{user_id}", *(f"user:{friend}:friends" for friend in result[0]["friends"]),
+                         *recommendation_keys(*result[0]["nearby"]))
             
-            return {"user": user.to_dict()}, 200
+            return {"user": user}, 200
         except Exception as e:
             return {"error": str(e)}, 500
 
     def delete_user(self, user_id):
         """Delete a user"""
         try:
-            user = User.find_by_id(user_id, self.graph)
-            if not user:
+            # Remove all relationships before deleting the node
+            # Their likes disappear with them, so the like counters are decremented first,
+            # and the posts of the liked comments change with them
+            # The users close enough to be recommended this user, or whose
+            # recommendations went through their friendships, are collected first
+            result = self.graph.run(
+                "MATCH (u:User {id: $user_id}) "
+                f"{neighborhood('u', Config.RECOMMENDATIONS_MAX_DEPTH, 'nearby')}"
+                "OPTIONAL MATCH (u)-[:LIKES]->(liked) "
+                "OPTIONAL MATCH (owner:Post)-[:HAS_COMMENT]->(liked) "
+                f"SET liked.like_count = coalesce(liked.like_count, 1) - 1, {touch('liked')}, {touch('owner')} "
+                "WITH u, nearby, [x IN collect(liked) WHERE x:Post | x.id] AS liked_posts, collect(DISTINCT owner.id) AS commented_posts "
+                "OPTIONAL MATCH (f:User)-[:FRIENDS_WITH]-(u) "
+                f"SET {touch('f')} "
+                "WITH u, nearby, liked_posts, commented_posts, collect(f.id) AS friends "
+                "DETACH DELETE u "
+                "RETURN friends, nearby, liked_posts, commented_posts",
+                user_id=user_id
+            ).data()
+            if not result:
                 return {"error": "User not found"}, 404
             
-            # Remove all relationships before deleting the node
-            self.graph.run(f"MATCH (u:User {{id: '{user_id}'}}) DETACH DELETE u")
+            after_commit(cache.delete, f"user:{user_id}", f"user:{user_id}:friends",
+                         *(f"user:{friend}:friends" for friend in result[0]["friends"]),
+                         *(f"post:{post_id}" for post_id in result[0]["liked_posts"]),
+                         *(f"post:{post_id}:comments" for post_id in result[0]["commented_posts"]),
+                         *recommendation_keys(*result[0]["nearby"]))
+            after_commit(friend_index.remove_user, user_id)
             
             return {"message": "User deleted successfully"}, 200
         except Exception as e:
             return {"error": str(e)}, 500
 
-    def get_user_posts(self, user_id):
+    def get_user_posts(self, user_id, fields=None):
         """Get all posts created by a user"""
         try:
+            try:
+                fields = parse_fields(fields, "Post")
+            except ValueError as e:
+                return {"error": str(e)}, 400
+
             user = User.find_by_id(user_id, self.graph)
             if not user:
                 return {"error": "User not found"}, 404
             
-            posts = Post.get_by_user(user_id, self.graph)
+            posts = Post.get_by_user(user_id, self.graph, fields)
             
-            return {"posts": [post.to_dict() for post in posts]}, 200
+            return {"posts": posts}, 200
         except Exception as e:
             return {"error": str(e)}, 500
 
-    def get_user_friends(self, user_id):
+    @cached("user:{0}:friends")
+    def get_user_friends(self, user_id, fields=None):
         """Get all friends of a user"""
         try:
+            try:
+                fields = parse_fields(fields, "User")
+            except ValueError as e:
+                return {"error": str(e)}, 400
+
             user = User.find_by_id(user_id, self.graph)
             if not user:
                 return {"error": "User not found"}, 404
             
-            result = self.graph.run(f"MATCH (u:User {{id: '{user_id}'}})-[:FRIENDS_WITH]->(f:User) RETURN f").data()
-            friends = [User.wrap(record["f"]) for record in result]
+            result = self.graph.run(
+                f"MATCH (u:User {{id: $user_id}})-[:FRIENDS_WITH]-(f:User) RETURN {user_map('f', fields)} AS f", user_id=user_id
+            ).data()
             
-            return {"friends": [friend.to_dict() for friend in friends]}, 200
+            return {"friends": [record["f"] for record in result]}, 200
         except Exception as e:
             return {"error": str(e)}, 500
     
     def check_friendship(self, user_id, friend_id):
         """Check if two users are friends"""
         try:
+            if friend_index.covers(user_id, friend_id):
+                if friend_index.is_friend(user_id, friend_id):
+                    return {"message": "They are friends"}, 200
+                return {"message": "They are not friends"}, 200
+            
             user = User.find_by_id(user_id, self.graph)
             friend = User.find_by_id(friend_id, self.graph)
             
@@ -113,7 +270,8 @@ class UserController:
                 return {"error": "User or friend not found"}, 404
             
             result = self.graph.run(
-                f"MATCH (u:User {{id: '{user_id}'}})-[r:FRIENDS_WITH]->(f:User {{id: '{friend_id}'}}) RETURN r"
+                "MATCH (u:User {id: $user_id})-[r:FRIENDS_WITH]-(f:User {id: $friend_id}) RETURN r LIMIT 1",
+                user_id=user_id, friend_id=friend_id
             ).data()
             
             if result:
@@ -128,23 +286,35 @@ class UserController:
         try:
             if not data or 'friend_id' not in data:
                 return {"error": "Friend ID is required"}, 400
+            if data['friend_id'] == user_id:
+                return {"error": "A user cannot be their own friend"}, 400
+            
+            # A friendship is a single FRIENDS_WITH edge, matched in either direction:
+            # MERGE only runs when both users exist, and is a no-op if already friends.
+            # The new edge changes the recommendations of the users close to either end
+            hops = Config.RECOMMENDATIONS_MAX_DEPTH - 1
+            cursor = self.graph.run(
+                "OPTIONAL MATCH (u:User {id: $user_id}) "
+                "OPTIONAL MATCH (f:User {id: $friend_id}) "
+                "FOREACH (_ IN CASE WHEN u IS NOT NULL AND f IS NOT NULL THEN [1] ELSE [] END | "
+                f"MERGE (u)-[:FRIENDS_WITH]-(f) ON CREATE SET {touch('u')}, {touch('f')}) "
+                "WITH u, f "
+                f"{neighborhood('u', hops, 'near_user')}{neighborhood('f', hops, 'near_friend')}"
+                "RETURN u IS NOT NULL AND f IS NOT NULL AS found, near_user + near_friend AS affected",
+                user_id=user_id, friend_id=data['friend_id']
+            )
+            result = cursor.data()[0]
             
-            user = User.find_by_id(user_id, self.graph)
-            friend = User.find_by_id(data['friend_id'], self.graph)
-            
-            if not user or not friend:
+            if not result["found"]:
                 return {"error": "User or friend not found"}, 404
-            
-            # Check if they are already friends
-            result = self.graph.run(
-                f"MATCH (u:User {{id: '{user_id}'}})-[r:FRIENDS_WITH]->(f:User {{id: '{data['friend_id']}'}}) RETURN r"
-            ).data()
-            
-            if result:
+            if not cursor.stats().get("relationships_created"):
                 return {"message": "Already friends"}, 200
             
-            relationship = Relationship(user.__node__, "FRIENDS_WITH", friend.__node__)
-            self.graph.create(relationship)
+            after_commit(cache.delete, f"user:{user_id}:friends", f"user:{data['friend_id']}:friends",
+                         *recommendation_keys(*set(result["affected"])))
+            after_commit(friend_index.add, user_id, data['friend_id'])
+            feed.follow(self.graph, user_id, data['friend_id'])
+            feed.follow(self.graph, data['friend_id'], user_id)
             
             return {"message": "Friend added successfully"}, 201
         except Exception as e:
@@ -156,23 +326,46 @@ class UserController:
             if not friend_id:
                 return {"error": "Friend ID is required"}, 400
             
-            user = User.find_by_id(user_id, self.graph)
-            friend = User.find_by_id(friend_id, self.graph)
-            
-            if not user or not friend:
+            # The users close to either end are collected before the edge goes
+            hops = Config.RECOMMENDATIONS_MAX_DEPTH - 1
+            result = self.graph.run(
+                "OPTIONAL MATCH (u:User {id: $user_id}) "
+                "OPTIONAL MATCH (f:User {id: $friend_id}) "
+                "OPTIONAL MATCH (u)-[r:FRIENDS_WITH]-(f) "
+                f"{neighborhood('u', hops, 'near_user')}{neighborhood('f', hops, 'near_friend')}"
+                f"FOREACH (_ IN CASE WHEN r IS NOT NULL THEN [1] ELSE [] END | SET {touch('u')}, {touch('f')}) "
+                "WITH u, f, r, r IS NOT NULL AS removed, near_user + near_friend AS affected "
+                "DELETE r "
+                "RETURN u IS NOT NULL AND f IS NOT NULL AS found, CASE WHEN removed THEN affected ELSE [] END AS affected",
+                user_id=user_id, friend_id=friend_id
+            ).data()[0]
+            
+            if not result["found"]:
                 return {"error": "User or friend not found"}, 404
             
-            self.graph.run(
-                f"MATCH (u:User {{id: '{user_id}'}})-[r:FRIENDS_WITH]->(f:User {{id: '{friend_id}'}}) DELETE r"
-            )
+            after_commit(cache.delete, f"user:{user_id}:friends", f"user:{friend_id}:friends",
+                         *recommendation_keys(*set(result["affected"])))
+            after_commit(friend_index.remove, user_id, friend_id)
+            feed.unfollow(self.graph, user_id, friend_id)
+            feed.unfollow(self.graph, friend_id, user_id)
             
             return {"message": "Friend removed successfully"}, 200
         except Exception as e:
             return {"error": str(e)}, 500
         
-    def get_mutual_friends(self, user_id, other_id):
+    def get_mutual_friends(self, user_id, other_id, fields=None):
         """Get mutual friends between two users"""
         try:
+            try:
+                fields = parse_fields(fields, "User")
+            except ValueError as e:
+                return {"error": str(e)}, 400
+
+            if friend_index.covers(user_id, other_id):
+                mutual_ids = friend_index.mutual_friends(user_id, other_id)
+                result = self.graph.run(f"MATCH (f:User) WHERE f.id IN $ids RETURN {user_map('f', fields)} AS f", ids=mutual_ids).data()
+                return {"mutual_friends": [record["f"] for record in result]}, 200
+            
             user = User.find_by_id(user_id, self.graph)
             other_user = User.find_by_id(other_id, self.graph)
             
@@ -180,29 +373,149 @@ class UserController:
                 return {"error": "User or other user not found"}, 404
             
             result = self.graph.run(
-                f"MATCH (u:User {{id: '{user_id}'}})-[:FRIENDS_WITH]->(f:User)<-[:FRIENDS_WITH]-(o:User {{id: '{other_id}'}}) RETURN f"
+                "MATCH (u:User {id: $user_id})-[:FRIENDS_WITH]-(f:User)-[:FRIENDS_WITH]-(o:User {id: $other_id}) "
+                f"RETURN DISTINCT {user_map('f', fields)} AS f",
+                user_id=user_id, other_id=other_id
             ).data()
             
-            mutual_friends = [User.wrap(record["f"]) for record in result]
-            
-            return {"mutual_friends": [friend.to_dict() for friend in mutual_friends]}, 200
+            return {"mutual_friends": [record["f"] for record in result]}, 200
         except Exception as e:
             return {"error": str(e)}, 500
 
-    def get_user_likes(self, user_id):
+    def get_feed(self, user_id, limit=None, after=None, fields=None):
+        """Get a page of the posts of a user's friends, newest first"""
+        try:
+            try:
+                limit = parse_limit(limit)
+                before_created_at, before_id = decode_cursor(after)
+                fields = parse_fields(fields, "Post")
+            except ValueError as e:
+                return {"error": str(e)}, 400
+
+            result = feed.get_page(self.graph, user_id, limit + 1, before_created_at, before_id, fields=fields)
+            if not result and not User.find_by_id(user_id, self.graph):
+                return {"error": "User not found"}, 404
+
+            posts = [dict(record["p"], author_id=record["author_id"]) for record in result]
+            posts, next_cursor = page(posts, limit)
+            return {"feed": posts, "next_cursor": next_cursor}, 200
+        except Exception as e:
+            return {"error": str(e)}, 500
+
+    def get_recommendations(self, user_id, depth=None, limit=None, fields=None):
+        """Get the users a user may know, ranked by mutual friends"""
+        try:
+            try:
+                depth = int(depth) if depth else Config.RECOMMENDATIONS_DEPTH
+                limit = int(limit) if limit else Config.RECOMMENDATIONS_LIMIT
+            except ValueError:
+                return {"error": "depth and limit must be integers"}, 400
+            try:
+                fields = parse_fields(fields, "User")
+            except ValueError as e:
+                return {"error": str(e)}, 400
+            if not 2 <= depth <= Config.RECOMMENDATIONS_MAX_DEPTH:
+                return {"error": f"depth must be between 2 and {Config.RECOMMENDATIONS_MAX_DEPTH}"}, 400
+            if limit < 1:
+                return {"error": "limit must be a positive integer"}, 400
+
+            result, status_code = self.rank_recommendations(user_id, depth)
+            if status_code != 200:
+                return result, status_code
+            # The ranking is cached with all the fields, `fields` is applied to a copy
+            recommendations = [
+                dict(recommendation, user=select(recommendation["user"], fields))
+                for recommendation in result["recommendations"][:limit]
+            ]
+            return {"recommendations": recommendations}, 200
+        except Exception as e:
+            return {"error": str(e)}, 500
+
+    @cached("user:{0}:recommendations:{1}")
+    def rank_recommendations(self, user_id, depth):
+        """Rank the RECOMMENDATIONS_LIMIT best candidates up to `depth` hops away"""
+        try:
+            result = self.graph.run(
+                "MATCH (u:User {id: $user_id}) "
+                "CALL { WITH u MATCH (u)-[:FRIENDS_WITH]-(f:User) RETURN f LIMIT $fanout } "
+                f"CALL {{ {expand_query('f', depth)} }} "
+                "WITH u, f, c, distance WHERE c <> u AND NOT (u)-[:FRIENDS_WITH]-(c) "
+                "WITH c, f, min(distance) AS distance "
+                "WITH c, min(distance) AS distance, count(CASE WHEN distance = 2 THEN 1 END) AS mutual_friends, count(f) AS connections "
+                f"RETURN {user_map('c')} AS c, mutual_friends, distance "
+                "ORDER BY mutual_friends DESC, connections DESC, distance, c.id LIMIT $limit",
+                user_id=user_id, fanout=Config.RECOMMENDATIONS_FANOUT, limit=Config.RECOMMENDATIONS_LIMIT
+            ).data()
+            if not result and not User.find_by_id(user_id, self.graph):
+                return {"error": "User not found"}, 404
+
+            recommendations = [
+                {"user": record["c"], "mutual_friends": record["mutual_friends"], "distance": record["distance"]}
+                for record in result
+            ]
+            return {"recommendations": recommendations}, 200
+        except Exception as e:
+            return {"error": str(e)}, 500
+
+    def get_path(self, user_id, other_id, max_depth=None, fields=None):
+        """Get a shortest chain of friendships from one user to another"""
+        try:
+            try:
+                max_depth = int(max_depth) if max_depth else Config.PATH_MAX_DEPTH
+            except ValueError:
+                return {"error": "max_depth must be an integer"}, 400
+            try:
+                fields = parse_fields(fields, "User")
+            except ValueError as e:
+                return {"error": str(e)}, 400
+            if not 1 <= max_depth <= Config.PATH_MAX_DEPTH:
+                return {"error": f"max_depth must be between 1 and {Config.PATH_MAX_DEPTH}"}, 400
+
+            found = self.graph.evaluate(
+                "MATCH (u:User) WHERE u.id IN [$user_id, $other_id] RETURN count(DISTINCT u.id)",
+                user_id=user_id, other_id=other_id
+            )
+            if found < len({user_id, other_id}):
+                return {"error": "User or other user not found"}, 404
+
+            def path_users(path):
+                return {
+                    record["u"]["id"]: record["u"]
+                    for record in self.graph.run(f"MATCH (u:User) WHERE u.id IN $ids RETURN {user_map('u', fields)} AS u", ids=path or []).data()
+                }
+
+            adjacency = friend_index if friend_index.loaded else CypherAdjacency(self.graph)
+            path, expanded = shortest_path(adjacency, user_id, other_id, max_depth)
+            users = path_users(path)
+            if path is not None and adjacency is friend_index and any(node not in users for node in path):
+                # The index of this process is stale (e.g. a user on the path was deleted since): search Neo4j instead
+                path, more = shortest_path(CypherAdjacency(self.graph), user_id, other_id, max_depth)
+                expanded += more
+                users = path_users(path)
+            if path is None or any(node not in users for node in path):
+                return {"error": f"No path within {max_depth} hops", "nodes_expanded": expanded}, 404
+
+            return {"path": [users[node] for node in path], "depth": len(path) - 1, "nodes_expanded": expanded}, 200
+        except Exception as e:
+            return {"error": str(e)}, 500
+
+    def get_user_likes(self, user_id, fields=None):
         """Get all posts liked by a user"""
         try:
+            try:
+                fields = parse_fields(fields, "Post")
+            except ValueError as e:
+                return {"error": str(e)}, 400
+
             user = User.find_by_id(user_id, self.graph)
             if not user:
                 return {"error": "User not found"}, 404
             
             result = self.graph.run(
-                f"MATCH (u:User {{id: '{user_id}'}})-[:LIKES]->(p:Post) RETURN p"
+                f"MATCH (u:User {{id: $user_id}})-[:LIKES]->(p:Post) RETURN {post_map('p', fields)} AS p", user_id=user_id
             ).data()
             
-            liked_posts = [Post.wrap(record["p"]) for record in result]
-            
-            return {"liked_posts": [post.to_dict() for post in liked_posts]}, 200
+            return {"liked_posts": [record["p"] for record in result]}, 200
         except Exception as e:
             return {"error": str(e)}, 500
         
@@ -213,22 +526,20 @@ class UserController:
             if not data or 'title' not in data or 'content' not in data:
                 return {"error": "Title and content are required"}, 400
             
-            user = User.find_by_id(user_id, self.graph)
-            if not user:
-                return {"error": "User not found"}, 404
-            
             # Passer title et content au constructeur
-            post = Post(data['title'], data['content'], user)
-            
-            # Ajouter title dans le nœud Neo4j
-            post_node = Node("Post", 
-                            id=post.id, 
-                            title=post.title,
-                            content=post.content, 
-                            created_at=post.created_at)
-            self.graph.create(post_node)
+            post = Post(data['title'], data['content'])
+            
+            # Créer le post et la relation CREATED en une seule requête
+            created = self.graph.evaluate(
+                "MATCH (u:User {id: $user_id}) "
+                "CREATE (u)-[:CREATED]->(p:Post {id: $id, title: $title, content: $content, created_at: $created_at, version: 1, updated_at: $created_at, like_count: 0, comment_count: 0}) "
+                "RETURN count(p)",
+                user_id=user_id, **post.to_dict()
+            )
+            if not created:
+                return {"error": "User not found"}, 404
             
-            self.graph.create(Relationship(user.__node__, "CREATED", post_node))
+            feed.push_posts(self.graph, [post.id])
             
             return {"post": post.to_dict(), "message": "Post created successfully"}, 201
         except Exception as e:
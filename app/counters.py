@@ -0,0 +1,39 @@
+from app.versioning import touch
+
+# Each statement recomputes a counter from the edges it mirrors and only
+# writes (and bumps the version of) the nodes that drifted.
+REPAIRS = {
+    "Post": (
+        "MATCH (p:Post) "
+        "CALL { "
+        "WITH p "
+        "WITH p, COUNT { (p)<-[:LIKES]-(:User) } AS likes, COUNT { (p)-[:HAS_COMMENT]->(:Comment) } AS comments "
+        "WHERE p.like_count IS NULL OR p.like_count <> likes "
+        "OR p.comment_count IS NULL OR p.comment_count <> comments "
+        f"SET p.like_count = likes, p.comment_count = comments, {touch('p')} "
+        "RETURN p.id AS fixed "
+        "} IN TRANSACTIONS OF $batch_size ROWS "
+        "RETURN count(fixed) AS fixed"
+    ),
+    "Comment": (
+        "MATCH (c:Comment) "
+        "CALL { "
+        "WITH c "
+        "WITH c, COUNT { (c)<-[:LIKES]-(:User) } AS likes "
+        "WHERE c.like_count IS NULL OR c.like_count <> likes "
+        f"SET c.like_count = likes, {touch('c')} "
+        "RETURN c.id AS fixed "
+        "} IN TRANSACTIONS OF $batch_size ROWS "
+        "RETURN count(fixed) AS fixed"
+    ),
+}
+
+
+def repair_counters(graph, batch_size=1000):
+    """Recompute the like and comment counters from the edges.
+
+    Returns the number of nodes fixed per label. The writes are committed
+    every `batch_size` nodes, so the job can run on a live database and be
+    interrupted and restarted at any time.
+    """
+    return {label: graph.evaluate(cypher, batch_size=batch_size) or 0 for label, cypher in REPAIRS.items()}
@@ -1,6 +1,232 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from flask import g, has_app_context
 from py2neo import Graph
+from app.routing import reading, record_bookmark
 from config import Config
 
-# Initialize Neo4j connection
-print("Connecting to Neo4j...")
-graph = Graph(Config.NEO4J_URI, auth=(Config.NEO4J_USER, Config.NEO4J_PASSWORD))
\ No newline at end of file
+
+class PoolTimeout(Exception):
+    """No connection could be acquired within NEO4J_POOL_ACQUIRE_TIMEOUT"""
+
+
+class Database:
+    """Neo4j connection pool, opened lazily once per process.
+
+    The py2neo Graph is only created on first use and re-created when the
+    process id changes, so workers forked after import (gunicorn pre-fork)
+    never share a socket with their parent. Every statement leases one of
+    NEO4J_POOL_SIZE slots, which bounds the number of connections and lets
+    a request fail with PoolTimeout instead of waiting forever for one.
+    """
+
+    def __init__(self, config=Config):
+        self.config = config
+        self._lock = threading.Lock()
+        self._pid = None
+        self._graph = None
+        self._slots = None
+        self._reset_stats()
+
+    def _reset_stats(self):
+        self._leased = 0
+        self._waiting = 0
+        self._acquisitions = 0
+        self._timeouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def _open(self):
+        print("Connecting to Neo4j...")
+        self._attach(Graph(
+            self.config.NEO4J_URI,
+            auth=(self.config.NEO4J_USER, self.config.NEO4J_PASSWORD),
+            max_size=self.config.NEO4J_POOL_SIZE,
+            max_age=self.config.NEO4J_CONNECTION_LIFETIME,
+        ))
+
+    def _attach(self, graph):
+        self._graph = graph
+        self._slots = threading.BoundedSemaphore(self.config.NEO4J_POOL_SIZE)
+        self._reset_stats()
+        self._pid = os.getpid()
+
+    def attach(self, graph):
+        """Serve this process from `graph` instead of a new connection, e.g. a benchmark stand-in"""
+        with self._lock:
+            self._attach(graph)
+
+    @property
+    def graph(self):
+        """The py2neo Graph of the current process"""
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._open()
+        return self._graph
+
+    @contextmanager
+    def lease(self):
+        """Hold a pool slot for the duration of the block"""
+        graph = self.graph
+        start = time.perf_counter()
+        with self._lock:
+            self._waiting += 1
+        acquired = self._slots.acquire(timeout=self.config.NEO4J_POOL_ACQUIRE_TIMEOUT)
+        waited = time.perf_counter() - start
+        with self._lock:
+            self._waiting -= 1
+            if not acquired:
+                self._timeouts += 1
+            else:
+                self._leased += 1
+                self._acquisitions += 1
+                self._wait_total += waited
+                self._wait_max = max(self._wait_max, waited)
+        if not acquired:
+            raise PoolTimeout(f"No Neo4j connection available after {waited:.1f}s")
+        try:
+            yield graph
+        finally:
+            with self._lock:
+                self._leased -= 1
+            self._slots.release()
+
+    def stats(self):
+        """Pool usage of the current process"""
+        if self._pid != os.getpid():
+            return {"pid": os.getpid(), "connected": False}
+        # One pool per server: several with a neo4j:// (routing) URI
+        pools = getattr(self._graph.service.connector, "_pools", {})
+        opened = sum(pool.size for pool in pools.values())
+        in_use = sum(pool.in_use for pool in pools.values())
+        return {
+            "pid": self._pid,
+            "connected": True,
+            "max_size": self.config.NEO4J_POOL_SIZE,
+            "connections": opened,
+            "in_use": in_use,
+            "idle": opened - in_use,
+            "leased": self._leased,
+            "waiting": self._waiting,
+            "acquisitions": self._acquisitions,
+            "timeouts": self._timeouts,
+            "wait_ms_total": round(self._wait_total * 1000, 3),
+            "wait_ms_avg": round(self._wait_total * 1000 / self._acquisitions, 3) if self._acquisitions else 0.0,
+            "wait_ms_max": round(self._wait_max * 1000, 3),
+            "servers": {
+                str(address): {"connections": pool.size, "in_use": pool.in_use}
+                for address, pool in pools.items()
+            },
+        }
+
+
+def current_unit():
+    """The unit of work of the current request, if one is open (see app.unit_of_work)"""
+    return g.get('unit_of_work') if has_app_context() else None
+
+
+class GraphProxy:
+    """Drop-in replacement for the shared py2neo Graph used by the controllers.
+
+    Every statement is timed and reported to the `observers`, called as
+    observer(cypher, parameters, seconds, result). Inside a unit of work the
+    statements and OGM writes run in its transaction, otherwise each one is
+    its own auto-commit transaction: a read transaction, served by a follower
+    with a `neo4j://` URI, during the GET requests (see app.routing).
+    """
+
+    def __init__(self, database):
+        self.database = database
+        self.observers = []
+
+    def observe(self, run, cypher, parameters, kwparameters):
+        if not self.observers:
+            return run(cypher, parameters, **kwparameters)
+        start = time.perf_counter()
+        result = run(cypher, parameters, **kwparameters)
+        seconds = time.perf_counter() - start
+        parameters = dict(parameters or {}, **kwparameters)
+        for observer in self.observers:
+            observer(cypher, parameters, seconds, result)
+        return result
+
+    def run(self, cypher, parameters=None, **kwparameters):
+        unit = current_unit()
+        if unit is not None:
+            return unit.call(self.observe, unit.tx.run, cypher, parameters, kwparameters)
+        with self.database.lease() as graph:
+            runner = graph.auto(readonly=True) if reading() else graph
+            return self.observe(runner.run, cypher, parameters, kwparameters)
+
+    def evaluate(self, cypher, parameters=None, **kwparameters):
+        unit = current_unit()
+        if unit is not None:
+            return unit.call(self.observe, unit.tx.evaluate, cypher, parameters, kwparameters)
+        with self.database.lease() as graph:
+            runner = graph.auto(readonly=True) if reading() else graph
+            return self.observe(runner.evaluate, cypher, parameters, kwparameters)
+
+    def _write(self, method, subgraph):
+        unit = current_unit()
+        if unit is not None:
+            return unit.call(getattr(unit.tx, method), subgraph)
+        with self.database.lease() as graph:
+            return getattr(graph, method)(subgraph)
+
+    def create(self, subgraph):
+        return self._write('create', subgraph)
+
+    def push(self, subgraph):
+        return self._write('push', subgraph)
+
+    def delete(self, subgraph):
+        return self._write('delete', subgraph)
+
+    @contextmanager
+    def transaction(self, readonly=False):
+        """Explicit transaction, committed on success and rolled back on error.
+
+        A write transaction (served by the leader) unless `readonly` is set,
+        also during GET requests.
+        """
+        if current_unit() is not None:
+            # Joins the unit of work: committed or rolled back with the request
+            yield self
+            return
+        with self.database.lease() as graph:
+            tx = graph.begin(readonly=readonly)
+            try:
+                yield ObservedTransaction(tx, self)
+            except BaseException:
+                graph.rollback(tx)
+                raise
+            graph.commit(tx)
+            record_bookmark(tx)
+
+    def __getattr__(self, name):
+        return getattr(self.database.graph, name)
+
+
+class ObservedTransaction:
+    """py2neo Transaction whose statements are reported like GraphProxy.run"""
+
+    def __init__(self, tx, proxy):
+        self.tx = tx
+        self.proxy = proxy
+
+    def run(self, cypher, parameters=None, **kwparameters):
+        return self.proxy.observe(self.tx.run, cypher, parameters, kwparameters)
+
+    def evaluate(self, cypher, parameters=None, **kwparameters):
+        return self.proxy.observe(self.tx.evaluate, cypher, parameters, kwparameters)
+
+    def __getattr__(self, name):
+        return getattr(self.tx, name)
+
+
+# Initialize Neo4j connection (opened on first use, once per process)
+database = Database(Config)
+graph = GraphProxy(database)
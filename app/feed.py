@@ -0,0 +1,102 @@
+from app.projections import post_map
+from config import Config
+
+# Fan-out-on-read: the posts of the friends, newest first. The posts are
+# reached by expanding FRIENDS_WITH and CREATED from the user, so the keyset
+# predicate filters the expanded rows (no index seek) and a read costs the
+# number of posts of all the friends; the timeline mode avoids that.
+READ_PAGE = (
+    "MATCH (u:User {id: $user_id})-[:FRIENDS_WITH]-(a:User)-[:CREATED]->(p:Post) "
+    "WHERE $before_created_at IS NULL OR p.created_at < $before_created_at "
+    "OR (p.created_at = $before_created_at AND p.id < $before_id) "
+)
+
+# Fan-out-on-write: the TIMELINE edges materialized when the posts were created
+TIMELINE_PAGE = (
+    "MATCH (u:User {id: $user_id})-[:TIMELINE]->(p:Post)<-[:CREATED]-(a:User) "
+    "WHERE $before_created_at IS NULL OR p.created_at < $before_created_at "
+    "OR (p.created_at = $before_created_at AND p.id < $before_id) "
+)
+
+PAGE_RETURN = "RETURN {post} AS p, a.id AS author_id ORDER BY p.created_at DESC, p.id DESC LIMIT $limit"
+
+# Keep only the FEED_TIMELINE_SIZE newest edges of each timeline in `f`
+TRIM = (
+    "CALL { "
+    "WITH f "
+    "MATCH (f)-[t:TIMELINE]->(:Post) "
+    "WITH t ORDER BY t.created_at DESC SKIP $size "
+    "DELETE t "
+    "}"
+)
+
+
+def timeline_enabled():
+    return Config.FEED_MODE == 'timeline'
+
+
+def get_page(graph, user_id, limit, before_created_at=None, before_id=None, mode=None, fields=None):
+    """Records (p, author_id) of a page of the home feed of a user, p restricted to `fields`"""
+    mode = mode or Config.FEED_MODE
+    return graph.run(
+        (TIMELINE_PAGE if mode == 'timeline' else READ_PAGE) + PAGE_RETURN.format(post=post_map('p', fields)),
+        user_id=user_id, limit=limit, before_created_at=before_created_at, before_id=before_id
+    ).data()
+
+
+def push_posts(graph, post_ids):
+    """Add new posts to the timelines of the author's friends"""
+    if not timeline_enabled() or not post_ids:
+        return
+    graph.run(
+        "UNWIND $post_ids AS post_id "
+        "MATCH (f:User)-[:FRIENDS_WITH]-(:User)-[:CREATED]->(p:Post {id: post_id}) "
+        "MERGE (f)-[t:TIMELINE]->(p) ON CREATE SET t.created_at = p.created_at "
+        "WITH DISTINCT f "
+        + TRIM,
+        post_ids=post_ids, size=Config.FEED_TIMELINE_SIZE
+    )
+
+
+def follow(graph, user_id, friend_id):
+    """Backfill the timeline of a user with the latest posts of a new friend"""
+    if not timeline_enabled():
+        return
+    graph.run(
+        "MATCH (f:User {id: $user_id})-[:FRIENDS_WITH]-(:User {id: $friend_id})-[:CREATED]->(p:Post) "
+        "WITH f, p ORDER BY p.created_at DESC LIMIT $size "
+        "MERGE (f)-[t:TIMELINE]->(p) ON CREATE SET t.created_at = p.created_at "
+        "WITH DISTINCT f "
+        + TRIM,
+        user_id=user_id, friend_id=friend_id, size=Config.FEED_TIMELINE_SIZE
+    )
+
+
+def unfollow(graph, user_id, friend_id):
+    """Remove the posts of a former friend from the timeline of a user"""
+    if not timeline_enabled():
+        return
+    graph.run(
+        "MATCH (:User {id: $user_id})-[t:TIMELINE]->(:Post)<-[:CREATED]-(:User {id: $friend_id}) "
+        "DELETE t",
+        user_id=user_id, friend_id=friend_id
+    )
+
+
+def rebuild_timelines(graph, batch_size=1000, size=None):
+    """Recompute every timeline from the friendships and posts, returns the number of users"""
+    graph.run(
+        "MATCH ()-[t:TIMELINE]->() CALL { WITH t DELETE t } IN TRANSACTIONS OF $batch_size ROWS",
+        batch_size=batch_size
+    )
+    return graph.evaluate(
+        "MATCH (f:User) "
+        "CALL { "
+        "WITH f "
+        "MATCH (f)-[:FRIENDS_WITH]-(:User)-[:CREATED]->(p:Post) "
+        "WITH f, p ORDER BY p.created_at DESC LIMIT $size "
+        "CREATE (f)-[:TIMELINE {created_at: p.created_at}]->(p) "
+        "} IN TRANSACTIONS OF $batch_size ROWS "
+        "RETURN count(f)",
+        batch_size=batch_size, size=size or Config.FEED_TIMELINE_SIZE
+    )
@@ -0,0 +1,255 @@
+import sys
+import threading
+import time
+from config import Config
+
+
+def numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise RuntimeError("FRIEND_INDEX requires the numpy package (pip install numpy)")
+    return numpy
+
+
+class Adjacency:
+    """One direction of the friendship graph, as CSR arrays plus the edges changed since.
+
+    The neighbors of the dense id `i` are `targets[offsets[i]:offsets[i + 1]]`,
+    sorted. Writes land in the `added` and `removed` sets until `compact()`
+    folds them into new arrays.
+    """
+
+    def __init__(self, np, src, dst, size):
+        self.np = np
+        order = np.lexsort((dst, src))
+        self.targets = dst[order].astype(np.int32)
+        self.offsets = np.zeros(size + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=size), out=self.offsets[1:])
+        self.added = {}
+        self.removed = {}
+        self.changes = 0
+
+    def base(self, i):
+        if i + 1 >= len(self.offsets):
+            return self.targets[:0]
+        return self.targets[self.offsets[i]:self.offsets[i + 1]]
+
+    def in_base(self, i, j):
+        row = self.base(i)
+        k = self.np.searchsorted(row, j)
+        return k < len(row) and row[k] == j
+
+    def neighbors(self, i):
+        row = self.base(i)
+        removed = self.removed.get(i)
+        if removed:
+            row = row[~self.np.isin(row, list(removed))]
+        added = self.added.get(i)
+        if added:
+            row = self.np.union1d(row, self.np.fromiter(added, dtype=self.np.int32, count=len(added)))
+        return row
+
+    def contains(self, i, j):
+        if j in self.removed.get(i, ()):
+            return False
+        return j in self.added.get(i, ()) or self.in_base(i, j)
+
+    def add(self, i, j):
+        if j in self.removed.get(i, ()):
+            self.removed[i].discard(j)
+        elif not self.in_base(i, j) and j not in self.added.get(i, ()):
+            self.added.setdefault(i, set()).add(j)
+        self.changes += 1
+
+    def remove(self, i, j):
+        if j in self.added.get(i, ()):
+            self.added[i].discard(j)
+        elif self.in_base(i, j):
+            self.removed.setdefault(i, set()).add(j)
+        self.changes += 1
+
+    def edges(self, size):
+        """All the current (src, dst) pairs, with the changes applied"""
+        np = self.np
+        rows = len(self.offsets) - 1
+        src = np.repeat(np.arange(rows, dtype=np.int32), np.diff(self.offsets))
+        dst = self.targets
+        if self.removed:
+            removed = np.array([i * size + j for i, js in self.removed.items() for j in js], dtype=np.int64)
+            keep = ~np.isin(src.astype(np.int64) * size + dst, removed)
+            src, dst = src[keep], dst[keep]
+        added = [(i, j) for i, js in self.added.items() for j in js]
+        if added:
+            src = np.concatenate([src, np.array([i for i, _ in added], dtype=np.int32)])
+            dst = np.concatenate([dst, np.array([j for _, j in added], dtype=np.int32)])
+        return src, dst
+
+    def nbytes(self):
+        return self.offsets.nbytes + self.targets.nbytes
+
+
+class FriendIndex:
+    """In-process read model of the FRIENDS_WITH graph.
+
+    User UUIDs are mapped to dense integer ids and the friends of each user
+    are kept as sorted CSR arrays (both ends of every friendship), so
+    friendship checks are a binary search and mutual friends a NumPy
+    intersection. The index is loaded once per process and kept up to date
+    by the friendship writes this process serves; writes served by other
+    workers are only seen after a reload. Reads take the same lock as the
+    writes, which change the pending sets and the id map in place.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.loaded = False
+        self._ids = {}
+        self._uuids = []
+        self._friends = None
+        self._load_seconds = None
+
+    def load(self, graph, chunk_size=10000):
+        """Read every user and friendship, `chunk_size` users per query"""
+        np = numpy()
+        start = time.perf_counter()
+        ids, uuids = {}, []
+        src_chunks, dst_chunks = [], []
+
+        def dense(user_id):
+            if user_id not in ids:
+                ids[user_id] = len(uuids)
+                uuids.append(user_id)
+            return ids[user_id]
+
+        after = ''
+        while True:
+            # Each friendship is read from both of its users
+            records = graph.run(
+                "MATCH (u:User) WHERE u.id > $after "
+                "WITH u ORDER BY u.id LIMIT $limit "
+                "OPTIONAL MATCH (u)-[:FRIENDS_WITH]-(f:User) "
+                "RETURN u.id AS id, collect(DISTINCT f.id) AS friends",
+                after=after, limit=chunk_size
+            ).data()
+            src, dst = [], []
+            for record in records:
+                i = dense(record["id"])
+                for friend_id in record["friends"]:
+                    src.append(i)
+                    dst.append(dense(friend_id))
+            src_chunks.append(np.array(src, dtype=np.int32))
+            dst_chunks.append(np.array(dst, dtype=np.int32))
+            if len(records) < chunk_size:
+                break
+            after = max(record["id"] for record in records)
+
+        friends = Adjacency(np, np.concatenate(src_chunks), np.concatenate(dst_chunks), len(uuids))
+        with self._lock:
+            self._ids, self._uuids = ids, uuids
+            self._friends = friends
+            self._load_seconds = time.perf_counter() - start
+            self.loaded = True
+
+    def covers(self, *user_ids):
+        """Whether the index knows all the given users"""
+        with self._lock:
+            return self.loaded and all(user_id in self._ids for user_id in user_ids)
+
+    def is_friend(self, user_id, friend_id):
+        with self._lock:
+            # Either user may have been deleted since the caller checked covers()
+            if user_id not in self._ids or friend_id not in self._ids:
+                return False
+            return self._friends.contains(self._ids[user_id], self._ids[friend_id])
+
+    def friends(self, user_id):
+        with self._lock:
+            return self._friends_of(user_id) if user_id in self._ids else []
+
+    def mutual_friends(self, user_id, other_id):
+        """Ids of the users both users are friends with"""
+        with self._lock:
+            if user_id not in self._ids or other_id not in self._ids:
+                return []
+            np = self._friends.np
+            common = np.intersect1d(
+                self._friends.neighbors(self._ids[user_id]), self._friends.neighbors(self._ids[other_id]), assume_unique=True
+            )
+            return [self._uuids[j] for j in common]
+
+    def expand(self, ids):
+        """Same contract as paths.CypherAdjacency.expand, answered from memory"""
+        with self._lock:
+            return {user_id: self._friends_of(user_id) for user_id in ids if user_id in self._ids}
+
+    def _friends_of(self, user_id):
+        return [self._uuids[j] for j in self._friends.neighbors(self._ids[user_id])]
+
+    def add(self, user_id, friend_id):
+        if not self.loaded:
+            return
+        with self._lock:
+            i, j = self._dense(user_id), self._dense(friend_id)
+            self._friends.add(i, j)
+            self._friends.add(j, i)
+        self._maybe_compact()
+
+    def remove(self, user_id, friend_id):
+        if not self.covers(user_id, friend_id):
+            return
+        with self._lock:
+            i, j = self._ids[user_id], self._ids[friend_id]
+            self._friends.remove(i, j)
+            self._friends.remove(j, i)
+        self._maybe_compact()
+
+    def remove_user(self, user_id):
+        """Forget a deleted user and all their friendships"""
+        if not self.covers(user_id):
+            return
+        with self._lock:
+            i = self._ids.pop(user_id)
+            for j in self._friends.neighbors(i):
+                self._friends.remove(i, int(j))
+                self._friends.remove(int(j), i)
+        self._maybe_compact()
+
+    def _dense(self, user_id):
+        if user_id not in self._ids:
+            self._ids[user_id] = len(self._uuids)
+            self._uuids.append(user_id)
+        return self._ids[user_id]
+
+    def _maybe_compact(self):
+        if self._friends.changes >= Config.FRIEND_INDEX_COMPACT_AT:
+            self.compact()
+
+    def compact(self):
+        """Fold the pending changes into new CSR arrays"""
+        with self._lock:
+            np, size = self._friends.np, len(self._uuids)
+            src, dst = self._friends.edges(size)
+            self._friends = Adjacency(np, src, dst, size)
+
+    def stats(self):
+        """Size of the index and its memory use"""
+        if not self.loaded:
+            return {"loaded": False}
+        with self._lock:
+            # Every FRIENDS_WITH edge is stored once per user
+            edges = len(self._friends.targets) // 2
+            id_map = sys.getsizeof(self._ids) + sys.getsizeof(self._uuids) + sum(sys.getsizeof(u) for u in self._uuids)
+            arrays = self._friends.nbytes()
+            return {
+                "loaded": True,
+                "users": len(self._ids),
+                "edges": edges,
+                "pending_changes": sum(map(len, self._friends.added.values())) + sum(map(len, self._friends.removed.values())),
+                "load_seconds": round(self._load_seconds, 3),
+                "memory_bytes": {"arrays": arrays, "id_map": id_map, "total": arrays + id_map},
+                "bytes_per_million_edges": round((arrays + id_map) * 1_000_000 / edges) if edges else None,
+            }
+
+
+friend_index = FriendIndex()
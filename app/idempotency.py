@@ -0,0 +1,128 @@
+import hashlib
+import threading
+import time
+from functools import wraps
+from flask import current_app, jsonify, request
+from app.cache import LRUCache, RedisCache
+from config import Config
+
+HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+MAX_KEY_LENGTH = 255
+
+
+class IdempotencyStore:
+    """Responses of the requests sent with an Idempotency-Key.
+
+    Each key holds either a pending marker, set atomically by the request
+    that runs the view, or the response it stored. A marker expires after
+    IDEMPOTENCY_PENDING_SECONDS in case its worker died; a response after
+    IDEMPOTENCY_TTL. The `memory` backend (an LRU of IDEMPOTENCY_MAXSIZE keys)
+    only coalesces the duplicates sent to the same process, `redis` the ones
+    sent to every worker.
+    """
+
+    def __init__(self, config=Config):
+        self.config = config
+        self._backend = None
+        self._changed = threading.Condition()
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            if self.config.IDEMPOTENCY_BACKEND == 'redis':
+                self._backend = RedisCache(self.config.IDEMPOTENCY_REDIS_URL, self.config.IDEMPOTENCY_TTL, prefix="idempotency:")
+            else:
+                self._backend = LRUCache(self.config.IDEMPOTENCY_MAXSIZE, self.config.IDEMPOTENCY_TTL)
+        return self._backend
+
+    def claim(self, key, fingerprint):
+        """Mark `key` as pending, returns False when another request holds it"""
+        return self.backend.add(key, {"fingerprint": fingerprint, "pending": True}, self.config.IDEMPOTENCY_PENDING_SECONDS)
+
+    def get(self, key):
+        return self.backend.get(key)
+
+    def save(self, key, fingerprint, response):
+        self.backend.set(key, {
+            "fingerprint": fingerprint,
+            "status": response.status_code,
+            "body": response.get_data(as_text=True),
+            "content_type": response.content_type,
+        })
+        self._notify()
+
+    def release(self, key):
+        """Forget a pending key, so that the request can be sent again"""
+        self.backend.delete(key)
+        self._notify()
+
+    def _notify(self):
+        with self._changed:
+            self._changed.notify_all()
+
+    def wait(self, seconds):
+        """Wait for a request of this process to finish, or `seconds` for the other workers"""
+        with self._changed:
+            self._changed.wait(seconds)
+
+
+store = IdempotencyStore(Config)
+
+
+def fingerprint():
+    """Digest of the method, path and body of the current request"""
+    digest = hashlib.sha256(f"{request.method} {request.full_path}\n".encode())
+    digest.update(request.get_data())
+    return digest.hexdigest()
+
+
+def replay(record):
+    response = current_app.response_class(record["body"], status=record["status"], content_type=record["content_type"])
+    response.headers[REPLAYED_HEADER] = 'true'
+    return response
+
+
+def idempotent(view):
+    """Answer the repeats of a request sent with the same Idempotency-Key with its first response.
+
+    Only the first request with a key runs the view; concurrent duplicates
+    wait for its response, up to IDEMPOTENCY_WAIT_SECONDS, instead of
+    reaching Neo4j. Responses below 500 are stored, while a 500 frees the key
+    so that the request can be retried. Reusing a key for another request
+    is answered 422.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        key = request.headers.get(HEADER)
+        if not key:
+            return view(*args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return jsonify({"error": f"{HEADER} must be at most {MAX_KEY_LENGTH} characters"}), 400
+
+        digest = fingerprint()
+        deadline = time.monotonic() + Config.IDEMPOTENCY_WAIT_SECONDS
+        while not store.claim(key, digest):
+            record = store.get(key)
+            if record is None:
+                # Released or expired in between: claim it again
+                continue
+            if record["fingerprint"] != digest:
+                return jsonify({"error": f"{HEADER} already used for a different request"}), 422
+            if not record.get("pending"):
+                return replay(record)
+            if time.monotonic() >= deadline:
+                return jsonify({"error": f"A request with this {HEADER} is still in progress"}), 409
+            store.wait(Config.IDEMPOTENCY_POLL_SECONDS)
+
+        try:
+            response = current_app.make_response(view(*args, **kwargs))
+        except BaseException:
+            store.release(key)
+            raise
+        if response.status_code < 500:
+            store.save(key, digest, response)
+        else:
+            store.release(key)
+        return response
+    return wrapper
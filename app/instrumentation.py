@@ -0,0 +1,148 @@
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from flask import g, has_request_context, request
+
+logger = logging.getLogger(__name__)
+
+# Literals inlined in a statement, replaced by ? to group and log statements
+LITERALS = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"|\b\d+(?:\.\d+)?\b")
+
+# Upper bound of the rows counted for one statement
+ROW_COUNT_LIMIT = 1_000_000
+
+
+def normalize(cypher):
+    """Statement shape: whitespace collapsed and literals replaced by ?"""
+    return LITERALS.sub("?", " ".join(cypher.split()))
+
+
+def redact(parameters):
+    """Parameter names with the type (and size) of their values instead of the values"""
+    return {
+        name: f"<{type(value).__name__}[{len(value)}]>" if isinstance(value, (list, dict)) else f"<{type(value).__name__}>"
+        for name, value in parameters.items()
+    }
+
+
+def row_count(result):
+    """Rows returned by a statement, read from the buffered py2neo result"""
+    try:
+        return len(result._result.peek(ROW_COUNT_LIMIT))
+    except AttributeError:
+        # graph.evaluate returns the value of the first row
+        return 0 if result is None else 1
+
+
+class Statement:
+    __slots__ = ("cypher", "seconds", "rows")
+
+    def __init__(self, cypher, seconds, rows):
+        self.cypher = cypher
+        self.seconds = seconds
+        self.rows = rows
+
+
+class Instrumentation:
+    """Per request Cypher statistics, exposed as Server-Timing headers and Prometheus metrics.
+
+    The GraphProxy of the controllers reports every statement; the ones run
+    while serving a request are kept on `g` and summed when the response is
+    sent. The metrics are totals per endpoint (blueprint view) for the
+    current process. Statements slower than SLOW_QUERY_MS are logged with
+    their parameters redacted, and a request that runs the same statement
+    N_PLUS_ONE_THRESHOLD times or more is flagged as a likely N+1.
+    """
+
+    METRICS = (
+        ("requests", "api_requests_total", "Requests served"),
+        ("statements", "api_cypher_statements_total", "Cypher statements run"),
+        ("db_seconds", "api_cypher_seconds_total", "Time spent waiting for Neo4j"),
+        ("python_seconds", "api_python_seconds_total", "Time spent in Python outside of Neo4j"),
+        ("rows", "api_cypher_rows_total", "Rows returned by Neo4j"),
+        ("slow_statements", "api_cypher_slow_statements_total", "Statements slower than SLOW_QUERY_MS"),
+        ("n_plus_one", "api_cypher_n_plus_one_total", "Requests flagged as N+1"),
+    )
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals = {}
+        self.slow_query_seconds = 0.1
+        self.n_plus_one_threshold = 5
+
+    def init_app(self, app, graph):
+        self.slow_query_seconds = app.config['SLOW_QUERY_MS'] / 1000
+        self.n_plus_one_threshold = app.config['N_PLUS_ONE_THRESHOLD']
+        if self.record not in graph.observers:
+            graph.observers.append(self.record)
+        app.before_request(self.start_request)
+        app.after_request(self.finish_request)
+        app.add_url_rule('/metrics', 'metrics', self.metrics_view)
+
+    def record(self, cypher, parameters, seconds, result):
+        slow = seconds >= self.slow_query_seconds
+        if slow:
+            logger.warning(
+                "Slow Cypher statement (%.1f ms): %s parameters=%s", seconds * 1000, normalize(cypher), redact(parameters)
+            )
+        if has_request_context() and "statements" in g:
+            g.statements.append(Statement(cypher, seconds, row_count(result)))
+            g.slow_statements += slow
+
+    def start_request(self):
+        g.statements = []
+        g.slow_statements = 0
+        g.request_start = time.perf_counter()
+
+    def finish_request(self, response):
+        if "statements" not in g:
+            return response
+        total = time.perf_counter() - g.request_start
+        statements = g.statements
+        db_seconds = sum(statement.seconds for statement in statements)
+        rows = sum(statement.rows for statement in statements)
+
+        repeated = [
+            (shape, count) for shape, count in Counter(normalize(statement.cypher) for statement in statements).items()
+            if count >= self.n_plus_one_threshold
+        ]
+        for shape, count in repeated:
+            logger.warning("Possible N+1 in %s %s: %d x %s", request.method, request.path, count, shape)
+
+        response.headers.add(
+            'Server-Timing',
+            f'db;dur={db_seconds * 1000:.1f};desc="{len(statements)} statements, {rows} rows", '
+            f'app;dur={(total - db_seconds) * 1000:.1f}'
+        )
+
+        key = (request.endpoint or "unmatched", request.method)
+        with self._lock:
+            totals = self._totals.setdefault(key, dict.fromkeys((name for name, _, _ in self.METRICS), 0))
+            totals["requests"] += 1
+            totals["statements"] += len(statements)
+            totals["db_seconds"] += db_seconds
+            totals["python_seconds"] += total - db_seconds
+            totals["rows"] += rows
+            totals["slow_statements"] += g.slow_statements
+            totals["n_plus_one"] += bool(repeated)
+        return response
+
+    def metrics(self):
+        """Prometheus text exposition of the totals"""
+        with self._lock:
+            totals = {key: dict(values) for key, values in self._totals.items()}
+        lines = []
+        for name, metric, description in self.METRICS:
+            lines.append(f"# HELP {metric} {description}, by endpoint")
+            lines.append(f"# TYPE {metric} counter")
+            for (endpoint, method), values in sorted(totals.items()):
+                lines.append(f'{metric}{{endpoint="{endpoint}",method="{method}"}} {values[name]}')
+        return "\n".join(lines) + "\n"
+
+    def metrics_view(self):
+        return self.metrics(), 200, {'Content-Type': 'text/plain; version=0.0.4'}
+
+
+instrumentation = Instrumentation()
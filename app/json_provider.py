@@ -0,0 +1,58 @@
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class FastJSONMixin:
+    """Encode responses with orjson when it is installed and JSON_ENCODER allows it.
+
+    The response body is the bytes returned by orjson, with no intermediate
+    str. Anything orjson cannot encode (e.g. an integer wider than 64 bits)
+    and every call made while orjson is unavailable goes through the stdlib
+    encoder of the base provider. Both write floats in their shortest
+    round-trip form, so the created_at timestamps are identical (only
+    magnitudes below 1e-4 or from 1e16 use another, equal, notation).
+    orjson writes non-ASCII characters as UTF-8 rather than \\u escapes.
+    """
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.use_orjson = orjson is not None and app.config.get('JSON_ENCODER', 'orjson') == 'orjson'
+
+    def options(self, indent=False):
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def encode(self, obj, indent=False):
+        """Bytes of `obj` as JSON, through orjson"""
+        return orjson.dumps(obj, default=self.default, option=self.options(indent))
+
+    def dumps(self, obj, **kwargs):
+        if self.use_orjson and set(kwargs) <= {'indent', 'separators'}:
+            try:
+                return self.encode(obj, bool(kwargs.get('indent'))).decode()
+            except TypeError:
+                pass
+        return super().dumps(obj, **kwargs)
+
+    def response(self, *args, **kwargs):
+        if not self.use_orjson:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        try:
+            body = self.encode(obj, indent) + b"\n"
+        except TypeError:
+            return super().response(*args, **kwargs)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+class JSONProvider(FastJSONMixin, DefaultJSONProvider):
+    """Flask JSON provider of the app, see FastJSONMixin"""
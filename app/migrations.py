@@ -0,0 +1,32 @@
+# Data migrations. Each one commits every $batch_size rows and only matches
+# what is left to migrate, so an interrupted run is resumed by running it again.
+
+# Friendships used to be stored as one edge per direction. A friendship is now
+# a single FRIENDS_WITH edge matched in either direction: of each reciprocal
+# pair, the edge starting from the greater id is deleted, as are duplicated
+# edges between the same users and self friendships.
+FRIENDSHIP_MIGRATIONS = {
+    "reciprocal": (
+        "MATCH (a:User)-[r:FRIENDS_WITH]->(b:User) "
+        "WHERE a.id > b.id AND EXISTS { (b)-[:FRIENDS_WITH]->(a) } "
+        "CALL { WITH r DELETE r } IN TRANSACTIONS OF $batch_size ROWS "
+        "RETURN count(*)"
+    ),
+    "duplicates": (
+        "MATCH (a:User)-[r:FRIENDS_WITH]->(b:User) "
+        "WITH a, b, collect(r) AS rels WHERE size(rels) > 1 "
+        "UNWIND tail(rels) AS r "
+        "CALL { WITH r DELETE r } IN TRANSACTIONS OF $batch_size ROWS "
+        "RETURN count(*)"
+    ),
+    "self": (
+        "MATCH (a:User)-[r:FRIENDS_WITH]->(a) "
+        "CALL { WITH r DELETE r } IN TRANSACTIONS OF $batch_size ROWS "
+        "RETURN count(*)"
+    ),
+}
+
+
+def collapse_friendships(graph, batch_size=1000):
+    """Keep a single FRIENDS_WITH edge per friendship, returns the edges deleted per kind"""
+    return {kind: graph.evaluate(cypher, batch_size=batch_size) or 0 for kind, cypher in FRIENDSHIP_MIGRATIONS.items()}
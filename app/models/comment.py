@@ -1,6 +1,8 @@
 from py2neo.ogm import GraphObject, Property, RelatedFrom
 from datetime import datetime
 import uuid
+from app.projections import comment_map
+from app.pagination import keyset_pages
 
 class Comment(GraphObject):
     __primarylabel__ = "Comment"
@@ -9,6 +11,9 @@ class Comment(GraphObject):
     id = Property()
     content = Property()
     created_at = Property()
+    version = Property()
+    updated_at = Property()
+    like_count = Property()
 
     # Relationships
     created_by = RelatedFrom("User", "CREATED")
@@ -19,12 +24,16 @@ class Comment(GraphObject):
         self.id = str(uuid.uuid4())
         self.content = content
         self.created_at = datetime.now().timestamp()
+        self.version = 1
+        self.updated_at = self.created_at
+        self.like_count = 0
 
     def to_dict(self):
         return {
             "id": self.id,
             "content": self.content,
-            "created_at": self.created_at
+            "created_at": self.created_at,
+            "like_count": self.like_count or 0
         }
 
     @staticmethod
@@ -33,11 +42,32 @@ class Comment(GraphObject):
         return Comment.wrap(result) if result else None
 
     @staticmethod
-    def get_all(graph):
-        result = graph.run("MATCH (c:Comment) RETURN c").data()
-        return [Comment.wrap(record['c']) for record in result]
+    def find_projection(graph, comment_id, fields=None):
+        """The comment as a dict restricted to `fields`, without building a model"""
+        return graph.evaluate(f"MATCH (c:Comment {{id: $id}}) RETURN {comment_map('c', fields)}", id=comment_id)
 
     @staticmethod
-    def get_by_post(graph, post_id):
-        result = graph.run("MATCH (p:Post {id: $post_id})-[:HAS_COMMENT]->(c:Comment) RETURN c", post_id=post_id).data()
-        return [Comment.wrap(record['c']) for record in result]
\ No newline at end of file
+    def get_page(graph, limit, after_created_at=None, after_id=None, fields=None):
+        result = graph.run(
+            "MATCH (c:Comment) "
+            "WHERE $after_created_at IS NULL OR c.created_at > $after_created_at "
+            "OR (c.created_at = $after_created_at AND c.id > $after_id) "
+            f"RETURN {comment_map('c', fields)} AS c ORDER BY c.created_at, c.id LIMIT $limit",
+            after_created_at=after_created_at, after_id=after_id, limit=limit
+        ).data()
+        return [record['c'] for record in result]
+
+    @staticmethod
+    def stream(graph, after_created_at=None, after_id=None, fields=None):
+        """Every comment after the given key, read one page of PAGE_SIZE_MAX at a time"""
+        def fetch(limit, after_created_at, after_id):
+            return Comment.get_page(graph, limit, after_created_at, after_id, fields)
+
+        yield from keyset_pages(fetch, after_created_at, after_id)
+
+    @staticmethod
+    def get_by_post(graph, post_id, fields=None):
+        result = graph.run(
+            f"MATCH (p:Post {{id: $post_id}})-[:HAS_COMMENT]->(c:Comment) RETURN {comment_map('c', fields)} AS c", post_id=post_id
+        ).data()
+        return [record['c'] for record in result]
\ No newline at end of file
@@ -2,6 +2,8 @@ from py2neo.ogm import GraphObject, Property, RelatedFrom
 from datetime import datetime
 import uuid
 from app.models.user import User
+from app.projections import post_map
+from app.pagination import keyset_pages
 
 
 class Post(GraphObject):
@@ -12,6 +14,10 @@ class Post(GraphObject):
     title = Property()
     content = Property()
     created_at = Property()
+    version = Property()
+    updated_at = Property()
+    like_count = Property()
+    comment_count = Property()
 
     # Relationships
     created_by = RelatedFrom("User", "CREATED")
@@ -23,6 +29,10 @@ class Post(GraphObject):
         self.title = title
         self.content = content
         self.created_at = datetime.now().timestamp()
+        self.version = 1
+        self.updated_at = self.created_at
+        self.like_count = 0
+        self.comment_count = 0
         self.user = user
 
     def to_dict(self):
@@ -31,8 +41,19 @@ class Post(GraphObject):
             "title": self.title,
             "content": self.content,
             "created_at": self.created_at,
+            "like_count": self.like_count or 0,
+            "comment_count": self.comment_count or 0,
         }
 
+    def get_creator(self, graph):
+        """The user who created the post"""
+        result = graph.evaluate("MATCH (u:User)-[:CREATED]->(p:Post {id: $id}) RETURN u", id=self.id)
+        return User.wrap(result) if result else None
+
+    def get_likes_count(self):
+        """Likes of the post, maintained on the node by the like/unlike writes"""
+        return self.like_count or 0
+
     @staticmethod
     def find_by_id(post_id, graph):
         result = graph.run(f"MATCH (p:Post {{id: '{post_id}'}}) RETURN p").data()
@@ -41,13 +62,32 @@ class Post(GraphObject):
         return None
 
     @staticmethod
-    def get_all(graph):
-        result = graph.run("MATCH (p:Post) RETURN p").data()
-        return [Post.wrap(record["p"]) for record in result]
+    def find_projection(post_id, graph, fields=None):
+        """The post as a dict restricted to `fields`, without building a model"""
+        return graph.evaluate(f"MATCH (p:Post {{id: $id}}) RETURN {post_map('p', fields)}", id=post_id)
+
+    @staticmethod
+    def get_page(graph, limit, after_created_at=None, after_id=None, fields=None):
+        result = graph.run(
+            "MATCH (p:Post) "
+            "WHERE $after_created_at IS NULL OR p.created_at > $after_created_at "
+            "OR (p.created_at = $after_created_at AND p.id > $after_id) "
+            f"RETURN {post_map('p', fields)} AS p ORDER BY p.created_at, p.id LIMIT $limit",
+            after_created_at=after_created_at, after_id=after_id, limit=limit
+        ).data()
+        return [record["p"] for record in result]
+
+    @staticmethod
+    def stream(graph, after_created_at=None, after_id=None, fields=None):
+        """Every post after the given key, read one page of PAGE_SIZE_MAX at a time"""
+        def fetch(limit, after_created_at, after_id):
+            return Post.get_page(graph, limit, after_created_at, after_id, fields)
+
+        yield from keyset_pages(fetch, after_created_at, after_id)
 
     @staticmethod
-    def get_by_user(user_id, graph):
+    def get_by_user(user_id, graph, fields=None):
         result = graph.run(
-            f"MATCH (u:User {{id: '{user_id}'}})-[:CREATED]->(p:Post) RETURN p"
+            f"MATCH (u:User {{id: $user_id}})-[:CREATED]->(p:Post) RETURN {post_map('p', fields)} AS p", user_id=user_id
         ).data()
-        return [Post.wrap(record["p"]) for record in result]
+        return [record["p"] for record in result]
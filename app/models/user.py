@@ -1,6 +1,8 @@
 from py2neo.ogm import GraphObject, Property, RelatedTo, RelatedFrom
 from datetime import datetime
 import uuid
+from app.projections import user_map
+from app.pagination import keyset_pages
 
 class User(GraphObject):
     __primarylabel__ = "User"
@@ -10,6 +12,8 @@ class User(GraphObject):
     name = Property()
     email = Property()
     created_at = Property()
+    version = Property()
+    updated_at = Property()
 
     # Relationships
     posts = RelatedFrom("Post", "CREATED")
@@ -23,6 +27,8 @@ class User(GraphObject):
         self.name = name
         self.email = email
         self.created_at = datetime.now().timestamp()
+        self.version = 1
+        self.updated_at = self.created_at
 
     def to_dict(self):
         return {
@@ -41,6 +47,25 @@ class User(GraphObject):
         return None
 
     @staticmethod
-    def get_all(graph):
-        result = graph.run("MATCH (u:User) RETURN u").data()
-        return [User.wrap(record["u"]) for record in result]
+    def find_projection(user_id, graph, fields=None):
+        """The user as a dict restricted to `fields`, without building a model"""
+        return graph.evaluate(f"MATCH (u:User {{id: $id}}) RETURN {user_map('u', fields)}", id=user_id)
+
+    @staticmethod
+    def get_page(graph, limit, after_created_at=None, after_id=None, fields=None):
+        result = graph.run(
+            "MATCH (u:User) "
+            "WHERE $after_created_at IS NULL OR u.created_at > $after_created_at "
+            "OR (u.created_at = $after_created_at AND u.id > $after_id) "
+            f"RETURN {user_map('u', fields)} AS u ORDER BY u.created_at, u.id LIMIT $limit",
+            after_created_at=after_created_at, after_id=after_id, limit=limit
+        ).data()
+        return [record["u"] for record in result]
+
+    @staticmethod
+    def stream(graph, after_created_at=None, after_id=None, fields=None):
+        """Every user after the given key, read one page of PAGE_SIZE_MAX at a time"""
+        def fetch(limit, after_created_at, after_id):
+            return User.get_page(graph, limit, after_created_at, after_id, fields)
+
+        yield from keyset_pages(fetch, after_created_at, after_id)
@@ -0,0 +1,56 @@
+import base64
+import json
+from config import Config
+
+
+def parse_limit(limit):
+    """Parse the `limit` query parameter, bounded by PAGE_SIZE_MAX"""
+    if limit is None or limit == '':
+        return Config.PAGE_SIZE_DEFAULT
+    try:
+        limit = int(limit)
+    except (TypeError, ValueError):
+        raise ValueError("limit must be a positive integer")
+    if limit < 1:
+        raise ValueError("limit must be a positive integer")
+    return min(limit, Config.PAGE_SIZE_MAX)
+
+
+def encode_cursor(record, key=("created_at", "id")):
+    """Build an opaque cursor from the (created_at, id) key of a record, or another `key`"""
+    raw = json.dumps([record[name] for name in key])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Return the (created_at, id) key (or other pair) encoded in a cursor, or (None, None)"""
+    if not cursor:
+        return None, None
+    try:
+        created_at, node_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    return created_at, node_id
+
+
+def keyset_pages(fetch, after_created_at=None, after_id=None, size=None):
+    """Yield the records of successive keyset pages, holding one page of `size` at a time.
+
+    `fetch(limit, after_created_at, after_id)` runs one page query, like the
+    models' get_page; the cursor moves to the last record of each page.
+    """
+    size = size or Config.PAGE_SIZE_MAX
+    while True:
+        records = fetch(size, after_created_at, after_id)
+        yield from records
+        if len(records) < size:
+            return
+        after_created_at, after_id = records[-1]["created_at"], records[-1]["id"]
+
+
+def page(items, limit, key=("created_at", "id")):
+    """Split the `limit + 1` rows fetched by a keyset query into a page and its next cursor"""
+    if len(items) > limit:
+        items = items[:limit]
+        return items, encode_cursor(items[-1], key)
+    return items, None
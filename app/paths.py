@@ -0,0 +1,78 @@
+class CypherAdjacency:
+    """Friendships read from Neo4j, one query per BFS level"""
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def expand(self, ids):
+        """Map each of the given user ids to the ids of its friends"""
+        return {
+            record["id"]: record["neighbors"]
+            for record in self.graph.run(
+                "UNWIND $ids AS id "
+                "MATCH (u:User {id: id})-[:FRIENDS_WITH]-(f:User) "
+                "RETURN id, collect(DISTINCT f.id) AS neighbors",
+                ids=list(ids)
+            )
+        }
+
+
+def shortest_path(adjacency, source, target, max_depth):
+    """Bidirectional BFS over FRIENDS_WITH from `source` to `target`.
+
+    Both searches advance one whole level at a time, always on the smaller
+    frontier, so a path of length d costs two searches of depth about d/2
+    instead of one of depth d. Returns the list of user ids of a shortest
+    path (or None past `max_depth` hops) and the number of nodes expanded.
+    """
+    if source == target:
+        return [source], 0
+
+    # parent and distance of every node reached, per direction
+    forward = {source: (None, 0)}
+    backward = {target: (None, 0)}
+    forward_frontier, backward_frontier = [source], [target]
+    forward_depth = backward_depth = 0
+    expanded = 0
+
+    while forward_frontier and backward_frontier and forward_depth + backward_depth < max_depth:
+        from_target = len(backward_frontier) < len(forward_frontier)
+        seen, other, frontier = (backward, forward, backward_frontier) if from_target else (forward, backward, forward_frontier)
+        depth = (backward_depth if from_target else forward_depth) + 1
+
+        neighbors = adjacency.expand(frontier)
+        expanded += len(frontier)
+        next_frontier, meeting, best = [], None, None
+        for node in frontier:
+            for neighbor in neighbors.get(node, ()):
+                if neighbor in seen:
+                    continue
+                seen[neighbor] = (node, depth)
+                next_frontier.append(neighbor)
+                if neighbor in other and (best is None or other[neighbor][1] < best):
+                    meeting, best = neighbor, other[neighbor][1]
+
+        if from_target:
+            backward_frontier, backward_depth = next_frontier, depth
+        else:
+            forward_frontier, forward_depth = next_frontier, depth
+
+        if meeting is not None:
+            return join(forward, backward, meeting), expanded
+
+    return None, expanded
+
+
+def join(forward, backward, meeting):
+    """The path source -> meeting -> target from the parents of both searches"""
+    path = []
+    node = meeting
+    while node is not None:
+        path.append(node)
+        node = forward[node][0]
+    path.reverse()
+    node = backward[meeting][0]
+    while node is not None:
+        path.append(node)
+        node = backward[node][0]
+    return path
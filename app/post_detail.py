@@ -0,0 +1,91 @@
+from app.pagination import page
+from app.projections import user_map, post_map, comment_map
+from app.versioning import version_query
+
+EXPANSIONS = ('author', 'comments', 'likes')
+
+
+def parse_expand(expand):
+    """Parse the `expand` query parameter of GET /posts/<id>, e.g. "author,comments" """
+    names = {name.strip() for name in (expand or '').split(',') if name.strip()}
+    unknown = names - set(EXPANSIONS)
+    if unknown:
+        raise ValueError(f"Unknown expand value(s): {', '.join(sorted(unknown))}, expected {', '.join(EXPANSIONS)}")
+    return names
+
+
+def detail_query(expand, fields=None):
+    """Single statement returning a post (restricted to `fields`) with the requested expansions.
+
+    The comments are a keyset page (created_at, id) of `$limit` rows, each
+    with the id and name of its author.
+    """
+    clauses = ["MATCH (p:Post {id: $post_id})"]
+    columns = [f"{post_map('p', fields)} AS post"]
+    if 'author' in expand:
+        clauses.append("OPTIONAL MATCH (a:User)-[:CREATED]->(p)")
+        columns.append(f"{user_map('a')} AS author")
+    if 'comments' in expand:
+        clauses.append(
+            "CALL { "
+            "WITH p "
+            "OPTIONAL MATCH (p)-[:HAS_COMMENT]->(c:Comment) "
+            "WHERE $after_created_at IS NULL OR c.created_at > $after_created_at "
+            "OR (c.created_at = $after_created_at AND c.id > $after_id) "
+            "OPTIONAL MATCH (ca:User)-[:CREATED]->(c) "
+            "WITH c, ca ORDER BY c.created_at, c.id LIMIT $limit "
+            f"RETURN collect({comment_map('c', extra='author: ca {.id, .name}')}) AS comments "
+            "}"
+        )
+        columns.append("comments")
+    if 'likes' in expand:
+        columns.append("coalesce(p.like_count, 0) AS likes_count")
+    return " ".join(clauses) + " RETURN " + ", ".join(columns)
+
+
+def detail_version_query(request):
+    """version_query('Post') of GET /posts/<id>, with the users its `expand` parameter shows.
+
+    The author and the comment authors are shown with their names, which
+    change without touching the post: their ids and versions are folded
+    into the version, and their last update into updated_at.
+    """
+    try:
+        expand = parse_expand(request.args.get('expand'))
+    except ValueError:
+        expand = set()
+    if not expand & {'author', 'comments'}:
+        return version_query('Post')
+
+    clauses = ["MATCH (p:Post {id: $id})"]
+    users = []
+    if 'author' in expand:
+        clauses.append("OPTIONAL MATCH (a:User)-[:CREATED]->(p) WITH p, collect(a) AS authors")
+        users.append("authors")
+    if 'comments' in expand:
+        # Sorted, so that the same commenters always give the same version
+        carried = "".join(f"{name}, " for name in users)
+        clauses.append(
+            "OPTIONAL MATCH (p)-[:HAS_COMMENT]->(:Comment)<-[:CREATED]-(ca:User) "
+            f"WITH p, {carried}ca ORDER BY ca.id "
+            f"WITH p, {carried}collect(DISTINCT ca) AS commenters"
+        )
+        users.append("commenters")
+    return (
+        " ".join(clauses) + f" WITH p, {' + '.join(users)} AS users "
+        "RETURN [coalesce(p.version, 0)] + [u IN users | u.id + ':' + coalesce(u.version, 0)] AS version, "
+        "reduce(t = coalesce(p.updated_at, p.created_at, 0), u IN users | "
+        "CASE WHEN coalesce(u.updated_at, u.created_at, 0) > t THEN coalesce(u.updated_at, u.created_at) ELSE t END) AS updated_at"
+    )
+
+
+def detail_response(record, expand, limit):
+    """Response body of GET /posts/<id>?expand=... from the record of detail_query"""
+    result = {"post": record["post"]}
+    if 'author' in expand:
+        result["author"] = record["author"]
+    if 'comments' in expand:
+        result["comments"], result["comments_next_cursor"] = page(record["comments"], limit)
+    if 'likes' in expand:
+        result["likes_count"] = record["likes_count"]
+    return result
@@ -0,0 +1,83 @@
+# Cypher map projections returning the same fields as the models' to_dict(),
+# for the read paths that build their responses straight from the records.
+# A `fields` list (see parse_fields) restricts the projection, so that only
+# the requested properties are read and sent over Bolt. node_dict() is the
+# Python side of the same mapping, for the statements that return nodes.
+
+USER_FIELDS = {
+    "id": ".id",
+    "name": ".name",
+    "email": ".email",
+    "created_at": ".created_at",
+}
+
+POST_FIELDS = {
+    "id": ".id",
+    "title": ".title",
+    "content": ".content",
+    "created_at": ".created_at",
+    "like_count": "like_count: coalesce({var}.like_count, 0)",
+    "comment_count": "comment_count: coalesce({var}.comment_count, 0)",
+}
+
+COMMENT_FIELDS = {
+    "id": ".id",
+    "content": ".content",
+    "created_at": ".created_at",
+    "like_count": "like_count: coalesce({var}.like_count, 0)",
+}
+
+FIELDS = {"User": USER_FIELDS, "Post": POST_FIELDS, "Comment": COMMENT_FIELDS}
+
+# Maintained on the nodes, missing on the ones created before the counters
+COUNTERS = ("like_count", "comment_count")
+
+# Always returned: they identify the item and carry the pagination cursors
+KEY_FIELDS = ("id", "created_at")
+
+
+def parse_fields(fields, label):
+    """Parse a `fields` query parameter ("id,title") for a label, None meaning all fields"""
+    if not fields:
+        return None
+    names = [name.strip() for name in fields.split(',') if name.strip()]
+    unknown = [name for name in names if name not in FIELDS[label]]
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)}, expected {', '.join(FIELDS[label])}")
+    return [name for name in FIELDS[label] if name in names or name in KEY_FIELDS]
+
+
+def project(var, label, fields=None, extra=""):
+    """Map projection of `var` on the given fields; `extra` adds entries, e.g. "author: a {.id}" """
+    entries = [FIELDS[label][name].format(var=var) for name in (fields or FIELDS[label])]
+    if extra:
+        entries.append(extra)
+    return f"{var} {{{', '.join(entries)}}}"
+
+
+def node_dict(node, label, fields=None):
+    """Same dict as Model.wrap(node).to_dict(), read straight from the node properties"""
+    result = {}
+    for name in fields or FIELDS[label]:
+        value = node.get(name)
+        result[name] = (value or 0) if name in COUNTERS else value
+    return result
+
+
+def select(record, fields=None):
+    """Restrict an already fetched dict (e.g. a cached one) to the given fields, as a new dict"""
+    if fields is None:
+        return record
+    return {name: record[name] for name in fields if name in record}
+
+
+def user_map(var, fields=None):
+    return project(var, "User", fields)
+
+
+def post_map(var, fields=None):
+    return project(var, "Post", fields)
+
+
+def comment_map(var, fields=None, extra=""):
+    return project(var, "Comment", fields, extra)
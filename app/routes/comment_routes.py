@@ -1,23 +1,53 @@
 from flask import Blueprint, request, jsonify
 from app.controllers.comment_controller import CommentController
+from app.streaming import wants_ndjson, ndjson_response
+from app.versioning import conditional
 from app.database import graph
+from app.unit_of_work import transactional
+from app.idempotency import idempotent
 
 comment_bp = Blueprint('comment_bp', __name__)
 controller = CommentController(graph)
 
 @comment_bp.route('', methods=['GET'])
 def get_comments():
-    """Get all comments"""
-    result, status_code = controller.get_all_comments()
+    """Get all comments, paginated with `limit` and `after` or streamed as NDJSON"""
+    if wants_ndjson():
+        result, status_code = controller.stream_comments(request.args.get('after'), fields=request.args.get('fields'))
+        if status_code == 200:
+            return ndjson_response(result)
+        return jsonify(result), status_code
+
+    result, status_code = controller.get_all_comments(request.args.get('limit'), request.args.get('after'), fields=request.args.get('fields'))
+    return jsonify(result), status_code
+
+@comment_bp.route('/search', methods=['GET'])
+def search_comments():
+    """Search comments by keywords (`q`), most relevant first, optionally by `author_id` and between `since` and `until`"""
+    result, status_code = controller.search_comments(
+        request.args.get('q'), request.args.get('limit'), request.args.get('after'),
+        request.args.get('author_id'), request.args.get('since'), request.args.get('until'),
+        fields=request.args.get('fields')
+    )
+    return jsonify(result), status_code
+
+@comment_bp.route('/batch', methods=['POST'])
+@idempotent
+def create_comments_batch():
+    """Create many comments from a JSON array"""
+    data = request.get_json()
+    result, status_code = controller.create_comments_batch(data)
     return jsonify(result), status_code
 
 @comment_bp.route('/<comment_id>', methods=['GET'])
+@conditional('Comment', 'comment_id')
 def get_comment(comment_id):
     """Get a comment by ID"""
-    result, status_code = controller.get_comment_by_id(comment_id)
+    result, status_code = controller.get_comment_by_id(comment_id, fields=request.args.get('fields'))
     return jsonify(result), status_code
 
 @comment_bp.route('/<comment_id>', methods=['PUT'])
+@transactional
 def update_comment(comment_id):
     """Update a comment by ID"""
     data = request.get_json()
@@ -25,26 +55,32 @@ def update_comment(comment_id):
     return jsonify(result), status_code
 
 @comment_bp.route('/<comment_id>', methods=['DELETE'])
+@transactional
 def delete_comment(comment_id):
     """Delete a comment by ID"""
     result, status_code = controller.delete_comment(comment_id)
     return jsonify(result), status_code
 
 @comment_bp.route('/<comment_id>/like', methods=['POST'])
+@idempotent
+@transactional
 def like_comment(comment_id):
     """Like a comment"""
     data = request.get_json()
-    result, status_code = controller.like_comment(comment_id, data)
+    result, status_code = controller.like_comment(comment_id, (data or {}).get('user_id'))
     return jsonify(result), status_code
 
 @comment_bp.route('/<comment_id>/like', methods=['DELETE'])
+@transactional
 def unlike_comment(comment_id):
     """Unlike a comment"""
     data = request.get_json()
-    result, status_code = controller.unlike_comment(comment_id, data)
+    result, status_code = controller.unlike_comment(comment_id, (data or {}).get('user_id'))
     return jsonify(result), status_code
 
 @comment_bp.route('', methods=['POST'])
+@idempotent
+@transactional
 def create_comment():
     """Create a new comment"""
     data = request.get_json()
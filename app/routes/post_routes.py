@@ -1,24 +1,78 @@
 from flask import Blueprint, request, jsonify
 from app.controllers.post_controller import PostController
+from app.streaming import wants_ndjson, ndjson_response
+from app.versioning import conditional
+from app.post_detail import detail_version_query
 from app.database import graph
+from app.unit_of_work import transactional
+from app.idempotency import idempotent
 
 post_bp = Blueprint('post_bp', __name__)
 controller = PostController(graph)
 
 @post_bp.route('', methods=['GET'])
 def get_posts():
-    """Get all posts"""
-    result, status_code = controller.get_all_posts()
+    """Get all posts, paginated with `limit` and `after` or streamed as NDJSON"""
+    if wants_ndjson():
+        result, status_code = controller.stream_posts(request.args.get('after'), fields=request.args.get('fields'))
+        if status_code == 200:
+            return ndjson_response(result)
+        return jsonify(result), status_code
+
+    result, status_code = controller.get_all_posts(request.args.get('limit'), request.args.get('after'), fields=request.args.get('fields'))
+    return jsonify(result), status_code
+
+@post_bp.route('/search', methods=['GET'])
+def search_posts():
+    """Search posts by keywords (`q`), most relevant first, optionally by `author_id` and between `since` and `until`"""
+    result, status_code = controller.search_posts(
+        request.args.get('q'), request.args.get('limit'), request.args.get('after'),
+        request.args.get('author_id'), request.args.get('since'), request.args.get('until'),
+        fields=request.args.get('fields')
+    )
+    return jsonify(result), status_code
+
+@post_bp.route('/trending', methods=['GET'])
+def get_trending_posts():
+    """Get the posts ranked by time-decayed likes and comments over a `window` (1h, 24h, 7d)"""
+    result, status_code = controller.get_trending_posts(
+        request.args.get('window'), request.args.get('limit'), fields=request.args.get('fields')
+    )
+    return jsonify(result), status_code
+
+@post_bp.route('/batch', methods=['POST'])
+@idempotent
+def create_posts_batch():
+    """Create many posts from a JSON array"""
+    data = request.get_json()
+    result, status_code = controller.create_posts_batch(data)
+    return jsonify(result), status_code
+
+@post_bp.route('/likes/batch', methods=['POST'])
+@idempotent
+def like_posts_batch():
+    """Create many likes from a JSON array"""
+    data = request.get_json()
+    result, status_code = controller.like_posts_batch(data)
     return jsonify(result), status_code
 
 @post_bp.route('/<post_id>', methods=['GET'])
+@conditional('Post', 'post_id', detail_version_query)
 def get_post(post_id):
-    """Get a post by ID"""
-    result, status_code = controller.get_post_by_id(post_id)
+    """Get a post by ID, with `expand=author,comments,likes` to include related data"""
+    if request.args.get('expand'):
+        result, status_code = controller.get_post_detail(
+            post_id, request.args.get('expand'), request.args.get('comments_limit'), request.args.get('comments_after'),
+            fields=request.args.get('fields')
+        )
+        return jsonify(result), status_code
+
+    result, status_code = controller.get_post_by_id(post_id, fields=request.args.get('fields'))
     return jsonify(result), status_code
 
 
 @post_bp.route('/<post_id>', methods=['PUT'])
+@transactional
 def update_post(post_id):
     """Update a post by ID"""
     data = request.get_json()
@@ -26,12 +80,15 @@ def update_post(post_id):
     return jsonify(result), status_code
 
 @post_bp.route('/<post_id>', methods=['DELETE'])
+@transactional
 def delete_post(post_id):
     """Delete a post by ID"""
     result, status_code = controller.delete_post(post_id)
     return jsonify(result), status_code
 
 @post_bp.route('/<post_id>/like', methods=['POST'])
+@idempotent
+@transactional
 def like_post(post_id):
     """Like a post"""
     data = request.get_json()
@@ -39,19 +96,36 @@ def like_post(post_id):
     return jsonify(result), status_code
 
 @post_bp.route('/<post_id>/like', methods=['DELETE'])
+@transactional
 def unlike_post(post_id):
     """Unlike a post"""
     data = request.get_json()
     result, status_code = controller.unlike_post(post_id, data)
     return jsonify(result), status_code
 
+@post_bp.route('/<post_id>/creator', methods=['GET'])
+def get_post_creator(post_id):
+    """Get the creator of a post"""
+    result, status_code = controller.get_post_creator(post_id, fields=request.args.get('fields'))
+    return jsonify(result), status_code
+
+@post_bp.route('/<post_id>/likes', methods=['GET'])
+@conditional('Post', 'post_id')
+def get_likes_count(post_id):
+    """Get the number of likes for a post"""
+    result, status_code = controller.get_likes_count(post_id)
+    return jsonify(result), status_code
+
 @post_bp.route('/<post_id>/comments', methods=['GET'])
+@conditional('Post', 'post_id')
 def get_post_comments(post_id):
     """Get all comments for a post"""
-    result, status_code = controller.get_post_comments(post_id)
+    result, status_code = controller.get_post_comments(post_id, fields=request.args.get('fields'))
     return jsonify(result), status_code
 
 @post_bp.route('/<post_id>/comments', methods=['POST'])
+@idempotent
+@transactional
 def create_comment(post_id):
     """Create a comment for a post"""
     data = request.get_json()
@@ -59,6 +133,7 @@ def create_comment(post_id):
     return jsonify(result), status_code
 
 @post_bp.route('/<post_id>/comments/<comment_id>', methods=['DELETE'])
+@transactional
 def delete_post_comment(post_id, comment_id):
     """Delete a comment from a post"""
     result, status_code = controller.delete_post_comment(post_id, comment_id)
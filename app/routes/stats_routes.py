@@ -0,0 +1,27 @@
+from flask import Blueprint, jsonify
+from app.database import database
+from app.cache import cache
+from app.friend_index import friend_index
+from app.trending import trending
+
+stats_bp = Blueprint('stats_bp', __name__)
+
+@stats_bp.route('/database', methods=['GET'])
+def get_database_stats():
+    """Connection pool statistics of the current process"""
+    return jsonify(database.stats()), 200
+
+@stats_bp.route('/cache', methods=['GET'])
+def get_cache_stats():
+    """Hit, miss and eviction counters of the read cache"""
+    return jsonify(cache.stats()), 200
+
+@stats_bp.route('/friend-index', methods=['GET'])
+def get_friend_index_stats():
+    """Size and memory use of the in-memory friendship index"""
+    return jsonify(friend_index.stats()), 200
+
+@stats_bp.route('/trending', methods=['GET'])
+def get_trending_stats():
+    """Posts tracked by each window of the trending scores"""
+    return jsonify(trending.stats()), 200
@@ -1,30 +1,43 @@
 from flask import Blueprint, request, jsonify
 from app.database import graph
 from app.controllers.user_controller import UserController
+from app.streaming import wants_ndjson, ndjson_response
+from app.versioning import conditional
+from app.unit_of_work import transactional
+from app.idempotency import idempotent
 
 user_bp = Blueprint('user_bp', __name__)
 controller = UserController(graph)
 
 @user_bp.route('', methods=['GET'])
 def get_users():
-    """Get all users"""
+    """Get all users, paginated with `limit` and `after` or streamed as NDJSON"""
     try:
-        result, status_code = controller.get_all_users()
+        if wants_ndjson():
+            result, status_code = controller.stream_users(request.args.get('after'), fields=request.args.get('fields'))
+            if status_code == 200:
+                return ndjson_response(result)
+            return jsonify(result), status_code
+
+        result, status_code = controller.get_all_users(request.args.get('limit'), request.args.get('after'), fields=request.args.get('fields'))
         return jsonify(result), status_code
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
 @user_bp.route('/<user_id>', methods=['GET'])
+@conditional('User', 'user_id')
 def get_user(user_id):
     """Get a user by ID"""
     try:
-        result, status_code = controller.get_user_by_id(user_id)
+        result, status_code = controller.get_user_by_id(user_id, fields=request.args.get('fields'))
         return jsonify(result), status_code
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @user_bp.route('', methods=['POST'])
+@idempotent
+@transactional
 def create_user():
     """Create a new user"""
     try:
@@ -34,7 +47,19 @@ def create_user():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
     
+@user_bp.route('/batch', methods=['POST'])
+@idempotent
+def create_users_batch():
+    """Create many users from a JSON array"""
+    try:
+        data = request.get_json()
+        result, status_code = controller.create_users_batch(data)
+        return jsonify(result), status_code
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 @user_bp.route('/<user_id>', methods=['PUT'])
+@transactional
 def update_user(user_id):
     """Update a user by ID"""
     try :
@@ -45,6 +70,7 @@ def update_user(user_id):
         return jsonify({"error": str(e)}), 500
 
 @user_bp.route('/<user_id>', methods=['DELETE'])
+@transactional
 def delete_user(user_id):
     """Delete a user by ID"""
     try:
@@ -54,15 +80,18 @@ def delete_user(user_id):
         return jsonify({"error": str(e)}), 500
 
 @user_bp.route('/<user_id>/friends', methods=['GET'])
+@conditional('User', 'user_id')
 def get_friends(user_id):
     """Get all friends of a user"""
     try:
-        result, status_code = controller.get_user_friends(user_id)
+        result, status_code = controller.get_user_friends(user_id, fields=request.args.get('fields'))
         return jsonify(result), status_code
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @user_bp.route('/<user_id>/friends', methods=['POST'])
+@idempotent
+@transactional
 def add_friend(user_id):
     """Add a friend to a user"""
     try:
@@ -73,6 +102,7 @@ def add_friend(user_id):
         return jsonify({"error": str(e)}), 500
 
 @user_bp.route('/<user_id>/friends/<friend_id>', methods=['DELETE'])
+@transactional
 def remove_friend(user_id, friend_id):
     """Remove a friend from a user"""
     try:
@@ -90,11 +120,29 @@ def check_friendship(user_id, friend_id):
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@user_bp.route('/<user_id>/recommendations', methods=['GET'])
+def get_recommendations(user_id):
+    """Get the users a user may know, with `depth` and `limit`"""
+    try:
+        result, status_code = controller.get_recommendations(user_id, request.args.get('depth'), request.args.get('limit'), fields=request.args.get('fields'))
+        return jsonify(result), status_code
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@user_bp.route('/<user_id>/path/<other_id>', methods=['GET'])
+def get_path(user_id, other_id):
+    """Get a shortest chain of friends between two users, up to `max_depth` hops"""
+    try:
+        result, status_code = controller.get_path(user_id, other_id, request.args.get('max_depth'), fields=request.args.get('fields'))
+        return jsonify(result), status_code
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 @user_bp.route('/<user_id>/mutual-friends/<other_id>', methods=['GET'])
 def get_mutual_friends(user_id, other_id):
     """Get mutual friends between two users"""
     try:
-        result, status_code = controller.get_mutual_friends(user_id, other_id)
+        result, status_code = controller.get_mutual_friends(user_id, other_id, fields=request.args.get('fields'))
         return jsonify(result), status_code
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -103,12 +151,14 @@ def get_mutual_friends(user_id, other_id):
 def get_user_posts(user_id):
     """Get all posts by a user"""
     try:
-        result, status_code = controller.get_user_posts(user_id)
+        result, status_code = controller.get_user_posts(user_id, fields=request.args.get('fields'))
         return jsonify(result), status_code
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @user_bp.route('/<user_id>/posts', methods=['POST'])
+@idempotent
+@transactional
 def create_post(user_id):
     """Create a post for a user"""
     try:
@@ -119,4 +169,13 @@ def create_post(user_id):
         result, status_code = controller.add_user_post(user_id, data)
         return jsonify(result), status_code        
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
\ No newline at end of file
+        return jsonify({"error": str(e)}), 500
+
+@user_bp.route('/<user_id>/feed', methods=['GET'])
+def get_feed(user_id):
+    """Get the posts of a user's friends, newest first, paginated with `limit` and `after`"""
+    try:
+        result, status_code = controller.get_feed(user_id, request.args.get('limit'), request.args.get('after'), fields=request.args.get('fields'))
+        return jsonify(result), status_code
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
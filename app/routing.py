@@ -0,0 +1,61 @@
+import base64
+import json
+import time
+from flask import g, request, has_request_context
+from config import Config
+
+BOOKMARK_HEADER = 'Neo4j-Bookmark'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+def encode_bookmark(bookmarks, at):
+    """Opaque token of the Neo4j bookmarks of a write and the time it committed"""
+    payload = json.dumps({"bookmarks": bookmarks, "at": at}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_bookmark(token):
+    """Bookmarks and commit time of a token, ([], None) when absent or unreadable"""
+    if not token:
+        return [], None
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(token.encode()))
+        return [str(bookmark) for bookmark in payload["bookmarks"]], float(payload["at"])
+    except (ValueError, TypeError, KeyError):
+        return [], None
+
+
+def reads_from_followers(bookmark_at, now):
+    """Whether a read may be served by a follower, given the last write the client saw.
+
+    py2neo cannot hand the bookmark to the server, so the follower cannot be
+    asked to catch up first: for READ_YOUR_WRITES_SECONDS after a write the
+    reads of that client stay on the leader.
+    """
+    return bookmark_at is None or now - bookmark_at >= Config.READ_YOUR_WRITES_SECONDS
+
+
+def reading():
+    """Whether the statements of the current request go to read transactions"""
+    return has_request_context() and g.get('read_only', False)
+
+
+def record_bookmark(tx):
+    """Remember the bookmark values of a committed transaction, returned to the client"""
+    if has_request_context() and tx.bookmark is not None:
+        g.setdefault('bookmarks', []).extend(str(value) for value in tx.bookmark)
+
+
+def init_app(app):
+    """Route the statements of GET requests to read transactions and issue bookmarks after writes"""
+
+    @app.before_request
+    def route_request():
+        _, bookmark_at = decode_bookmark(request.headers.get(BOOKMARK_HEADER))
+        g.read_only = request.method in SAFE_METHODS and reads_from_followers(bookmark_at, time.time())
+
+    @app.after_request
+    def issue_bookmark(response):
+        if request.method not in SAFE_METHODS and response.status_code < 500:
+            response.headers[BOOKMARK_HEADER] = encode_bookmark(g.get('bookmarks', []), time.time())
+        return response
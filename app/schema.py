@@ -0,0 +1,63 @@
+# Constraints and indexes the queries of the models rely on.
+# Each uniqueness constraint is backed by an index with the same name.
+CONSTRAINTS = [
+    ("user_id_unique", "User", "id"),
+    ("user_email_unique", "User", "email"),
+    ("post_id_unique", "Post", "id"),
+    ("comment_id_unique", "Comment", "id"),
+]
+
+INDEXES = [
+    ("user_created_at", "User", "created_at"),
+    ("post_created_at", "Post", "created_at"),
+    ("comment_created_at", "Comment", "created_at"),
+]
+
+# Relationship property indexes, used to replay the recent likes and comments
+# into the trending scores
+RELATIONSHIP_INDEXES = [
+    ("likes_created_at", "LIKES", "created_at"),
+    ("has_comment_created_at", "HAS_COMMENT", "created_at"),
+]
+
+# Full-text (Lucene) indexes of the search endpoints
+FULLTEXT_INDEXES = [
+    ("post_text", "Post", ("title", "content")),
+    ("comment_text", "Comment", ("content",)),
+]
+
+
+def ensure_schema(graph):
+    """Create the missing constraints and indexes, returns the names that were missing"""
+    missing = schema_status(graph)["missing"]
+    for name, label, prop in CONSTRAINTS:
+        graph.run(f"CREATE CONSTRAINT {name} IF NOT EXISTS FOR (n:{label}) REQUIRE n.{prop} IS UNIQUE")
+    for name, label, prop in INDEXES:
+        graph.run(f"CREATE INDEX {name} IF NOT EXISTS FOR (n:{label}) ON (n.{prop})")
+    for name, rel_type, prop in RELATIONSHIP_INDEXES:
+        graph.run(f"CREATE INDEX {name} IF NOT EXISTS FOR ()-[r:{rel_type}]-() ON (r.{prop})")
+    for name, label, props in FULLTEXT_INDEXES:
+        properties = ", ".join(f"n.{prop}" for prop in props)
+        graph.run(f"CREATE FULLTEXT INDEX {name} IF NOT EXISTS FOR (n:{label}) ON EACH [{properties}]")
+    return missing
+
+
+def drop_schema(graph):
+    """Drop the constraints and indexes created by ensure_schema"""
+    for name, _, _ in CONSTRAINTS:
+        graph.run(f"DROP CONSTRAINT {name} IF EXISTS")
+    for name, _, _ in INDEXES + RELATIONSHIP_INDEXES + FULLTEXT_INDEXES:
+        graph.run(f"DROP INDEX {name} IF EXISTS")
+
+
+def schema_status(graph):
+    """Report which of the expected indexes exist (with their state) and which are missing"""
+    existing = {
+        record["name"]: record["state"]
+        for record in graph.run("SHOW INDEXES YIELD name, state RETURN name, state")
+    }
+    expected = [name for name, _, _ in CONSTRAINTS + INDEXES + RELATIONSHIP_INDEXES + FULLTEXT_INDEXES]
+    return {
+        "present": {name: existing[name] for name in expected if name in existing},
+        "missing": [name for name in expected if name not in existing],
+    }
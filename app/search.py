@@ -0,0 +1,51 @@
+import re
+from app.projections import post_map, comment_map
+
+# Characters with a meaning in the Lucene query syntax, escaped one by one
+# as QueryParser.escape does, so that `q` is always searched as plain keywords
+LUCENE_SPECIAL = re.compile(r'([+\-!(){}\[\]^"~*?:\\/&|])')
+
+# Operator keywords, lower-cased: the analyzer lower-cases the terms anyway
+LUCENE_OPERATORS = re.compile(r'\b(AND|OR|NOT)\b')
+
+# Relevance first, then id to break ties, as in the cursors
+KEY = ("score", "id")
+
+
+def parse_search(q, since=None, until=None):
+    """Validate the `q`, `since` and `until` query parameters of the search endpoints"""
+    if not q or not q.strip():
+        raise ValueError("q is required")
+    try:
+        since = float(since) if since else None
+        until = float(until) if until else None
+    except ValueError:
+        raise ValueError("since and until must be timestamps")
+    q = LUCENE_OPERATORS.sub(lambda match: match.group(1).lower(), q.strip())
+    return LUCENE_SPECIAL.sub(r'\\\1', q), since, until
+
+
+def search_query(index, var, label, projection):
+    """Keyset page of the full-text matches of `$q` in `index`, most relevant first.
+
+    The matches can be restricted to the ones created by `$author_id` and to
+    created_at in [`$since`, `$until`).
+    """
+    return (
+        f"CALL db.index.fulltext.queryNodes('{index}', $q) YIELD node AS {var}, score "
+        f"MATCH (a:User)-[:CREATED]->({var}:{label}) "
+        "WHERE ($author_id IS NULL OR a.id = $author_id) "
+        f"AND ($since IS NULL OR {var}.created_at >= $since) "
+        f"AND ($until IS NULL OR {var}.created_at < $until) "
+        f"AND ($after_score IS NULL OR score < $after_score OR (score = $after_score AND {var}.id > $after_id)) "
+        f"RETURN {projection} AS {var}, a.id AS author_id, score "
+        f"ORDER BY score DESC, {var}.id LIMIT $limit"
+    )
+
+
+def post_search_query(fields=None):
+    return search_query('post_text', 'p', 'Post', post_map('p', fields))
+
+
+def comment_search_query(fields=None):
+    return search_query('comment_text', 'c', 'Comment', comment_map('c', fields))
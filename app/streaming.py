@@ -0,0 +1,19 @@
+from flask import Response, current_app, request, stream_with_context
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+
+def wants_ndjson():
+    """True when the client opted in to NDJSON streaming"""
+    if request.args.get('stream', '').lower() in ('1', 'true', 'ndjson'):
+        return True
+    return request.accept_mimetypes.best == NDJSON_MIMETYPE
+
+
+def ndjson_response(records):
+    """Stream an iterable of dicts as one JSON document per line"""
+    def generate():
+        for record in records:
+            yield current_app.json.dumps(record) + '\n'
+
+    return Response(stream_with_context(generate()), mimetype=NDJSON_MIMETYPE)
@@ -0,0 +1,315 @@
+import json
+import os
+import socket
+import threading
+import time
+from collections import Counter
+from config import Config
+
+UNITS = {"m": 60, "h": 3600, "d": 86400}
+
+# Scores below this are dropped, so idle posts leave the structure
+EPSILON = 1e-6
+
+
+def parse_window(window):
+    """Seconds in a window written as a number and a unit: 30m, 1h, 7d"""
+    try:
+        seconds = int(window[:-1]) * UNITS[window[-1]]
+    except (KeyError, ValueError, IndexError):
+        raise ValueError(f"Invalid trending window: {window!r}")
+    if seconds <= 0:
+        raise ValueError(f"Invalid trending window: {window!r}")
+    return seconds
+
+
+class Window:
+    """Time-decayed like and comment counts of the posts over one window.
+
+    Events are counted in `buckets` time buckets of `seconds / buckets`; a
+    bucket `age` buckets old weighs `0.5 ** (age / half_life)` with a half life
+    of a quarter of the window, and the buckets older than the window are
+    dropped. Between two bucket boundaries every score decays by the same
+    factor, so the ranking only changes when an event is counted: `members`
+    holds the 2*k best scores and `floor` bounds every score left out of it,
+    which keeps each update and read O(k). The scores are recomputed when the
+    buckets move, once per bucket width.
+    """
+
+    def __init__(self, seconds, buckets, k):
+        self.width = seconds / buckets
+        self.size = buckets
+        self.half_life = buckets / 4
+        self.capacity = 2 * k
+        self.current = None
+        self.buckets = {}
+        self.scores = {}
+        self.members = {}
+        self.floor = 0.0
+
+    def decay(self, age):
+        return 0.5 ** (age / self.half_life)
+
+    def advance(self, now):
+        """Move the newest bucket to the one of `now`, dropping the expired buckets"""
+        index = int(now // self.width)
+        if self.current is not None and index <= self.current:
+            return
+        self.current = index
+        for expired in [b for b in self.buckets if b <= index - self.size]:
+            del self.buckets[expired]
+        self.rescore()
+
+    def rescore(self):
+        scores = {}
+        for index, counts in self.buckets.items():
+            weight = self.decay(self.current - index)
+            for post_id, count in counts.items():
+                scores[post_id] = scores.get(post_id, 0.0) + count * weight
+        self.scores = {post_id: score for post_id, score in scores.items() if score > EPSILON}
+        self.rebuild()
+
+    def rebuild(self):
+        ranked = sorted(self.scores.items(), key=lambda item: item[1], reverse=True)
+        self.members = dict(ranked[:self.capacity])
+        self.floor = ranked[self.capacity][1] if len(ranked) > self.capacity else 0.0
+
+    def add(self, post_id, weight, at):
+        """Count an event of `weight` at time `at`, a negative weight cancels one"""
+        self.advance(at)
+        index = int(at // self.width)
+        age = self.current - index
+        if age >= self.size:
+            return
+        counts = self.buckets.setdefault(index, {})
+        count = max(0.0, counts.get(post_id, 0.0) + weight)
+        applied = count - counts.get(post_id, 0.0)
+        if count > 0:
+            counts[post_id] = count
+        else:
+            counts.pop(post_id, None)
+        self.update(post_id, self.scores.get(post_id, 0.0) + applied * self.decay(age))
+
+    def update(self, post_id, score):
+        if score > EPSILON:
+            self.scores[post_id] = score
+        else:
+            self.scores.pop(post_id, None)
+            score = 0.0
+
+        if post_id in self.members:
+            if score > EPSILON and score >= self.floor:
+                self.members[post_id] = score
+            else:
+                del self.members[post_id]
+        elif score > self.floor:
+            self.members[post_id] = score
+            if len(self.members) > self.capacity:
+                evicted = min(self.members, key=self.members.get)
+                self.floor = max(self.floor, self.members.pop(evicted))
+
+    def remove(self, post_id):
+        for counts in self.buckets.values():
+            counts.pop(post_id, None)
+        self.scores.pop(post_id, None)
+        self.members.pop(post_id, None)
+
+    def top(self, limit):
+        """The `limit` best (post_id, score) pairs"""
+        if len(self.members) < limit and self.floor > 0:
+            # Cancelled events pushed members out: some left-out posts may rank now
+            self.rebuild()
+        return sorted(self.members.items(), key=lambda item: item[1], reverse=True)[:limit]
+
+    def snapshot(self):
+        return {"current": self.current, "buckets": {str(index): counts for index, counts in self.buckets.items()}}
+
+    def restore(self, state):
+        self.current = state["current"]
+        self.buckets = {int(index): counts for index, counts in state["buckets"].items()}
+        if self.current is not None:
+            self.rescore()
+
+
+class Trending:
+    """In-process ranking of the posts by time-decayed like and comment velocity.
+
+    like_post, unlike_post and create_comment count their events here, with
+    the timestamps stored on the LIKES and HAS_COMMENT edges. The buckets of
+    every window are checkpointed to (:TrendingCheckpoint) nodes at most every
+    TRENDING_CHECKPOINT_INTERVAL seconds, one per window and process; on the
+    first read a process restores the latest checkpoint of each window and
+    replays the edges created since. Like the friend index, each worker then
+    only sees the events it serves itself; unlikes served by other workers
+    are not replayed.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self.loaded = False
+        self._windows = None
+        # Events recorded while a load runs, applied to the loaded windows
+        self._pending = None
+        self._checkpointed_at = 0.0
+
+    @property
+    def windows(self):
+        if self._windows is None:
+            self._windows = self._new_windows()
+        return self._windows
+
+    def _new_windows(self):
+        return {
+            name: Window(parse_window(name), Config.TRENDING_BUCKETS, Config.TRENDING_TOP_K)
+            for name in Config.TRENDING_WINDOWS.split(',')
+        }
+
+    def like(self, graph, post_id, at):
+        self._record(graph, post_id, Config.TRENDING_LIKE_WEIGHT, at)
+
+    def unlike(self, graph, post_id, liked_at):
+        # Likes stored before the edges had a timestamp were never counted
+        if liked_at is not None:
+            self._record(graph, post_id, -Config.TRENDING_LIKE_WEIGHT, liked_at)
+
+    def comment(self, graph, post_id, at):
+        self._record(graph, post_id, Config.TRENDING_COMMENT_WEIGHT, at)
+
+    def remove(self, post_id):
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append((post_id, None, None))
+            for window in self.windows.values():
+                window.remove(post_id)
+
+    def _record(self, graph, post_id, weight, at):
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append((post_id, weight, at))
+            for window in self.windows.values():
+                window.add(post_id, weight, at)
+        self._maybe_checkpoint(graph)
+
+    def top(self, graph, window, limit):
+        """The `limit` best (post_id, score) pairs of a window, scores as of now"""
+        if not self.loaded:
+            self.load(graph)
+        with self._lock:
+            counts = self.windows[window]
+            counts.advance(time.time())
+            ranked = counts.top(limit)
+        self._maybe_checkpoint(graph)
+        return ranked
+
+    def load(self, graph):
+        """Restore the last checkpoints and replay the likes and comments created since.
+
+        Concurrent first reads wait for a single load. The events recorded
+        while it runs are applied to the loaded windows, except those the
+        replay already counted.
+        """
+        with self._load_lock:
+            if self.loaded:
+                return
+            with self._lock:
+                self._pending = []
+            try:
+                windows, replayed = self._replay(graph)
+            except Exception:
+                with self._lock:
+                    self._pending = None
+                raise
+
+            with self._lock:
+                replayed = Counter(replayed)
+                for post_id, weight, at in self._pending:
+                    if weight is None:
+                        for window in windows.values():
+                            window.remove(post_id)
+                    elif replayed[(post_id, weight, at)]:
+                        replayed[(post_id, weight, at)] -= 1
+                    else:
+                        for window in windows.values():
+                            window.add(post_id, weight, at)
+                self._pending = None
+                self._windows = windows
+                self._checkpointed_at = time.time()
+                self.loaded = True
+
+    def _replay(self, graph):
+        """New windows restored from the checkpoints, and the (post_id, weight, at) events replayed into them"""
+        windows = self._new_windows()
+        # Ordered by saved_at, so that the latest checkpoint of each window wins
+        saved = {
+            record["window"]: record
+            for record in graph.run(
+                "MATCH (t:TrendingCheckpoint) "
+                "RETURN t.window AS window, t.state AS state, t.saved_at AS saved_at ORDER BY saved_at"
+            )
+        }
+        oldest = time.time() - max(window.width * window.size for window in windows.values())
+        since = {}
+        for name, window in windows.items():
+            if name in saved:
+                window.restore(json.loads(saved[name]["state"]))
+                since[name] = saved[name]["saved_at"]
+            else:
+                since[name] = oldest
+
+        events = graph.run(
+            "MATCH (:User)-[r:LIKES]->(p:Post) WHERE r.created_at > $since "
+            "RETURN p.id AS post_id, r.created_at AS at, $like AS weight "
+            "UNION ALL "
+            "MATCH (p:Post)-[r:HAS_COMMENT]->(:Comment) WHERE r.created_at > $since "
+            "RETURN p.id AS post_id, r.created_at AS at, $comment AS weight",
+            since=min(since.values()), like=Config.TRENDING_LIKE_WEIGHT, comment=Config.TRENDING_COMMENT_WEIGHT
+        ).data()
+        events.sort(key=lambda event: event["at"])
+        for name, window in windows.items():
+            for event in events:
+                if event["at"] > since[name]:
+                    window.add(event["post_id"], event["weight"], event["at"])
+        return windows, [(event["post_id"], event["weight"], event["at"]) for event in events]
+
+    def _maybe_checkpoint(self, graph):
+        if self.loaded and time.time() - self._checkpointed_at >= Config.TRENDING_CHECKPOINT_INTERVAL:
+            self.checkpoint(graph)
+
+    def checkpoint(self, graph):
+        """Save the buckets of every window to the graph, under the key of this process"""
+        with self._lock:
+            saved_at = time.time()
+            rows = [
+                {"window": name, "state": json.dumps(window.snapshot())}
+                for name, window in self.windows.items()
+            ]
+            expired = saved_at - max(window.width * window.size for window in self.windows.values())
+            self._checkpointed_at = saved_at
+        # A write transaction, although it usually runs during a GET request.
+        # Each worker keeps its own checkpoints; those of stopped workers are
+        # dropped once older than the longest window, when nothing is left in them.
+        with graph.transaction() as tx:
+            tx.run(
+                "UNWIND $rows AS row "
+                "MERGE (t:TrendingCheckpoint {window: row.window, owner: $owner}) "
+                "SET t.state = row.state, t.saved_at = $saved_at",
+                rows=rows, owner=f"{socket.gethostname()}:{os.getpid()}", saved_at=saved_at
+            )
+            tx.run("MATCH (t:TrendingCheckpoint) WHERE t.saved_at < $expired DELETE t", expired=expired)
+
+    def stats(self):
+        """Posts tracked by each window"""
+        if not self.loaded:
+            return {"loaded": False}
+        with self._lock:
+            return {
+                "loaded": True,
+                "windows": {
+                    name: {"posts": len(window.scores), "top": len(window.members), "buckets": len(window.buckets)}
+                    for name, window in self.windows.items()
+                },
+            }
+
+
+trending = Trending()
@@ -0,0 +1,143 @@
+import logging
+import random
+import time
+from contextlib import ExitStack
+from functools import wraps
+from flask import g, current_app, jsonify
+from py2neo.errors import Neo4jError, ConnectionBroken, ConnectionUnavailable, ServiceUnavailable
+from app.database import database, current_unit
+from app.routing import record_bookmark
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Failures worth running the request again: the server rejected the
+# transaction (deadlock, lock timeout, leader switch) or no connection could
+# be used before anything was committed
+RETRIABLE_CONNECTION_ERRORS = (ConnectionBroken, ConnectionUnavailable, ServiceUnavailable)
+
+
+def is_transient(error, committing=False):
+    if isinstance(error, Neo4jError):
+        return error.should_retry()
+    # A connection lost during the commit may have committed: never replay it
+    return not committing and isinstance(error, RETRIABLE_CONNECTION_ERRORS)
+
+
+def backoff(attempt):
+    """Seconds to wait before retry number `attempt` (from 0), with full jitter"""
+    ceiling = min(Config.TRANSACTION_RETRY_MAX_MS, Config.TRANSACTION_RETRY_BASE_MS * 2 ** attempt)
+    return random.uniform(0, ceiling) / 1000
+
+
+class UnitOfWork:
+    """One explicit transaction shared by every statement of a request.
+
+    While a unit is open (in `g.unit_of_work`), GraphProxy runs the
+    statements of the controllers in its transaction instead of one
+    auto-commit transaction each, and remembers the first one that failed,
+    even when the controller caught the error. Side effects outside Neo4j
+    (cache invalidation, in-process indexes) are registered with
+    `after_commit` and only run once the transaction is committed.
+    """
+
+    def __init__(self, database):
+        self.database = database
+        self.graph = None
+        self.tx = None
+        self.error = None
+        self.committing = False
+        self.committed = False
+        self._stack = ExitStack()
+        self._callbacks = []
+
+    def begin(self):
+        self.graph = self._stack.enter_context(self.database.lease())
+        self.tx = self.graph.begin()
+
+    def call(self, fn, *args):
+        try:
+            return fn(*args)
+        except Exception as e:
+            if self.error is None:
+                self.error = e
+            raise
+
+    def after_commit(self, fn, *args, **kwargs):
+        self._callbacks.append((fn, args, kwargs))
+
+    def commit(self):
+        self.committing = True
+        with self._stack:
+            self.graph.commit(self.tx)
+        self.committed = True
+        record_bookmark(self.tx)
+
+    def rollback(self):
+        with self._stack:
+            if self.tx is not None:
+                try:
+                    self.graph.rollback(self.tx)
+                except Exception as e:
+                    logger.warning("Rollback failed: %s", e)
+
+    def run_callbacks(self):
+        for fn, args, kwargs in self._callbacks:
+            try:
+                fn(*args, **kwargs)
+            except Exception as e:
+                logger.warning("After-commit callback %s failed: %s", getattr(fn, '__qualname__', fn), e)
+
+
+def after_commit(fn, *args, **kwargs):
+    """Call `fn` once the current unit of work commits, or right away outside of one"""
+    unit = current_unit()
+    if unit is None:
+        return fn(*args, **kwargs)
+    unit.after_commit(fn, *args, **kwargs)
+
+
+def transactional(view):
+    """Run a write view in one unit of work, committed if it answers below 500.
+
+    The whole view is run again, on a new transaction, when a statement or the
+    commit fails with a transient error, at most TRANSACTION_RETRIES times
+    with a jittered exponential backoff. Nested transactional views and
+    `graph.transaction()` blocks join the open unit.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if current_unit() is not None:
+            return view(*args, **kwargs)
+
+        attempt = 0
+        while True:
+            unit = UnitOfWork(database)
+            g.unit_of_work = unit
+            response = None
+            try:
+                unit.begin()
+                response = current_app.make_response(view(*args, **kwargs))
+                if unit.error is None and response.status_code < 500:
+                    unit.commit()
+                else:
+                    unit.rollback()
+            except Exception as e:
+                if unit.error is None or unit.committing:
+                    unit.error = e
+                if not unit.committing:
+                    unit.rollback()
+            finally:
+                g.pop('unit_of_work', None)
+
+            if unit.committed:
+                unit.run_callbacks()
+                return response
+            if attempt >= Config.TRANSACTION_RETRIES or not is_transient(unit.error, unit.committing):
+                if response is None or unit.committing:
+                    return jsonify({"error": str(unit.error)}), 500
+                return response
+            logger.warning("Retrying %s after a transient error: %s", view.__name__, unit.error)
+            time.sleep(backoff(attempt))
+            attempt += 1
+    return wrapper
@@ -0,0 +1,65 @@
+import hashlib
+from datetime import datetime, timezone
+from functools import wraps
+from flask import make_response, request
+from app.database import graph
+
+
+def touch(var):
+    """Cypher SET items bumping the version of a node on every write.
+
+    The version and updated_at of User, Post and Comment nodes back the ETag
+    and Last-Modified headers of the entity endpoints and of the collections
+    the node owns (friends of a user, comments of a post).
+    """
+    return f"{var}.version = coalesce({var}.version, 0) + 1, {var}.updated_at = timestamp() / 1000.0"
+
+
+def version_query(label):
+    """Cypher returning the version and last update time of a node, without fetching it"""
+    return (
+        f"MATCH (n:{label} {{id: $id}}) "
+        "RETURN coalesce(n.version, 0) AS version, coalesce(n.updated_at, n.created_at) AS updated_at"
+    )
+
+
+def validators(request, version, updated_at):
+    """ETag and Last-Modified of the current request, and whether the client is up to date"""
+    etag = hashlib.sha1(f"{request.full_path}:{version}".encode()).hexdigest()
+    last_modified = datetime.fromtimestamp(int(updated_at or 0), tz=timezone.utc)
+    if request.if_none_match:
+        not_modified = request.if_none_match.contains(etag)
+    else:
+        not_modified = request.if_modified_since is not None and last_modified <= request.if_modified_since
+    return etag, last_modified, not_modified
+
+
+def conditional(label, id_arg, query=None):
+    """Answer a GET view with 304 when the client already has the current version.
+
+    The ETag is derived from the request path, query string and the version
+    of the node identified by the `id_arg` view argument, so the view (and
+    its Cypher) only runs when the representation may have changed. When the
+    representation also shows other nodes, `query(request)` returns a
+    statement like version_query that folds in their versions.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(**kwargs):
+            statement = query(request) if query else version_query(label)
+            result = graph.run(statement, id=kwargs[id_arg]).data()
+            if not result:
+                return view(**kwargs)
+
+            etag, last_modified, not_modified = validators(request, result[0]["version"], result[0]["updated_at"])
+            if not_modified:
+                response = make_response('', 304)
+            else:
+                response = make_response(view(**kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag)
+            response.last_modified = last_modified
+            return response
+        return wrapper
+    return decorator
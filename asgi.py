@@ -0,0 +1,5 @@
+from app.aio import create_async_app
+from config import Config
+
+# Async serving mode, e.g. `hypercorn asgi:app`
+app = create_async_app(Config)
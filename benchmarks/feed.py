@@ -0,0 +1,109 @@
+"""Home feed latency with fan-out-on-read and with materialized timelines.
+
+Generates users who befriend `--friends` random users and write `--posts`
+posts each, times a feed page in `read` mode, builds the timelines and times
+the same pages in `timeline` mode. Also reports the cost of pushing one post
+to the timelines of its author's friends. The generated data is deleted at
+the end:
+
+    python -m benchmarks.feed --users 2000 --friends 200 --posts 20 --reads 300
+"""
+import argparse
+import random
+import statistics
+import time
+import uuid
+
+from app import feed
+from app.database import graph
+from config import Config
+
+CHUNK_SIZE = 10000
+
+
+def generate(users, friends, posts):
+    ids = [str(uuid.uuid4()) for _ in range(users)]
+    now = time.time()
+    graph.run(
+        "UNWIND $ids AS id CREATE (:User {id: id, name: 'bench', email: id + '@example.com', created_at: $now, bench: true})",
+        ids=ids, now=now
+    )
+    pairs = [
+        {"user_id": user_id, "friend_id": friend_id}
+        for user_id in ids
+        for friend_id in random.sample(ids, min(friends, users))
+        if friend_id != user_id
+    ]
+    for start in range(0, len(pairs), CHUNK_SIZE):
+        graph.run(
+            "UNWIND $rows AS row "
+            "MATCH (u:User {id: row.user_id}), (f:User {id: row.friend_id}) "
+            "MERGE (u)-[:FRIENDS_WITH]-(f)",
+            rows=pairs[start:start + CHUNK_SIZE]
+        )
+    rows = [
+        {"user_id": user_id, "id": str(uuid.uuid4()), "created_at": now - random.random() * 86400 * 30}
+        for user_id in ids
+        for _ in range(posts)
+    ]
+    for start in range(0, len(rows), CHUNK_SIZE):
+        graph.run(
+            "UNWIND $rows AS row "
+            "MATCH (u:User {id: row.user_id}) "
+            "CREATE (u)-[:CREATED]->(:Post {id: row.id, title: 'bench', content: 'bench', created_at: row.created_at, bench: true})",
+            rows=rows[start:start + CHUNK_SIZE]
+        )
+    return ids
+
+
+def measure(fn, keys):
+    timings = []
+    for key in keys:
+        start = time.perf_counter()
+        fn(key)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {
+        "mean_ms": statistics.mean(timings),
+        "p50_ms": timings[len(timings) // 2],
+        "p95_ms": timings[int(len(timings) * 0.95) - 1],
+    }
+
+
+def run(users, friends, posts, reads, limit):
+    print(f"Generating {users} users, {friends} friends and {posts} posts each...")
+    ids = generate(users, friends, posts)
+    sample = [random.choice(ids) for _ in range(reads)]
+    mode = Config.FEED_MODE
+
+    try:
+        results = {"read": measure(lambda user_id: feed.get_page(graph, user_id, limit, mode='read'), sample)}
+        feed.rebuild_timelines(graph)
+        results["timeline"] = measure(lambda user_id: feed.get_page(graph, user_id, limit, mode='timeline'), sample)
+
+        Config.FEED_MODE = 'timeline'
+        post_ids = [
+            record["id"] for record in graph.run(
+                "MATCH (:User {bench: true})-[:CREATED]->(p:Post) RETURN p.id AS id LIMIT $count", count=reads
+            )
+        ]
+        results["push"] = measure(lambda post_id: feed.push_posts(graph, [post_id]), post_ids)
+    finally:
+        Config.FEED_MODE = mode
+        graph.run("MATCH (n {bench: true}) CALL { WITH n DETACH DELETE n } IN TRANSACTIONS OF 10000 ROWS")
+
+    print(f"{'operation':<12}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}")
+    for name, stats in results.items():
+        print(f"{name:<12}{stats['mean_ms']:>10.3f}{stats['p50_ms']:>10.3f}{stats['p95_ms']:>10.3f}")
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=2000)
+    parser.add_argument('--friends', type=int, default=200)
+    parser.add_argument('--posts', type=int, default=20)
+    parser.add_argument('--reads', type=int, default=300)
+    parser.add_argument('--limit', type=int, default=50)
+    args = parser.parse_args()
+    run(args.users, args.friends, args.posts, args.reads, args.limit)
@@ -0,0 +1,135 @@
+"""Synthetic social graph for the benchmarks.
+
+`generate` builds the users, friendships, posts, comments and likes in
+memory from a seed, so the same arguments always give the same graph;
+`write` stores it in Neo4j with every node tagged `bench: true`, and
+`delete` removes them. Like the API, each friendship is one FRIENDS_WITH
+relationship and the like/comment counters are stored on the nodes.
+"""
+import random
+import time
+import uuid
+
+CHUNK_SIZE = 10000
+DISTRIBUTIONS = ('uniform', 'powerlaw')
+
+
+class Dataset:
+    def __init__(self):
+        self.users = []
+        self.friendships = []
+        self.posts = []
+        self.authors = {}
+        self.comments = []
+        self.likes = []
+
+    def stats(self):
+        return {
+            "users": len(self.users),
+            "friendships": len(self.friendships),
+            "posts": len(self.posts),
+            "comments": len(self.comments),
+            "likes": len(self.likes),
+        }
+
+
+def degrees(users, degree, distribution, rng):
+    """Number of friendships started by each user, `degree` on average"""
+    if distribution == 'uniform':
+        return [min(degree, users - 1)] * users
+    # Pareto with shape 2 and mean `degree`: most users have a few friends, some have a lot
+    scale = degree / 2
+    return [min(users - 1, int(scale * rng.paretovariate(2))) for _ in range(users)]
+
+
+def generate(users, degree, distribution='powerlaw', posts=10, comments=2, likes=20, seed=42):
+    rng = random.Random(seed)
+    uid = lambda: str(uuid.UUID(int=rng.getrandbits(128), version=4))
+    now = time.time()
+    dataset = Dataset()
+
+    dataset.users = [
+        {"id": uid(), "name": f"User {i}", "email": f"bench-{i}@example.com", "created_at": now - rng.random() * 86400 * 365}
+        for i in range(users)
+    ]
+    ids = [user["id"] for user in dataset.users]
+
+    pairs = set()
+    for i, count in enumerate(degrees(users, degree, distribution, rng)):
+        for j in rng.sample(range(users), count):
+            if i != j:
+                pairs.add((min(i, j), max(i, j)))
+    dataset.friendships = [(ids[i], ids[j]) for i, j in sorted(pairs)]
+
+    for user_id in ids:
+        for _ in range(posts):
+            post = {
+                "id": uid(), "title": "Benchmark post", "content": "Lorem ipsum dolor sit amet " * 4,
+                "created_at": now - rng.random() * 86400 * 30, "like_count": 0, "comment_count": 0,
+            }
+            dataset.posts.append(post)
+            dataset.authors[post["id"]] = user_id
+
+    for post in dataset.posts:
+        for _ in range(comments):
+            dataset.comments.append({
+                "id": uid(), "content": "Benchmark comment", "created_at": post["created_at"] + rng.random() * 3600,
+                "like_count": 0, "post_id": post["id"], "user_id": rng.choice(ids),
+            })
+        post["comment_count"] = comments
+
+    for user_id in ids:
+        for post in rng.sample(dataset.posts, min(likes, len(dataset.posts))):
+            dataset.likes.append((user_id, post["id"]))
+            post["like_count"] += 1
+
+    return dataset
+
+
+def chunks(rows):
+    for start in range(0, len(rows), CHUNK_SIZE):
+        yield rows[start:start + CHUNK_SIZE]
+
+
+def write(graph, dataset):
+    for rows in chunks(dataset.users):
+        graph.run(
+            "UNWIND $rows AS row "
+            "CREATE (:User {id: row.id, name: row.name, email: row.email, created_at: row.created_at, "
+            "version: 1, updated_at: row.created_at, bench: true})",
+            rows=rows
+        )
+    for rows in chunks([{"a": a, "b": b} for a, b in dataset.friendships]):
+        graph.run(
+            "UNWIND $rows AS row "
+            "MATCH (a:User {id: row.a}), (b:User {id: row.b}) "
+            "CREATE (a)-[:FRIENDS_WITH]->(b)",
+            rows=rows
+        )
+    for rows in chunks([dict(post, user_id=dataset.authors[post["id"]]) for post in dataset.posts]):
+        graph.run(
+            "UNWIND $rows AS row "
+            "MATCH (u:User {id: row.user_id}) "
+            "CREATE (u)-[:CREATED]->(:Post {id: row.id, title: row.title, content: row.content, created_at: row.created_at, "
+            "version: 1, updated_at: row.created_at, like_count: row.like_count, comment_count: row.comment_count, bench: true})",
+            rows=rows
+        )
+    for rows in chunks(dataset.comments):
+        graph.run(
+            "UNWIND $rows AS row "
+            "MATCH (u:User {id: row.user_id}), (p:Post {id: row.post_id}) "
+            "CREATE (u)-[:CREATED]->(:Comment {id: row.id, content: row.content, created_at: row.created_at, "
+            "version: 1, updated_at: row.created_at, like_count: 0, bench: true})<-[:HAS_COMMENT {created_at: row.created_at}]-(p)",
+            rows=rows
+        )
+    for rows in chunks([{"user_id": user_id, "post_id": post_id} for user_id, post_id in dataset.likes]):
+        graph.run(
+            "UNWIND $rows AS row "
+            "MATCH (u:User {id: row.user_id}), (p:Post {id: row.post_id}) "
+            "CREATE (u)-[:LIKES]->(p)",
+            rows=rows
+        )
+
+
+def delete(graph):
+    graph.run("MATCH (n {bench: true}) CALL { WITH n DETACH DELETE n } IN TRANSACTIONS OF 10000 ROWS")
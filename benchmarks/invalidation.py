@@ -0,0 +1,190 @@
+"""Cache invalidation check against an in-memory stand-in graph.
+
+`StandInGraph` keeps a few users, posts and comments in dicts and answers
+the statements of the endpoints exercised here, recognized by their shape,
+behind the part of the py2neo Graph interface used by app.database. The check
+reads an entity through the app (filling the in-process cache), sends a
+write that changes it, then reads it again and compares the body with the
+state of the stand-in:
+
+    python -m benchmarks.invalidation
+
+The exit code is 1 when a read after a write returned stale data.
+"""
+import itertools
+import re
+import sys
+import types
+
+from py2neo import Node
+
+
+class StandInCursor:
+    def __init__(self, records=()):
+        self._records = list(records)
+
+    def data(self):
+        return list(self._records)
+
+    def evaluate(self):
+        return next(iter(self._records[0].values())) if self._records else None
+
+    def stats(self):
+        return {}
+
+    def __iter__(self):
+        return iter(self._records)
+
+
+class StandInTransaction:
+    def __init__(self, graph):
+        self.graph = graph
+        self.bookmark = None
+
+    def run(self, cypher, parameters=None, **kwparameters):
+        return self.graph.run(cypher, parameters, **kwparameters)
+
+    def evaluate(self, cypher, parameters=None, **kwparameters):
+        return self.graph.evaluate(cypher, parameters, **kwparameters)
+
+
+class StandInGraph:
+    def __init__(self):
+        self.service = types.SimpleNamespace(connector=types.SimpleNamespace(_pools={}))
+        self.users = {"u1": {"id": "u1", "name": "Ada", "email": "ada@example.com", "created_at": 1.0}}
+        self.posts = {
+            post_id: {"id": post_id, "title": "Title", "content": "Content", "created_at": 1.0,
+                      "like_count": 0, "comment_count": 0, "version": 1, "updated_at": 1.0}
+            for post_id in ("p1", "p2")
+        }
+        self.comments = {}
+        self._clock = itertools.count(2)
+
+        self.handlers = [
+            (r"^MATCH \(n:Post \{id: \$id\}\) RETURN coalesce\(n\.version", self.post_version),
+            (r"^MATCH \(p:Post \{id: \$id\}\) RETURN p \{", self.post_projection),
+            (r"^MATCH \(p:Post \{id: '([^']*)'\}\) RETURN p$", self.post_node),
+            (r"^MATCH \(c:Comment \{id: \$id\}\) RETURN c$", self.comment_node),
+            (r"^UNWIND \$rows AS row .*CREATE \(u\)-\[:CREATED\]->\(:Comment", self.create_comments),
+            (r"CREATE \(u\)-\[:CREATED\]->\(:Comment", self.create_comment),
+            (r"^MATCH \(c:Comment \{id: \$id\}\) .*DETACH DELETE c", self.delete_comment),
+            (r"^MATCH \(p:Post \{id: \$post_id\}\)-\[r:HAS_COMMENT\]->\(c:Comment \{id: \$comment_id\}\) DELETE r", self.unlink_comment),
+        ]
+
+    def run(self, cypher, parameters=None, **kwparameters):
+        parameters = dict(parameters or {}, **kwparameters)
+        for pattern, handler in self.handlers:
+            match = re.search(pattern, cypher)
+            if match:
+                return StandInCursor(handler(parameters, match))
+        return StandInCursor()
+
+    def evaluate(self, cypher, parameters=None, **kwparameters):
+        return self.run(cypher, parameters, **kwparameters).evaluate()
+
+    def auto(self, readonly=False):
+        return self
+
+    def begin(self, readonly=False):
+        return StandInTransaction(self)
+
+    def commit(self, tx):
+        pass
+
+    def rollback(self, tx):
+        pass
+
+    def touch(self, post_id, delta):
+        post = self.posts[post_id]
+        post["comment_count"] += delta
+        post["version"] += 1
+        post["updated_at"] = float(next(self._clock))
+
+    def post_version(self, p, m):
+        post = self.posts.get(p["id"])
+        return [{"version": post["version"], "updated_at": post["updated_at"]}] if post else []
+
+    def post_projection(self, p, m):
+        post = self.posts.get(p["id"])
+        keys = ("id", "title", "content", "created_at", "like_count", "comment_count")
+        return [{"p": {key: post[key] for key in keys}}] if post else []
+
+    def post_node(self, p, m):
+        post = self.posts.get(m.group(1))
+        return [{"p": Node("Post", **post)}] if post else []
+
+    def comment_node(self, p, m):
+        return [{"c": Node("Comment", id=p["id"])}] if p["id"] in self.comments else []
+
+    def create_comment(self, p, m):
+        user_found, post_found = p["user_id"] in self.users, p["post_id"] in self.posts
+        if user_found and post_found:
+            self.comments[p["id"]] = p["post_id"]
+            self.touch(p["post_id"], 1)
+        return [{"user_found": user_found, "post_found": post_found}]
+
+    def create_comments(self, p, m):
+        records = []
+        for row in p["rows"]:
+            if row["user_id"] in self.users and row["post_id"] in self.posts:
+                self.comments[row["id"]] = row["post_id"]
+                self.touch(row["post_id"], 1)
+                records.append({"idx": row["idx"], "post_id": row["post_id"]})
+        return records
+
+    def delete_comment(self, p, m):
+        post_id = self.comments.pop(p["id"], None)
+        if post_id is None:
+            return []
+        self.touch(post_id, -1)
+        return [{"post_id": post_id}]
+
+    def unlink_comment(self, p, m):
+        if self.comments.get(p["comment_id"]) == p["post_id"]:
+            del self.comments[p["comment_id"]]
+            self.touch(p["post_id"], -1)
+        return []
+
+
+def check():
+    from app import create_app
+    from app.database import database
+    from config import Config
+
+    graph = StandInGraph()
+    database.attach(graph)
+    client = create_app(Config).test_client()
+    created = []
+
+    def create_comment(post_id):
+        response = client.post(f"/posts/{post_id}/comments", json={"user_id": "u1", "content": "Hi"})
+        created.append(response.get_json()["comment"]["id"])
+        return response
+
+    def comment_count(post_id):
+        return lambda: client.get(f"/posts/{post_id}").get_json()["post"]["comment_count"]
+
+    steps = [
+        ("POST /posts/:id/comments", "p1", lambda: create_comment("p1")),
+        ("POST /comments", "p1", lambda: client.post("/comments", json={"user_id": "u1", "post_id": "p1", "content": "Hi"})),
+        ("POST /comments/batch", "p2", lambda: client.post("/comments/batch", json=[{"user_id": "u1", "post_id": "p2", "content": "Hi"}])),
+        ("DELETE /comments/:id", "p1", lambda: client.delete(f"/comments/{created[0]}")),
+        ("POST /posts/:id/comments", "p2", lambda: create_comment("p2")),
+        ("DELETE /posts/:id/comments/:id", "p2", lambda: client.delete(f"/posts/p2/comments/{created[1]}")),
+    ]
+
+    failures = 0
+    print(f"{'write':<34}{'status':>8}  {'comment_count':>14}{'expected':>10}")
+    for name, post_id, write in steps:
+        read = comment_count(post_id)
+        read()
+        status = write().status_code
+        got, expected = read(), graph.posts[post_id]["comment_count"]
+        ok = got == expected and status < 500
+        failures += not ok
+        print(f"{name:<34}{status:>8}  {got:>14}{expected:>10}  {'' if ok else 'STALE'}")
+    return failures
+
+
+if __name__ == '__main__':
+    sys.exit(1 if check() else 0)
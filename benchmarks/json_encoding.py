@@ -0,0 +1,80 @@
+"""Serialization time of the GET /posts response with the stdlib and orjson encoders.
+
+Builds a page of `--posts` post dicts shaped like the ones `GET /posts`
+returns and times `jsonify` on it with JSON_ENCODER=stdlib and orjson (when
+installed). Runs without a database:
+
+    python -m benchmarks.json_encoding --posts 50000
+
+With `--live`, also times the whole `GET /posts?limit=<posts>` request
+against the configured database, which must hold that many posts.
+"""
+import argparse
+import statistics
+import time
+import uuid
+
+from flask import jsonify
+
+from app import create_app
+from app.json_provider import orjson
+from config import Config
+
+
+def posts(count):
+    now = time.time()
+    return {
+        "posts": [
+            {
+                "id": str(uuid.uuid4()), "title": f"Post {i}", "content": "Lorem ipsum dolor sit amet " * 4,
+                "created_at": now + i / 7, "like_count": i % 50, "comment_count": i % 7,
+            }
+            for i in range(count)
+        ],
+        "next_cursor": None,
+    }
+
+
+def measure(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return {"mean_ms": statistics.mean(timings), "min_ms": min(timings)}
+
+
+def run(count, repeat, live=False):
+    Config.PAGE_SIZE_MAX = max(Config.PAGE_SIZE_MAX, count)
+    app = create_app(Config)
+    body = posts(count)
+    encoders = ['stdlib'] + (['orjson'] if orjson is not None else [])
+    results = {}
+    outputs = {}
+
+    for encoder in encoders:
+        app.json.use_orjson = encoder == 'orjson'
+        with app.app_context():
+            outputs[encoder] = jsonify(body).get_data()
+            results[f"jsonify {encoder}"] = measure(lambda: jsonify(body).get_data(), repeat)
+        if live:
+            client = app.test_client()
+            results[f"GET /posts {encoder}"] = measure(lambda: client.get(f"/posts?limit={count}").get_data(), repeat)
+
+    if orjson is None:
+        print("orjson is not installed (pip install orjson), only the stdlib encoder was timed")
+    else:
+        print(f"identical output: {outputs['stdlib'] == outputs['orjson']}")
+    print(f"{'operation':<22}{'mean ms':>10}{'min ms':>10}")
+    for name, stats in results.items():
+        print(f"{name:<22}{stats['mean_ms']:>10.1f}{stats['min_ms']:>10.1f}")
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--posts', type=int, default=50000)
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--live', action='store_true')
+    args = parser.parse_args()
+    run(args.posts, args.repeat, args.live)
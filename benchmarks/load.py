@@ -0,0 +1,237 @@
+"""Concurrent load test of the read endpoints, with a machine-readable results file.
+
+Generates a social graph (see benchmarks.generator), then `--concurrency`
+threads send a weighted mix of requests for `--duration` seconds and the
+latency percentiles and throughput of each endpoint are reported:
+
+    # against the configured Neo4j, through the app in this process
+    python -m benchmarks.load run --users 5000 --degree 20 --output results.json
+
+    # against a server already running on that database
+    python -m benchmarks.load run --url http://localhost:5000 --output results.json
+
+    # without a database, on the in-memory stand-in (Python side only)
+    python -m benchmarks.load run --backend standin --output results.json
+
+    # p95 of each endpoint against a previous run, exit code 1 on regression
+    python -m benchmarks.load compare base.json results.json --tolerance 0.1
+
+On Neo4j, the generated nodes are deleted at the end unless `--keep` is set.
+"""
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+
+from benchmarks import generator
+
+# name: (weight, path of a request for the dataset)
+PROFILE = {
+    "GET /users": (1, lambda d, rng: "/users?limit=50"),
+    "GET /users/:id": (4, lambda d, rng: f"/users/{rng.choice(d.users)['id']}"),
+    "GET /users/:id/friends": (3, lambda d, rng: f"/users/{rng.choice(d.users)['id']}/friends"),
+    "GET /users/:id/feed": (4, lambda d, rng: f"/users/{rng.choice(d.users)['id']}/feed?limit=20"),
+    "GET /users/:id/mutual-friends/:otherId": (
+        1, lambda d, rng: f"/users/{rng.choice(d.users)['id']}/mutual-friends/{rng.choice(d.users)['id']}"
+    ),
+    "GET /posts": (1, lambda d, rng: "/posts?limit=50"),
+    "GET /posts/:id": (4, lambda d, rng: f"/posts/{rng.choice(d.posts)['id']}"),
+    "GET /posts/:id/comments": (2, lambda d, rng: f"/posts/{rng.choice(d.posts)['id']}/comments"),
+}
+
+
+def percentile(timings, q):
+    """Nearest-rank percentile of sorted timings"""
+    return timings[max(0, int(round(q / 100 * len(timings))) - 1)]
+
+
+def summarize(timings, errors, elapsed):
+    timings.sort()
+    return {
+        "requests": len(timings),
+        "errors": errors,
+        "throughput_rps": round(len(timings) / elapsed, 2),
+        "mean_ms": round(sum(timings) / len(timings), 3) if timings else None,
+        "p50_ms": round(percentile(timings, 50), 3) if timings else None,
+        "p95_ms": round(percentile(timings, 95), 3) if timings else None,
+        "p99_ms": round(percentile(timings, 99), 3) if timings else None,
+    }
+
+
+def in_process_client():
+    from app import create_app
+    from config import Config
+    app = create_app(Config)
+
+    def client():
+        test_client = app.test_client()
+        return lambda path: test_client.get(path).status_code
+    return client
+
+
+def http_client(url):
+    import requests
+
+    def client():
+        session = requests.Session()
+        return lambda path: session.get(url + path).status_code
+    return client
+
+
+def drive(dataset, make_client, concurrency, duration, seed):
+    names = list(PROFILE)
+    weights = [PROFILE[name][0] for name in names]
+    timings = {name: [] for name in names}
+    errors = {name: 0 for name in names}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker(index):
+        rng = random.Random(seed + index)
+        get = make_client()
+        local = {name: [] for name in names}
+        failed = {name: 0 for name in names}
+        while time.perf_counter() < deadline:
+            name = rng.choices(names, weights)[0]
+            path = PROFILE[name][1](dataset, rng)
+            start = time.perf_counter()
+            try:
+                status = get(path)
+            except Exception:
+                status = None
+            local[name].append((time.perf_counter() - start) * 1000)
+            if status is None or status >= 400:
+                failed[name] += 1
+        with lock:
+            for name in names:
+                timings[name].extend(local[name])
+                errors[name] += failed[name]
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    endpoints = {name: summarize(timings[name], errors[name], elapsed) for name in names if timings[name]}
+    total = summarize([t for name in names for t in timings[name]], sum(errors.values()), elapsed)
+    return endpoints, total
+
+
+def commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    dataset = generator.generate(
+        args.users, args.degree, args.distribution, args.posts, args.comments, args.likes, args.seed
+    )
+    print(f"Generated {dataset.stats()}")
+
+    graph = None
+    if args.backend == 'standin':
+        from app.database import database
+        from benchmarks.standin import StandInGraph
+        database.attach(StandInGraph(dataset))
+    else:
+        from app.database import graph
+        generator.write(graph, dataset)
+
+    try:
+        make_client = http_client(args.url) if args.url else in_process_client()
+        endpoints, total = drive(dataset, make_client, args.concurrency, args.duration, args.seed)
+    finally:
+        if graph is not None and not args.keep:
+            generator.delete(graph)
+
+    results = {
+        "meta": {
+            "commit": commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "backend": args.backend,
+            "target": args.url or "in-process",
+            "dataset": dataset.stats(),
+            "args": vars(args),
+        },
+        "endpoints": endpoints,
+        "total": total,
+    }
+
+    print(f"{'endpoint':<42}{'req':>8}{'err':>6}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, stats in list(endpoints.items()) + [("total", total)]:
+        print(
+            f"{name:<42}{stats['requests']:>8}{stats['errors']:>6}{stats['throughput_rps']:>10.1f}"
+            f"{stats['p50_ms']:>10.2f}{stats['p95_ms']:>10.2f}{stats['p99_ms']:>10.2f}"
+        )
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+    return results
+
+
+def compare(args):
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+
+    regressions = []
+    print(f"{'endpoint':<42}{'base p95':>10}{'new p95':>10}{'change':>9}{'base rps':>10}{'new rps':>10}")
+    for name, stats in list(new["endpoints"].items()) + [("total", new["total"])]:
+        before = base["endpoints"].get(name) if name != "total" else base["total"]
+        if not before:
+            continue
+        change = (stats["p95_ms"] - before["p95_ms"]) / before["p95_ms"]
+        if change > args.tolerance:
+            regressions.append(name)
+        print(
+            f"{name:<42}{before['p95_ms']:>10.2f}{stats['p95_ms']:>10.2f}{change:>+9.1%}"
+            f"{before['throughput_rps']:>10.1f}{stats['throughput_rps']:>10.1f}"
+        )
+    if regressions:
+        print(f"p95 regressed by more than {args.tolerance:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='generate a graph and run the load test')
+    run_parser.add_argument('--backend', choices=('neo4j', 'standin'), default='neo4j')
+    run_parser.add_argument('--url', help='base URL of a running server (neo4j backend only), default: in-process app')
+    run_parser.add_argument('--users', type=int, default=2000)
+    run_parser.add_argument('--degree', type=int, default=20, help='mean friendships started by each user')
+    run_parser.add_argument('--distribution', choices=generator.DISTRIBUTIONS, default='powerlaw')
+    run_parser.add_argument('--posts', type=int, default=10, help='posts per user')
+    run_parser.add_argument('--comments', type=int, default=2, help='comments per post')
+    run_parser.add_argument('--likes', type=int, default=20, help='posts liked by each user')
+    run_parser.add_argument('--concurrency', type=int, default=8)
+    run_parser.add_argument('--duration', type=float, default=30, help='seconds')
+    run_parser.add_argument('--seed', type=int, default=42)
+    run_parser.add_argument('--output', help='JSON results file')
+    run_parser.add_argument('--keep', action='store_true', help='keep the generated graph in Neo4j')
+
+    compare_parser = commands.add_parser('compare', help='compare two results files')
+    compare_parser.add_argument('base')
+    compare_parser.add_argument('new')
+    compare_parser.add_argument('--tolerance', type=float, default=0.1, help='allowed relative p95 increase')
+
+    args = parser.parse_args()
+    if args.command == 'run' and args.url and args.backend == 'standin':
+        parser.error('--url needs the neo4j backend: the stand-in only lives in this process')
+    if args.command == 'compare':
+        sys.exit(compare(args))
+    run(args)
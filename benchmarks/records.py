@@ -0,0 +1,83 @@
+"""CPU time and peak memory of turning Post records into response dicts.
+
+Compares the OGM path (a list of `Post.wrap(node)` models, then their
+`to_dict()`) with the direct mapper (`node_dict(node, "Post")`) on
+`--records` in-memory nodes, so it runs without a database:
+
+    python -m benchmarks.records --records 100000
+
+With `--live`, also reads `--records` posts from the configured database,
+once returning nodes mapped through `Post.wrap` and once with the Cypher map
+projection of `Post.get_page`, which includes the Bolt hydration cost.
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+import uuid
+
+from py2neo import Node
+
+from app.models.post import Post
+from app.projections import node_dict, post_map
+
+
+def nodes(count):
+    now = time.time()
+    return [
+        Node(
+            "Post", id=str(uuid.uuid4()), title=f"Post {i}", content="Lorem ipsum dolor sit amet " * 4,
+            created_at=now + i, version=1, updated_at=now + i, like_count=i % 50, comment_count=i % 7
+        )
+        for i in range(count)
+    ]
+
+
+def wrap_then_to_dict(data):
+    # As the read paths did: the page of models first, then their dicts
+    models = [Post.wrap(node) for node in data]
+    return [model.to_dict() for model in models]
+
+
+def measure(fn):
+    """CPU seconds and peak traced bytes of fn(), its result kept alive until the end"""
+    gc.collect()
+    tracemalloc.start()
+    start = time.process_time()
+    result = fn()
+    cpu = time.process_time() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del result
+    return {"cpu_s": cpu, "peak_mb": peak / 1024 / 1024}
+
+
+def run(records, live=False):
+    data = nodes(records)
+    results = {
+        "wrap+to_dict": measure(lambda: wrap_then_to_dict(data)),
+        "node_dict": measure(lambda: [node_dict(node, "Post") for node in data]),
+    }
+
+    if live:
+        from app.database import graph
+        results["live wrap"] = measure(lambda: wrap_then_to_dict(
+            [record["p"] for record in graph.run("MATCH (p:Post) RETURN p LIMIT $limit", limit=records)]
+        ))
+        results["live projection"] = measure(lambda: [
+            record["p"]
+            for record in graph.run(f"MATCH (p:Post) RETURN {post_map('p')} AS p LIMIT $limit", limit=records)
+        ])
+
+    print(f"{'path':<18}{'cpu s':>10}{'peak MB':>10}")
+    for name, stats in results.items():
+        print(f"{name:<18}{stats['cpu_s']:>10.3f}{stats['peak_mb']:>10.1f}")
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--records', type=int, default=100000)
+    parser.add_argument('--live', action='store_true')
+    args = parser.parse_args()
+    run(args.records, args.live)
@@ -0,0 +1,143 @@
+"""Read/write routing check against a two-instance stand-in cluster.
+
+`StandInCluster` plays a leader and a follower behind the part of the py2neo
+Graph interface used by app.database: read-only auto-commit statements and
+transactions are served by the follower, everything else by the leader, and
+every commit on the leader returns a new bookmark. The check sends a
+sequence of requests through the app and reports which instance served the
+statements of each:
+
+    python -m benchmarks.routing
+
+The exit code is 1 when a request failed with a server error or was not
+served by the expected instance.
+"""
+import itertools
+import sys
+import time
+import types
+
+from py2neo.client import Bookmark
+
+
+class StandInCursor:
+    def data(self):
+        return []
+
+    def evaluate(self):
+        return None
+
+    def stats(self):
+        return {}
+
+    def __iter__(self):
+        return iter(())
+
+
+class Instance:
+    def __init__(self, name):
+        self.name = name
+        self.statements = []
+
+    def run(self, cypher, parameters=None, **kwparameters):
+        self.statements.append(cypher)
+        return StandInCursor()
+
+    def evaluate(self, cypher, parameters=None, **kwparameters):
+        return self.run(cypher, parameters, **kwparameters).evaluate()
+
+
+class StandInTransaction:
+    def __init__(self, instance):
+        self.instance = instance
+        self.bookmark = None
+
+    def run(self, cypher, parameters=None, **kwparameters):
+        return self.instance.run(cypher, parameters, **kwparameters)
+
+    def evaluate(self, cypher, parameters=None, **kwparameters):
+        return self.instance.evaluate(cypher, parameters, **kwparameters)
+
+    def create(self, subgraph):
+        self.instance.statements.append(f"CREATE {type(subgraph).__name__}")
+
+    push = delete = create
+
+
+class StandInCluster:
+    def __init__(self):
+        self.leader = Instance("leader")
+        self.follower = Instance("follower")
+        self.service = types.SimpleNamespace(connector=types.SimpleNamespace(_pools={}))
+        self._bookmarks = itertools.count(1)
+
+    def instance(self, readonly):
+        return self.follower if readonly else self.leader
+
+    def run(self, cypher, parameters=None, **kwparameters):
+        return self.leader.run(cypher, parameters, **kwparameters)
+
+    def evaluate(self, cypher, parameters=None, **kwparameters):
+        return self.leader.evaluate(cypher, parameters, **kwparameters)
+
+    def auto(self, readonly=False):
+        return self.instance(readonly)
+
+    def begin(self, readonly=False):
+        return StandInTransaction(self.instance(readonly))
+
+    def commit(self, tx):
+        if tx.instance is self.leader:
+            tx.bookmark = Bookmark(f"FB:stand-in:{next(self._bookmarks)}")
+
+    def rollback(self, tx):
+        pass
+
+    def served_by(self):
+        """Instances that ran statements since the last call"""
+        served = {instance.name for instance in (self.leader, self.follower) if instance.statements}
+        self.leader.statements.clear()
+        self.follower.statements.clear()
+        return served
+
+
+def check():
+    from app import create_app
+    from app.database import database
+    from app.routing import BOOKMARK_HEADER, encode_bookmark
+    from config import Config
+
+    cluster = StandInCluster()
+    database.attach(cluster)
+    client = create_app(Config).test_client()
+    user_id = "00000000-0000-4000-8000-000000000000"
+    stale = encode_bookmark([], time.time() - Config.READ_YOUR_WRITES_SECONDS - 1)
+
+    steps = [
+        ("GET /posts", lambda headers: client.get("/posts", headers=headers), None, {"follower"}),
+        ("GET /users/:id", lambda headers: client.get(f"/users/{user_id}?fields=name", headers=headers), None, {"follower"}),
+        ("POST /users", lambda headers: client.post("/users", json={"name": "Ada", "email": "ada@example.com"}, headers=headers), None, {"leader"}),
+        ("GET /users/:id after the write", lambda headers: client.get(f"/users/{user_id}?fields=name", headers=headers), "last", {"leader"}),
+        ("GET /users/:id, stale bookmark", lambda headers: client.get(f"/users/{user_id}?fields=name", headers=headers), stale, {"follower"}),
+        ("POST /users/batch", lambda headers: client.post("/users/batch", json=[{"name": "Alan", "email": "alan@example.com"}], headers=headers), None, {"leader"}),
+    ]
+
+    failures = 0
+    bookmark = None
+    print(f"{'request':<34}{'status':>8}  {'expected':<10}{'served by':<18}{'bookmark':<10}")
+    for name, send, token, expected in steps:
+        token = bookmark if token == "last" else token
+        response = send({BOOKMARK_HEADER: token} if token else {})
+        served = cluster.served_by()
+        bookmark = response.headers.get(BOOKMARK_HEADER, bookmark)
+        ok = served == expected and response.status_code < 500
+        failures += not ok
+        print(
+            f"{name:<34}{response.status_code:>8}  {'/'.join(sorted(expected)):<10}{'/'.join(sorted(served)) or '-':<18}"
+            f"{'issued' if BOOKMARK_HEADER in response.headers else '':<10}{'' if ok else 'MISMATCH'}"
+        )
+    return failures
+
+
+if __name__ == '__main__':
+    sys.exit(1 if check() else 0)
@@ -0,0 +1,82 @@
+"""Lookup latency before and after the schema bootstrap.
+
+Generates users in the configured database, times `User.find_by_id` and the
+email lookup of `UserController.create_user` without any index, then runs
+`ensure_schema` and times them again. The generated users are deleted at the
+end. The app constraints and indexes are dropped first, so run it against a
+throwaway database:
+
+    python -m benchmarks.schema_lookup --users 200000 --lookups 500
+"""
+import argparse
+import random
+import statistics
+import time
+import uuid
+
+from app.database import graph
+from app.models.user import User
+from app.schema import drop_schema, ensure_schema
+
+CHUNK_SIZE = 10000
+
+
+def generate_users(count):
+    ids = []
+    for start in range(0, count, CHUNK_SIZE):
+        rows = [
+            {"id": str(uuid.uuid4()), "email": f"bench-{start + i}@example.com", "created_at": time.time()}
+            for i in range(min(CHUNK_SIZE, count - start))
+        ]
+        graph.run(
+            "UNWIND $rows AS row "
+            "CREATE (:User {id: row.id, name: 'bench', email: row.email, created_at: row.created_at, bench: true})",
+            rows=rows
+        )
+        ids.extend(row["id"] for row in rows)
+    return ids
+
+
+def measure(fn, keys):
+    timings = []
+    for key in keys:
+        start = time.perf_counter()
+        fn(key)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {
+        "mean_ms": statistics.mean(timings),
+        "p50_ms": timings[len(timings) // 2],
+        "p95_ms": timings[int(len(timings) * 0.95) - 1],
+    }
+
+
+def run(users, lookups):
+    print(f"Generating {users} users...")
+    drop_schema(graph)
+    ids = generate_users(users)
+    sample = random.sample(range(users), min(lookups, users))
+    by_id = lambda i: User.find_by_id(ids[i], graph)
+    by_email = lambda i: graph.run("MATCH (u:User {email: $email}) RETURN u", email=f"bench-{i}@example.com").data()
+
+    try:
+        results = {"before": {"find_by_id": measure(by_id, sample), "email": measure(by_email, sample)}}
+        ensure_schema(graph)
+        graph.run("CALL db.awaitIndexes(300)")
+        results["after"] = {"find_by_id": measure(by_id, sample), "email": measure(by_email, sample)}
+    finally:
+        graph.run("MATCH (u:User {bench: true}) CALL { WITH u DETACH DELETE u } IN TRANSACTIONS OF 10000 ROWS")
+
+    print(f"{'lookup':<12}{'phase':<8}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}")
+    for phase, lookups_by_name in results.items():
+        for name, stats in lookups_by_name.items():
+            print(f"{name:<12}{phase:<8}{stats['mean_ms']:>10.3f}{stats['p50_ms']:>10.3f}{stats['p95_ms']:>10.3f}")
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=100000)
+    parser.add_argument('--lookups', type=int, default=500)
+    args = parser.parse_args()
+    run(args.users, args.lookups)
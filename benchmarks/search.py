@@ -0,0 +1,95 @@
+"""Keyword search latency: full-text index against downloading and scanning GET /posts.
+
+Writes `--users` users with `--posts` posts each, whose titles and contents
+are drawn from a vocabulary of `--vocabulary` words, creates the schema
+(including the full-text indexes), then for `--searches` random words times
+
+- `GET /posts/search?q=<word>`, one page of the most relevant posts;
+- the client-side approach: every page of `GET /posts`, filtered in Python.
+
+The generated data is deleted at the end:
+
+    python -m benchmarks.search --users 1000 --posts 50 --searches 50
+"""
+import argparse
+import random
+import statistics
+import time
+
+from app import create_app
+from app.database import graph
+from app.schema import ensure_schema
+from benchmarks import generator
+from config import Config
+
+
+def vocabulary(size, rng):
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return sorted({"".join(rng.choice(letters) for _ in range(rng.randint(4, 9))) for _ in range(size)})
+
+
+def scan(client, word):
+    """The posts containing `word`, found by reading every page of GET /posts"""
+    matches, after = [], None
+    while True:
+        body = client.get(f"/posts?limit={Config.PAGE_SIZE_MAX}" + (f"&after={after}" if after else "")).get_json()
+        matches.extend(
+            post for post in body["posts"]
+            if word in post["title"].lower().split() or word in post["content"].lower().split()
+        )
+        after = body["next_cursor"]
+        if not after:
+            return matches
+
+
+def measure(fn, keys):
+    timings = []
+    for key in keys:
+        start = time.perf_counter()
+        fn(key)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {
+        "mean_ms": statistics.mean(timings),
+        "p50_ms": timings[len(timings) // 2],
+        "p95_ms": timings[int(len(timings) * 0.95) - 1],
+    }
+
+
+def run(users, posts, words, searches, seed):
+    rng = random.Random(seed)
+    dataset = generator.generate(users, 0, 'uniform', posts, comments=0, likes=0, seed=seed)
+    vocab = vocabulary(words, rng)
+    for post in dataset.posts:
+        post["title"] = " ".join(rng.choices(vocab, k=4))
+        post["content"] = " ".join(rng.choices(vocab, k=30))
+    print(f"Generating {users} users and {len(dataset.posts)} posts...")
+    generator.write(graph, dataset)
+    ensure_schema(graph)
+    graph.run("CALL db.awaitIndexes(300)")
+
+    client = create_app(Config).test_client()
+    sample = [rng.choice(vocab) for _ in range(searches)]
+    try:
+        results = {
+            "fulltext": measure(lambda word: client.get(f"/posts/search?q={word}"), sample),
+            "scan": measure(lambda word: scan(client, word), sample),
+        }
+    finally:
+        generator.delete(graph)
+
+    print(f"{'approach':<12}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}")
+    for name, stats in results.items():
+        print(f"{name:<12}{stats['mean_ms']:>10.3f}{stats['p50_ms']:>10.3f}{stats['p95_ms']:>10.3f}")
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--posts', type=int, default=50)
+    parser.add_argument('--vocabulary', type=int, default=5000)
+    parser.add_argument('--searches', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+    run(args.users, args.posts, args.vocabulary, args.searches, args.seed)
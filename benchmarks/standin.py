@@ -0,0 +1,121 @@
+"""In-memory stand-in for Neo4j, serving the read endpoints of the load profile.
+
+`StandInGraph` answers the statements issued by those endpoints from a
+generated Dataset, recognized by their shape; any other statement returns no
+rows. Every Cypher statement costs a few Python operations instead of a round
+trip to the database, so a run on the stand-in measures the Python side of the
+API (routing, controllers, projections, caching, JSON encoding) and catches
+regressions there without a Neo4j server.
+"""
+import bisect
+import re
+from py2neo import Node
+
+
+class StandInCursor:
+    def __init__(self, records):
+        self._records = records
+
+    def __iter__(self):
+        return iter(self._records)
+
+    def data(self):
+        return list(self._records)
+
+    def evaluate(self):
+        return next(iter(self._records[0].values())) if self._records else None
+
+    def stats(self):
+        return {}
+
+
+class StandInGraph:
+    def __init__(self, dataset):
+        self.users = {user["id"]: user for user in dataset.users}
+        self.posts = {post["id"]: post for post in dataset.posts}
+        self.authors = dataset.authors
+        self.friends = {user_id: set() for user_id in self.users}
+        for a, b in dataset.friendships:
+            self.friends[a].add(b)
+            self.friends[b].add(a)
+        self.posts_by_author = {}
+        for post in sorted(dataset.posts, key=lambda post: (post["created_at"], post["id"]), reverse=True):
+            self.posts_by_author.setdefault(self.authors[post["id"]], []).append(post)
+        self.comments = {}
+        for comment in dataset.comments:
+            self.comments.setdefault(comment["post_id"], []).append(
+                {key: comment[key] for key in ("id", "content", "created_at", "like_count")}
+            )
+        self.sorted_users = sorted(self.users.values(), key=lambda user: (user["created_at"], user["id"]))
+        self.sorted_posts = sorted(self.posts.values(), key=lambda post: (post["created_at"], post["id"]))
+        self.keys = {
+            "u": [(user["created_at"], user["id"]) for user in self.sorted_users],
+            "p": [(post["created_at"], post["id"]) for post in self.sorted_posts],
+        }
+
+        self.handlers = [
+            (r"MATCH \(n:(\w+) \{id: \$id\}\) RETURN coalesce\(n\.version", self.version),
+            (r"MATCH \(u:User\) WHERE \$after_created_at", lambda p, m: self.page(self.sorted_users, "u", p)),
+            (r"MATCH \(p:Post\) WHERE \$after_created_at", lambda p, m: self.page(self.sorted_posts, "p", p)),
+            (r"MATCH \(u:User \{id: \$id\}\) RETURN u \{", lambda p, m: self.one(self.users, "u", p["id"])),
+            (r"MATCH \(p:Post \{id: \$id\}\) RETURN p \{", lambda p, m: self.one(self.posts, "p", p["id"])),
+            (r"MATCH \(u:User \{id: '([^']*)'\}\) RETURN u$", lambda p, m: self.node("User", self.users, "u", m.group(1))),
+            (r"MATCH \(p:Post \{id: '([^']*)'\}\) RETURN p$", lambda p, m: self.node("Post", self.posts, "p", m.group(1))),
+            (r"MATCH \(u:User \{id: \$user_id\}\)-\[:FRIENDS_WITH\]-\(f:User\)-\[:FRIENDS_WITH\]-\(o:User", self.mutual_friends),
+            (r"MATCH \(u:User \{id: \$user_id\}\)-\[:FRIENDS_WITH\]-\(f:User\) RETURN", self.user_friends),
+            (r"MATCH \(u:User \{id: \$user_id\}\)-\[:FRIENDS_WITH\]-\(a:User\)-\[:CREATED\]->\(p:Post\)", self.feed),
+            (r"MATCH \(p:Post \{id: \$post_id\}\)-\[:HAS_COMMENT\]->\(c:Comment\) RETURN", self.post_comments),
+        ]
+        self.handlers = [(re.compile(pattern), handler) for pattern, handler in self.handlers]
+
+    def run(self, cypher, parameters=None, **kwparameters):
+        parameters = dict(parameters or {}, **kwparameters)
+        for pattern, handler in self.handlers:
+            match = pattern.match(cypher)
+            if match:
+                return StandInCursor(handler(parameters, match))
+        return StandInCursor([])
+
+    def evaluate(self, cypher, parameters=None, **kwparameters):
+        return self.run(cypher, parameters, **kwparameters).evaluate()
+
+    def auto(self, readonly=False):
+        return self
+
+    def version(self, parameters, match):
+        entities = {"User": self.users, "Post": self.posts}.get(match.group(1), {})
+        entity = entities.get(parameters["id"])
+        return [{"version": 1, "updated_at": entity["created_at"]}] if entity else []
+
+    def page(self, rows, var, parameters):
+        start = 0
+        if parameters.get("after_created_at") is not None:
+            start = bisect.bisect_right(self.keys[var], (parameters["after_created_at"], parameters["after_id"]))
+        return [{var: row} for row in rows[start:start + parameters["limit"]]]
+
+    def one(self, entities, var, entity_id):
+        return [{var: entities[entity_id]}] if entity_id in entities else []
+
+    def node(self, label, entities, var, entity_id):
+        return [{var: Node(label, **entities[entity_id])}] if entity_id in entities else []
+
+    def user_friends(self, parameters, match):
+        return [{"f": self.users[friend_id]} for friend_id in self.friends.get(parameters["user_id"], ())]
+
+    def mutual_friends(self, parameters, match):
+        common = self.friends.get(parameters["user_id"], set()) & self.friends.get(parameters["other_id"], set())
+        return [{"f": self.users[friend_id]} for friend_id in common]
+
+    def feed(self, parameters, match):
+        posts = [
+            post
+            for friend_id in self.friends.get(parameters["user_id"], ())
+            for post in self.posts_by_author.get(friend_id, ())
+            if parameters["before_created_at"] is None
+            or (post["created_at"], post["id"]) < (parameters["before_created_at"], parameters["before_id"])
+        ]
+        posts.sort(key=lambda post: (post["created_at"], post["id"]), reverse=True)
+        return [{"p": post, "author_id": self.authors[post["id"]]} for post in posts[:parameters["limit"]]]
+
+    def post_comments(self, parameters, match):
+        return [{"c": comment} for comment in self.comments.get(parameters["post_id"], ())]
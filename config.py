@@ -8,4 +8,86 @@ class Config:
     NEO4J_URI = os.getenv('NEO4J_URI', 'bolt://localhost:7687')
     NEO4J_USER = os.getenv('NEO4J_USER', 'neo4j')
     NEO4J_PASSWORD = os.getenv('NEO4J_PASSWORD', 'password')
-    
\ No newline at end of file
+
+    # Use a neo4j:// URI on a cluster: read transactions then go to the
+    # followers. After a write, a client sending back its Neo4j-Bookmark has
+    # its reads served by the leader for this many seconds
+    READ_YOUR_WRITES_SECONDS = float(os.getenv('READ_YOUR_WRITES_SECONDS', 10))
+
+    # Connection pool (per process)
+    NEO4J_POOL_SIZE = int(os.getenv('NEO4J_POOL_SIZE', 50))
+    NEO4J_POOL_ACQUIRE_TIMEOUT = float(os.getenv('NEO4J_POOL_ACQUIRE_TIMEOUT', 30))
+    NEO4J_CONNECTION_LIFETIME = int(os.getenv('NEO4J_CONNECTION_LIFETIME', 3600))
+
+    # Write requests run in one transaction, run again up to this many times
+    # on transient errors (deadlocks, leader switch) after a jittered backoff
+    TRANSACTION_RETRIES = int(os.getenv('TRANSACTION_RETRIES', 3))
+    TRANSACTION_RETRY_BASE_MS = float(os.getenv('TRANSACTION_RETRY_BASE_MS', 50))
+    TRANSACTION_RETRY_MAX_MS = float(os.getenv('TRANSACTION_RETRY_MAX_MS', 1000))
+
+    # Idempotency-Key of the POST endpoints: store of the responses (memory,
+    # per process, or redis, shared), seconds they are replayed, keys kept in
+    # memory, and how long a duplicate waits for the request still running
+    IDEMPOTENCY_BACKEND = os.getenv('IDEMPOTENCY_BACKEND', 'memory')
+    IDEMPOTENCY_REDIS_URL = os.getenv('IDEMPOTENCY_REDIS_URL', os.getenv('CACHE_REDIS_URL', 'redis://localhost:6379/0'))
+    IDEMPOTENCY_TTL = int(os.getenv('IDEMPOTENCY_TTL', 86400))
+    IDEMPOTENCY_MAXSIZE = int(os.getenv('IDEMPOTENCY_MAXSIZE', 100000))
+    IDEMPOTENCY_WAIT_SECONDS = float(os.getenv('IDEMPOTENCY_WAIT_SECONDS', 10))
+    IDEMPOTENCY_POLL_SECONDS = float(os.getenv('IDEMPOTENCY_POLL_SECONDS', 0.05))
+    IDEMPOTENCY_PENDING_SECONDS = int(os.getenv('IDEMPOTENCY_PENDING_SECONDS', 60))
+
+    # Batch endpoints: items per request, and rows per transaction
+    BATCH_MAX_ITEMS = int(os.getenv('BATCH_MAX_ITEMS', 10000))
+    BATCH_CHUNK_SIZE = int(os.getenv('BATCH_CHUNK_SIZE', 1000))
+
+    # Per request Cypher statistics (Server-Timing header, /metrics), slow
+    # statements log and N+1 detection (same statement run this many times)
+    INSTRUMENTATION = os.getenv('INSTRUMENTATION', 'true').lower() == 'true'
+    SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', 100))
+    N_PLUS_ONE_THRESHOLD = int(os.getenv('N_PLUS_ONE_THRESHOLD', 5))
+
+    # Encoder of the JSON responses: orjson (used when installed) or stdlib
+    JSON_ENCODER = os.getenv('JSON_ENCODER', 'orjson')
+
+    # Read-through cache of entity reads: memory (per process), redis (shared) or none
+    CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'memory')
+    CACHE_MAXSIZE = int(os.getenv('CACHE_MAXSIZE', 10000))
+    CACHE_TTL = int(os.getenv('CACHE_TTL', 60))
+    CACHE_REDIS_URL = os.getenv('CACHE_REDIS_URL', 'redis://localhost:6379/0')
+
+    # Create missing constraints and indexes when the app starts
+    SCHEMA_BOOTSTRAP = os.getenv('SCHEMA_BOOTSTRAP', 'false').lower() == 'true'
+
+    # Pagination of the list endpoints
+    PAGE_SIZE_DEFAULT = int(os.getenv('PAGE_SIZE_DEFAULT', 50))
+    PAGE_SIZE_MAX = int(os.getenv('PAGE_SIZE_MAX', 500))
+
+    # Home feed: read (friends' posts queried on every read) or timeline
+    # (posts pushed to a bounded per-user timeline when they are created)
+    FEED_MODE = os.getenv('FEED_MODE', 'read')
+    FEED_TIMELINE_SIZE = int(os.getenv('FEED_TIMELINE_SIZE', 500))
+
+    # Friend recommendations: hops explored (2 = friends of friends), friends
+    # followed from each user during the traversal, and results kept per user
+    RECOMMENDATIONS_DEPTH = int(os.getenv('RECOMMENDATIONS_DEPTH', 2))
+    RECOMMENDATIONS_MAX_DEPTH = int(os.getenv('RECOMMENDATIONS_MAX_DEPTH', 3))
+    RECOMMENDATIONS_FANOUT = int(os.getenv('RECOMMENDATIONS_FANOUT', 100))
+    RECOMMENDATIONS_LIMIT = int(os.getenv('RECOMMENDATIONS_LIMIT', 50))
+
+    # Trending posts: windows of GET /posts/trending (first one by default),
+    # time buckets per window, posts ranked, event weights, and seconds
+    # between two checkpoints of the in-process scores to the graph
+    TRENDING_WINDOWS = os.getenv('TRENDING_WINDOWS', '1h,24h,7d')
+    TRENDING_BUCKETS = int(os.getenv('TRENDING_BUCKETS', 12))
+    TRENDING_TOP_K = int(os.getenv('TRENDING_TOP_K', 100))
+    TRENDING_LIKE_WEIGHT = float(os.getenv('TRENDING_LIKE_WEIGHT', 1))
+    TRENDING_COMMENT_WEIGHT = float(os.getenv('TRENDING_COMMENT_WEIGHT', 2))
+    TRENDING_CHECKPOINT_INTERVAL = float(os.getenv('TRENDING_CHECKPOINT_INTERVAL', 60))
+
+    # Largest number of hops searched by the shortest path endpoint
+    PATH_MAX_DEPTH = int(os.getenv('PATH_MAX_DEPTH', 6))
+
+    # In-memory index of the friendships (requires numpy), loaded at startup
+    FRIEND_INDEX = os.getenv('FRIEND_INDEX', 'false').lower() == 'true'
+    FRIEND_INDEX_CHUNK_SIZE = int(os.getenv('FRIEND_INDEX_CHUNK_SIZE', 10000))
+    FRIEND_INDEX_COMPACT_AT = int(os.getenv('FRIEND_INDEX_COMPACT_AT', 100000))